@@ -1,8 +1,11 @@
 import streamlit as st
+import logging
 import os
 from dotenv import load_dotenv
 from symptom_checker.triage_system import TriageSystem
 
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 # --- Page Configuration ---
 st.set_page_config(
     page_title="AI Medical Symptom Checker",
@@ -19,15 +22,14 @@ def load_triage_system():
     Loads and caches the TriageSystem instance.
     This function will only be run once, when the app first starts.
     """
-    print("--- Initializing Triage System for the first time ---")
+    logging.info("--- Initializing Triage System for the first time ---")
     load_dotenv(dotenv_path='safe.env')
     serp_api_key = os.getenv("SERP_API_KEY")
     groq_api_key = os.getenv("GROQ_API_KEY")
 
     if not serp_api_key or not groq_api_key:
-        st.error("API Keys are missing! Please ensure 'safe.env' is configured.")
-        return None
-        
+        st.warning("API keys are not configured; precautions will come from the local dataset.")
+
     try:
         system = TriageSystem(serp_api_key=serp_api_key, groq_api_key=groq_api_key)
         return system
@@ -35,6 +37,10 @@ def load_triage_system():
         st.error(f"Failed to initialize the system: {e}")
         return None
 
+def confirm_symptom(display_name):
+    """'Yes' to a suggested question: adds the symptom to the selection."""
+    st.session_state.selected_symptoms = st.session_state.selected_symptoms + [display_name]
+
 # --- Main Application UI ---
 st.title("🩺 AI Medical Symptom Checker")
 st.markdown(
@@ -56,12 +62,35 @@ if triage_system:
     selected_symptoms_display = st.multiselect(
         "Start typing to search for symptoms...",
         options=symptom_list_display,
-        help="You can select multiple symptoms."
+        help="You can select multiple symptoms.",
+        key="selected_symptoms"
     )
 
     # Convert display symptoms back to the format the model expects
     selected_symptoms_raw = [s.lower().replace(' ', '_') for s in selected_symptoms_display]
 
+    # One diagnosis session per browser session, updated with only the symptoms that changed
+    if "diagnosis_session" not in st.session_state:
+        st.session_state.diagnosis_session = triage_system.start_session()
+    session = st.session_state.diagnosis_session
+    session.set_symptoms(selected_symptoms_raw)
+
+    if selected_symptoms_raw:
+        st.caption("Live differential: " + ", ".join(
+            f"{disease.title()} ({probability:.0%})" for disease, probability in session.differential()
+        ))
+        suggestion = session.suggest()
+        if suggestion:
+            # Ask about the symptom that best separates the remaining candidates
+            next_symptom = suggestion[0][0]
+            next_display = next_symptom.replace('_', ' ').title()
+            st.markdown(f"**Do you also have: {next_display}?**")
+            yes_col, no_col = st.columns(2)
+            yes_col.button("Yes", key=f"yes_{next_symptom}", on_click=confirm_symptom,
+                           args=(next_display,), use_container_width=True)
+            no_col.button("No", key=f"no_{next_symptom}", on_click=session.deny,
+                          args=(next_symptom,), use_container_width=True)
+
     st.subheader("Step 2: Get Assessment")
     if st.button("Assess My Symptoms", type="primary", use_container_width=True):
         if not selected_symptoms_raw:
@@ -107,7 +136,11 @@ if triage_system:
 
                 st.markdown("**Suggested Precautions:**")
                 # The RAG output is already in markdown format, so we can display it directly
-                st.markdown(disease_info['precautions'])
+                precautions = disease_info['precautions']
+                if isinstance(precautions, list):
+                    # Local/offline precautions are a list rather than a summary text
+                    precautions = "\n".join(f"- {p}" for p in precautions)
+                st.markdown(precautions)
 
 else:
     st.error("The application could not be started. Please check the console for errors.")
@@ -0,0 +1,97 @@
+# benchmarks/bench_data_loader.py
+"""
+Micro-benchmark for MedicalDataLoader startup on enlarged copies of the bundled data.
+
+Run from the project root:
+    python -m benchmarks.bench_data_loader --scales 1 10 100
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from symptom_checker.data_loader import MedicalDataLoader
+
+LOOKUP_FILES = ('symptom_Description.csv', 'symptom_precaution.csv', 'symptom_severity.csv')
+
+
+class LegacyMedicalDataLoader(MedicalDataLoader):
+    """The original row-by-row implementation, kept here as the comparison baseline."""
+
+    def _process_datasets(self):
+        main_df = self.datasets['main']
+        symptom_columns = [col for col in main_df.columns if col.startswith('Symptom_')]
+        all_symptoms_set = set()
+        for col in symptom_columns:
+            main_df[col] = main_df[col].str.strip().str.lower().str.replace(' ', '_').replace('__', '_')
+            all_symptoms_set.update(main_df[col].dropna().unique())
+        all_symptoms = sorted(list(all_symptoms_set))
+        symptom_index = {symptom: i for i, symptom in enumerate(all_symptoms)}
+        X = []
+        y = []
+        for _, row in main_df.iterrows():
+            features = [0] * len(all_symptoms)
+            for col in symptom_columns:
+                symptom = row.get(col)
+                if pd.notna(symptom) and symptom in symptom_index:
+                    features[symptom_index[symptom]] = 1
+            X.append(features)
+            y.append(row['Disease'].strip().lower())
+        self.processed_data['all_symptoms'] = all_symptoms
+        self.processed_data['X_train'] = pd.DataFrame(X, columns=all_symptoms)
+        self.processed_data['y_train'] = pd.Series(y)
+
+
+def build_scaled_data_dir(source_path, scale, target_dir):
+    """Writes a copy of the data directory whose dataset.csv is repeated `scale` times."""
+    main_df = pd.read_csv(os.path.join(source_path, 'dataset.csv'))
+    pd.concat([main_df] * scale, ignore_index=True).to_csv(os.path.join(target_dir, 'dataset.csv'), index=False)
+    for name in LOOKUP_FILES:
+        shutil.copy(os.path.join(source_path, name), os.path.join(target_dir, name))
+    return len(main_df) * scale
+
+
+def time_loader(loader_cls, data_path, repeat):
+    """Returns the best wall-clock time of `repeat` full load-and-process runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        loader = loader_cls(data_path)
+        start = time.perf_counter()
+        loader.load_and_process_data()
+        best = min(best, time.perf_counter() - start)
+    return best, loader.get_processed_data()['X_train']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-legacy-above', type=int, default=100,
+                        help="Skip the slow legacy loader for scales above this value.")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = build_scaled_data_dir(args.data_path, scale, tmp)
+            data_path = tmp + os.sep
+            new_time, new_X = time_loader(MedicalDataLoader, data_path, args.repeat)
+            legacy_time = None
+            if scale <= args.skip_legacy_above:
+                legacy_time, legacy_X = time_loader(LegacyMedicalDataLoader, data_path, 1)
+                assert (legacy_X.to_numpy() == new_X.to_numpy()).all(), "Feature matrices differ!"
+            results.append((scale, rows, legacy_time, new_time, new_X.memory_usage(deep=True).sum()))
+
+    print(f"\n{'scale':>6} {'rows':>9} {'legacy (s)':>11} {'vectorized (s)':>15} {'speedup':>8} {'X_train MB':>11}")
+    for scale, rows, legacy_time, new_time, nbytes in results:
+        legacy = f"{legacy_time:11.3f}" if legacy_time is not None else f"{'-':>11}"
+        speedup = f"{legacy_time / new_time:7.1f}x" if legacy_time is not None else f"{'-':>8}"
+        print(f"{scale:>6} {rows:>9} {legacy} {new_time:15.3f} {speedup} {nbytes / 1e6:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
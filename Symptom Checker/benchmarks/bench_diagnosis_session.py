@@ -0,0 +1,76 @@
+# benchmarks/bench_diagnosis_session.py
+"""
+Simulated multi-turn intake: per-step latency of DiagnosisSession against re-running
+assess_patient() after every answer, and how often the top diagnosis is right.
+
+Each simulated patient is a dataset row. The session starts from one of its symptoms
+and then answers the suggested questions truthfully from the row.
+
+Run from the project root:
+    python -m benchmarks.bench_diagnosis_session --patients 500 --questions 5
+"""
+import argparse
+import random
+import time
+
+from symptom_checker.data_loader import MedicalDataLoader
+from symptom_checker.triage_system import RAGOptions, ServingOptions, TriageSystem
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--patients', type=int, default=500)
+    parser.add_argument('--questions', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    loader = MedicalDataLoader(args.data_path)
+    loader.load_and_process_data()
+    data = loader.get_processed_data()
+    columns, values = data['X_train'].columns.to_numpy(), data['X_train'].to_numpy()
+    system = TriageSystem(args.data_path, rag=RAGOptions(offline=True),
+                          serving=ServingOptions(prediction_method='index'))
+    rng = random.Random(args.seed)
+
+    step_us, rerun_us, asked = [], [], []
+    correct_first = correct_last = 0
+    rows = rng.sample(range(len(values)), min(args.patients, len(values)))
+    for row in rows:
+        truth = set(columns[values[row] > 0])
+        disease = data['y_train'].iloc[row]
+        session = system.start_session([rng.choice(sorted(truth))])
+        correct_first += session.differential(1)[0][0] == disease
+        for question in range(args.questions):
+            start = time.perf_counter()
+            suggestion = session.suggest()
+            if suggestion:
+                symptom = suggestion[0][0]
+                (session.add if symptom in truth else session.deny)(symptom)
+                session.differential()
+            step_us.append((time.perf_counter() - start) * 1e6)
+            if not suggestion:
+                break
+            # What the app did before: the whole pipeline again on the confirmed symptoms
+            start = time.perf_counter()
+            system.assess_patient(session.symptoms)
+            rerun_us.append((time.perf_counter() - start) * 1e6)
+        asked.append(question + 1)
+        correct_last += session.differential(1)[0][0] == disease
+
+    print(f"\n{len(rows)} patients, up to {args.questions} questions each "
+          f"(mean {sum(asked) / len(asked):.1f} asked)")
+    print(f"{'':>24} {'p50 us':>8} {'p99 us':>8}")
+    print(f"{'session step':>24} {percentile(step_us, 0.5):8.1f} {percentile(step_us, 0.99):8.1f}")
+    print(f"{'assess_patient re-run':>24} {percentile(rerun_us, 0.5):8.1f} {percentile(rerun_us, 0.99):8.1f}")
+    print(f"top-1 accuracy: {correct_first / len(rows):.1%} after the first symptom, "
+          f"{correct_last / len(rows):.1%} after the questions")
+
+
+if __name__ == "__main__":
+    main()
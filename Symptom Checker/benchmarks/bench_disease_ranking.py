@@ -0,0 +1,63 @@
+# benchmarks/bench_disease_ranking.py
+"""
+Compares the decision-tree and inverted-index ranking paths of DiseasePredictor on dataset.csv.
+
+Each query is a dataset row with a random fraction of its symptoms dropped, so the
+benchmark measures how well each path copes with incomplete intake forms.
+
+Run from the project root:
+    python -m benchmarks.bench_disease_ranking --queries 2000 --keep 0.5
+"""
+import argparse
+import random
+import time
+
+from symptom_checker.data_loader import MedicalDataLoader
+from symptom_checker.disease_predictor import DiseasePredictor, PREDICTION_METHODS
+
+
+def make_queries(X_train, y_train, n, keep, rng):
+    columns = X_train.columns.to_numpy()
+    values = X_train.to_numpy()
+    queries = []
+    for row in rng.sample(range(len(values)), min(n, len(values))):
+        symptoms = list(columns[values[row] > 0])
+        kept = rng.sample(symptoms, max(1, round(len(symptoms) * keep)))
+        queries.append((kept, y_train.iloc[row]))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--keep', type=float, default=0.5, help="Fraction of each row's symptoms kept.")
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    loader = MedicalDataLoader(args.data_path)
+    loader.load_and_process_data()
+    data = loader.get_processed_data()
+    predictor = DiseasePredictor()
+    predictor.train(data['X_train'], data['y_train'])
+    queries = make_queries(data['X_train'], data['y_train'], args.queries, args.keep, random.Random(args.seed))
+
+    print(f"\n{len(queries)} queries, keeping {args.keep:.0%} of symptoms, k={args.k}")
+    print(f"{'method':>7} {'mean us':>9} {'p95 us':>8} {'top-1':>7} {'top-k':>7}")
+    for method in PREDICTION_METHODS:
+        latencies, top1, topk = [], 0, 0
+        for symptoms, disease in queries:
+            start = time.perf_counter()
+            ranked = predictor.rank(symptoms, k=args.k, method=method)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            names = [name for name, _ in ranked]
+            top1 += bool(names) and names[0] == disease
+            topk += disease in names
+        latencies.sort()
+        print(f"{method:>7} {sum(latencies) / len(latencies):9.1f} {latencies[int(len(latencies) * 0.95)]:8.1f} "
+              f"{top1 / len(queries):7.1%} {topk / len(queries):7.1%}")
+
+
+if __name__ == "__main__":
+    main()
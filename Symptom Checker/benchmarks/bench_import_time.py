@@ -0,0 +1,73 @@
+# benchmarks/bench_import_time.py
+"""
+Import-time budget guard for the lightweight core.
+
+Each target is imported in a fresh interpreter under `python -X importtime`; the
+cumulative time of the target module is compared with its budget, and the modules it
+must not pull in (pandas, sklearn, the RAG clients, ...) are checked in sys.modules.
+Exits with status 1 when any budget or exclusion is violated.
+
+Run from the project root:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --scale 2    # looser budgets on slow machines
+"""
+import argparse
+import subprocess
+import sys
+
+# module -> (budget in ms, top-level packages that must not be imported)
+BUDGETS = {
+    'symptom_checker': (20, ('numpy', 'pandas', 'sklearn', 'scipy', 'groq', 'serpapi', 'httpx', 'dotenv')),
+    'symptom_checker.triage_rules': (250, ('pandas', 'sklearn', 'scipy', 'groq', 'serpapi', 'httpx')),
+    'symptom_checker.triage_system': (500, ('pandas', 'sklearn', 'scipy', 'groq', 'serpapi', 'httpx', 'dotenv')),
+    'symptom_checker.rag_precaution_fetcher': (50, ('groq', 'serpapi', 'dotenv')),
+}
+
+# A plain import statement (importlib.import_module is not reported by -X importtime)
+PROBE = (
+    "import sys; exec('import ' + sys.argv[1]); "
+    "print(','.join(sorted({name.split('.')[0] for name in sys.modules})))"
+)
+
+
+def measure(module, repeat):
+    """Best cumulative import time (ms) of `module` and the top-level packages it loaded."""
+    best, loaded = float('inf'), set()
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE, module],
+                              capture_output=True, text=True, check=True)
+        for line in proc.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].strip() == module:
+                best = min(best, int(parts[1]) / 1000)
+        loaded = set(proc.stdout.strip().split(','))
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every budget by this factor.")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':>40} {'ms':>8} {'budget':>8}  forbidden imports")
+    for module, (budget, forbidden) in BUDGETS.items():
+        ms, loaded = measure(module, args.repeat)
+        leaked = sorted(set(forbidden) & loaded)
+        budget *= args.scale
+        print(f"{module:>40} {ms:8.1f} {budget:8.0f}  {', '.join(leaked) or '-'}")
+        if ms > budget:
+            failures.append(f"{module} took {ms:.1f} ms (budget {budget:.0f} ms)")
+        if leaked:
+            failures.append(f"{module} imported {', '.join(leaked)}")
+
+    if failures:
+        print("\n❌ " + "\n❌ ".join(failures))
+        sys.exit(1)
+    print("\n✅ All import budgets met.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/bench_rag_fetcher.py
+"""
+Offline load test of the RAG precaution fetchers over record/replay backends.
+
+Requests for diseases drawn from a skewed (Zipf) popularity distribution are sent by
+`--concurrency` concurrent clients, through the thread-pooled synchronous fetcher and
+through the asyncio fetcher (which coalesces concurrent misses). Replayed upstream
+calls get the configured latency, slow tail and error rate, with a fixed seed so runs
+are comparable. Reports throughput, latency percentiles, cache hit rate, upstream calls
+and injected failures.
+
+Without --cassettes, a cassette is first recorded from the local stand-in backends
+(LocalSearch / LocalSummarizer over the precaution data) into a temporary directory.
+To replay real responses, record them once with `python main.py --rag-record DIR`.
+
+Run from the project root:
+    python -m benchmarks.bench_rag_fetcher --requests 2000 --concurrency 16
+    python -m benchmarks.bench_rag_fetcher --cassettes artifacts/rag_cassettes/ --error-rate 0.05
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from symptom_checker.async_rag_precaution_fetcher import AsyncRAGPrecautionFetcher
+from symptom_checker.cache import MemoryCache
+from symptom_checker.data_loader import MedicalDataLoader
+from symptom_checker.rag_backends import LocalSearch, LocalSummarizer, replay_backends
+from symptom_checker.rag_precaution_fetcher import RAGPrecautionFetcher
+
+
+def record_local_cassettes(directory, precaution_mapping):
+    """Records one search and one summary per disease from the local backends."""
+    search, llm = replay_backends(directory, 'record', LocalSearch(precaution_mapping), LocalSummarizer())
+    fetcher = RAGPrecautionFetcher(search_backend=search, llm_backend=llm)
+    for disease in precaution_mapping:
+        fetcher.fetch_precautions(disease)
+
+
+def zipf_workload(diseases, n, exponent, rng):
+    weights = [1 / (rank + 1) ** exponent for rank in range(len(diseases))]
+    order = rng.sample(diseases, len(diseases))
+    return rng.choices(order, weights, k=n)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_sync(workload, backends, fallback, concurrency):
+    fetcher = RAGPrecautionFetcher(search_backend=backends[0], llm_backend=backends[1],
+                                   cache=MemoryCache(), fallback=fallback)
+
+    def timed(disease):
+        start = time.perf_counter()
+        fetcher.fetch_precautions(disease)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(timed, workload))
+    return time.perf_counter() - start, latencies, fetcher.cache.stats()
+
+
+async def _run_async(workload, backends, precaution_mapping, concurrency):
+    fetcher = AsyncRAGPrecautionFetcher(search_backend=backends[0], llm_backend=backends[1],
+                                        fallback=LocalSummarizer(precaution_mapping), max_concurrency=concurrency,
+                                        cache=MemoryCache())
+    clients = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed(disease):
+        async with clients:
+            start = time.perf_counter()
+            await fetcher.fetch_precautions(disease)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(disease) for disease in workload))
+    elapsed = time.perf_counter() - start
+    await fetcher.aclose()
+    return elapsed, latencies, fetcher.cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--cassettes', default=None, help="Directory with search.json and llm.json cassettes.")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--zipf', type=float, default=1.1, help="Popularity skew of the requested diseases.")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every replayed call.")
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--slow-rate', type=float, default=0.02)
+    parser.add_argument('--slow-latency', type=float, default=1.0)
+    parser.add_argument('--error-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    loader = MedicalDataLoader(args.data_path)
+    loader.load_and_process_data()
+    precaution_mapping = loader.get_processed_data()['precaution_mapping']
+
+    cassettes = args.cassettes
+    if cassettes is None:
+        cassettes = tempfile.mkdtemp(prefix='rag_cassettes_')
+        record_local_cassettes(cassettes, precaution_mapping)
+
+    faults = dict(latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate,
+                  slow_latency=args.slow_latency, error_rate=args.error_rate, seed=args.seed)
+    workload = zipf_workload(sorted(precaution_mapping), args.requests, args.zipf, random.Random(args.seed))
+
+    print(f"\n{len(workload)} requests over {len(set(workload))} diseases, {args.concurrency} concurrent clients")
+    print(f"{'fetcher':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'hit rate':>9} "
+          f"{'upstream':>9} {'failures':>9}")
+    runs = {
+        'sync': lambda backends: run_sync(workload, backends, LocalSummarizer(precaution_mapping), args.concurrency),
+        'async': lambda backends: asyncio.run(_run_async(workload, backends, precaution_mapping, args.concurrency)),
+    }
+    for name, run in runs.items():
+        # Fresh backends per run so both see the same seeded fault sequence
+        backends = replay_backends(cassettes, **faults)
+        elapsed, latencies, cache_stats = run(backends)
+        upstream = sum(backend.calls for backend in backends)
+        failures = sum(backend.failures for backend in backends)
+        print(f"{name:>8} {len(latencies) / elapsed:9.0f} {percentile(latencies, 0.5) * 1e3:8.2f} "
+              f"{percentile(latencies, 0.99) * 1e3:8.2f} {max(latencies) * 1e3:8.2f} "
+              f"{cache_stats['hit_rate']:9.1%} {upstream:9d} {failures:9d}")
+
+
+if __name__ == "__main__":
+    main()
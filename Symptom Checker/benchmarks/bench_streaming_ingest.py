@@ -0,0 +1,73 @@
+# benchmarks/bench_streaming_ingest.py
+"""
+Peak-memory benchmark: in-memory loading + training versus streaming, chunked
+ingestion into the columnar store + out-of-core training, on synthetic datasets.
+
+Peak memory is measured with tracemalloc (numpy and pandas buffers are traced,
+memory-mapped store pages are not), so the streaming column should stay flat as
+the row count grows.
+
+Run from the project root:
+    python -m benchmarks.bench_streaming_ingest --rows 50000 200000 1000000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from symptom_checker.data_loader import MedicalDataLoader
+from symptom_checker.model_artifact import train_predictor
+
+from .synthetic import write_synthetic_data_dir
+
+
+def measure(func):
+    """Returns (wall-clock seconds, peak traced MB) of one call."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1e6
+
+
+def in_memory(data_path):
+    loader = MedicalDataLoader(data_path)
+    loader.load_and_process_data()
+    train_predictor(loader.get_processed_data())
+
+
+def streaming(data_path, store_dir, chunk_size):
+    loader = MedicalDataLoader(data_path, store_dir, chunk_size)
+    loader.load_and_process_data()
+    train_predictor(loader.get_processed_data(), chunk_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--rows', type=int, nargs='+', default=[50000, 200000])
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = write_synthetic_data_dir(args.data_path, tmp, rows, args.seed) + os.sep
+            memory_time, memory_peak = measure(lambda: in_memory(data_path))
+            stream_time, stream_peak = measure(
+                lambda: streaming(data_path, os.path.join(tmp, 'columnar'), args.chunk_size))
+            results.append((rows, memory_time, memory_peak, stream_time, stream_peak))
+
+    print(f"\n{'rows':>9} {'in-memory (s)':>14} {'peak MB':>9} {'streaming (s)':>14} {'peak MB':>9}")
+    for rows, memory_time, memory_peak, stream_time, stream_peak in results:
+        print(f"{rows:>9} {memory_time:14.2f} {memory_peak:9.1f} {stream_time:14.2f} {stream_peak:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_symptom_matcher.py
+"""
+Benchmarks SymptomMatcher against the legacy linear-scan SymptomValidator.validate.
+
+Run from the project root:
+    python -m benchmarks.bench_symptom_matcher --bulk 100000
+"""
+import argparse
+import random
+import timeit
+
+from symptom_checker.data_loader import MedicalDataLoader
+from symptom_checker.symptom_matcher import SymptomMatcher
+from symptom_checker.symptom_validator import SymptomValidator
+
+
+def make_typo(symptom, rng):
+    """Drops, duplicates or swaps one character and swaps underscores for spaces."""
+    chars = list(symptom.replace('_', ' '))
+    i = rng.randrange(len(chars) - 1)
+    op = rng.choice(('drop', 'dup', 'swap'))
+    if op == 'drop':
+        del chars[i]
+    elif op == 'dup':
+        chars.insert(i, chars[i])
+    else:
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return ''.join(chars)
+
+
+def per_call_us(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--bulk', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    loader = MedicalDataLoader(args.data_path)
+    loader.load_and_process_data()
+    all_symptoms = loader.get_processed_data()['all_symptoms']
+    matcher = SymptomMatcher(all_symptoms)
+    rng = random.Random(args.seed)
+
+    exact = all_symptoms[-1]
+    typo = make_typo(exact, rng)
+    print(f"\nSingle lookups ({len(all_symptoms)} symptoms)")
+    print(f"  legacy validate, exact     : {per_call_us(lambda: SymptomValidator.validate([exact], all_symptoms), 20000):8.2f} us")
+    print(f"  matcher, exact             : {per_call_us(lambda: matcher.match(exact), 20000):8.2f} us")
+    print(f"  matcher, spacing variant   : {per_call_us(lambda: matcher.match(exact.replace('_', ' ')), 20000):8.2f} us")
+    print(f"  matcher, typo (cold)       : {per_call_us(lambda: matcher._fuzzy_match(typo), 2000):8.2f} us")
+    print(f"  matcher, typo (warm)       : {per_call_us(lambda: matcher.match(typo), 20000):8.2f} us")
+
+    inputs = []
+    for _ in range(args.bulk):
+        symptom = rng.choice(all_symptoms)
+        inputs.append(symptom if rng.random() < 0.8 else make_typo(symptom, rng))
+    expected = [s if s in all_symptoms else None for s in inputs]
+
+    legacy = per_call_us(lambda: SymptomValidator.validate(inputs, all_symptoms), 1) * 1e-6
+    bulk = per_call_us(lambda: SymptomMatcher(all_symptoms).match_many(inputs), 1) * 1e-6
+    matches = matcher.match_many(inputs)
+    recovered = sum(1 for m, e in zip(matches, expected) if e is None and m is not None)
+    typos = sum(1 for e in expected if e is None)
+    print(f"\nBulk lookups ({args.bulk} inputs, ~20% typos)")
+    print(f"  legacy validate            : {legacy:8.3f} s")
+    print(f"  matcher (cold cache)       : {bulk:8.3f} s")
+    print(f"  typos recovered by matcher : {recovered}/{typos}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# benchmarks/suite.py
+"""
+Reproducible, fully offline benchmark suite for the triage pipeline.
+
+Measures data loading, model training, single and batch prediction latency and
+end-to-end assess_patient throughput (with the RAG fetcher on the local search and
+summarizer backends) on a synthetic dataset generated from the real dataset.csv
+vocabulary. Results are written as JSON; pass --compare to check them against an
+earlier run. Only typical latency (p50) and throughput gate the comparison: p99 over a
+couple of thousand samples moves by more than any sensible threshold between identical
+runs, so it is reported but never counted as a regression.
+
+Run from the project root:
+    python -m benchmarks.suite --rows 50000 --output bench_results.json
+    python -m benchmarks.suite --rows 50000 --compare bench_results.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from symptom_checker.cache import MemoryCache
+from symptom_checker.data_loader import MedicalDataLoader
+from symptom_checker.disease_predictor import DiseasePredictor
+from symptom_checker.feature_matrix import binarize, build_symptom_matrix
+from symptom_checker.model_artifact import ModelArtifactStore
+from symptom_checker.rag_backends import LocalSearch, LocalSummarizer
+from symptom_checker.triage_system import RAGOptions, ServingOptions, TriageSystem
+
+from .synthetic import sample_patients, write_synthetic_data_dir
+
+# Metric name -> whether a higher value is better
+METRICS = {
+    'load_s': False,
+    'train_s': False,
+    'predict_single_p50_us': False,
+    'predict_single_p99_us': False,
+    'predict_batch_rows_per_s': True,
+    'assess_p50_us': False,
+    'assess_p99_us': False,
+    'assess_per_s': True,
+    'assess_batch_rows_per_s': True,
+}
+
+# Tail metrics that are reported in a comparison but never fail it
+REPORT_ONLY = {'predict_single_p99_us', 'assess_p99_us'}
+
+
+def best_of(repeat, func):
+    """Runs func `repeat` times; returns (best wall-clock seconds, last result)."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def percentiles_us(samples):
+    samples = sorted(samples)
+    return (samples[len(samples) // 2] * 1e6, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6)
+
+
+def time_each(func, inputs):
+    samples = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_suite(data_path, rows, queries, batch_size, repeat, seed, method):
+    results = {}
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic_path = write_synthetic_data_dir(data_path, tmp, rows, seed) + os.sep
+
+        def load():
+            loader = MedicalDataLoader(synthetic_path)
+            loader.load_and_process_data()
+            return loader.get_processed_data()
+
+        results['load_s'], data = best_of(repeat, load)
+
+        def train():
+            predictor = DiseasePredictor()
+            predictor.train(data['X_train'], data['y_train'])
+            return predictor
+
+        results['train_s'], predictor = best_of(repeat, train)
+
+        patients = sample_patients(data['all_symptoms'], queries, rng)
+        time_each(lambda p: predictor.rank(p, k=1, method=method), patients[:100])
+        p50, p99 = percentiles_us(time_each(lambda p: predictor.rank(p, k=1, method=method), patients))
+        results['predict_single_p50_us'], results['predict_single_p99_us'] = p50, p99
+
+        batch = sample_patients(data['all_symptoms'], batch_size, rng)
+        matrix = binarize(build_symptom_matrix(batch, data['symptom_index']))
+        seconds, _ = best_of(repeat, lambda: predictor.predict_many(matrix, method=method))
+        results['predict_batch_rows_per_s'] = batch_size / seconds
+
+        precaution_mapping = data['precaution_mapping']
+        system = TriageSystem(
+            store=ModelArtifactStore(synthetic_path, os.path.join(tmp, 'artifacts')),
+            rag=RAGOptions(offline=False, cache=MemoryCache(), search_backend=LocalSearch(precaution_mapping),
+                           llm_backend=LocalSummarizer()),
+            serving=ServingOptions(prediction_method=method),
+        )
+        time_each(system.assess_patient, patients[:100])  # warm up matcher caches and code paths
+        samples = time_each(system.assess_patient, patients)
+        results['assess_p50_us'], results['assess_p99_us'] = percentiles_us(samples)
+        results['assess_per_s'] = len(samples) / sum(samples)
+
+        seconds, _ = best_of(repeat, lambda: system.assess_patients(batch))
+        results['assess_batch_rows_per_s'] = batch_size / seconds
+    return results
+
+
+def compare(current, baseline, threshold):
+    """
+    Returns (report lines, regressions) for metrics that got worse by more than
+    `threshold`; REPORT_ONLY metrics are listed but never count as regressions.
+    """
+    lines, regressions = [], []
+    for name, higher_is_better in METRICS.items():
+        if name not in baseline or name not in current:
+            continue
+        old, new = baseline[name], current[name]
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        flag = 'REGRESSION' if worse > threshold else ('improved' if worse < -threshold else '')
+        if name in REPORT_ONLY and flag:
+            flag = f'({"slower" if flag == "REGRESSION" else flag}, not gated)'
+        lines.append(f"{name:>26} {old:14.3f} {new:14.3f} {change:+8.1%} {flag}")
+        if flag == 'REGRESSION':
+            regressions.append(name)
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-path', default='data/')
+    parser.add_argument('--rows', type=int, default=50000, help="Synthetic dataset size.")
+    parser.add_argument('--queries', type=int, default=2000, help="Single-request samples.")
+    parser.add_argument('--batch-size', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--method', default='index', choices=('tree', 'index'))
+    parser.add_argument('--output', help="Write results JSON here.")
+    parser.add_argument('--compare', help="Baseline results JSON to compare against.")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (default 20%%).")
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    metrics = run_suite(args.data_path, args.rows, args.queries, args.batch_size, args.repeat, args.seed, args.method)
+    report = {
+        'meta': {
+            'rows': args.rows, 'queries': args.queries, 'batch_size': args.batch_size,
+            'repeat': args.repeat, 'seed': args.seed, 'method': args.method,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__,
+            'cpu_count': os.cpu_count(),
+        },
+        'metrics': metrics,
+    }
+
+    print(f"\n{'metric':>26} {'value':>14}")
+    for name, value in metrics.items():
+        print(f"{name:>26} {value:14.3f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('rows') != args.rows or baseline['meta'].get('method') != args.method:
+            print("⚠️ Baseline was recorded with different --rows/--method; comparison may be meaningless.")
+        lines, regressions = compare(metrics, baseline['metrics'], args.threshold)
+        print(f"\n{'metric':>26} {'baseline':>14} {'current':>14} {'change':>8}")
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n❌ {len(regressions)} metric(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
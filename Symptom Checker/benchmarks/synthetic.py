@@ -0,0 +1,53 @@
+# benchmarks/synthetic.py
+"""Synthetic dataset generation from the real dataset.csv vocabulary."""
+import os
+import random
+import shutil
+
+import pandas as pd
+
+LOOKUP_FILES = ('symptom_Description.csv', 'symptom_precaution.csv', 'symptom_severity.csv')
+MAX_SYMPTOMS = 17
+
+
+def load_profiles(source_path):
+    """Returns (disease, [raw symptom strings]) for every row of the real dataset."""
+    main_df = pd.read_csv(os.path.join(source_path, 'dataset.csv'))
+    symptom_columns = [col for col in main_df.columns if col.startswith('Symptom_')]
+    return [
+        (row[0], [s for s in row[1:] if isinstance(s, str)])
+        for row in main_df[['Disease'] + symptom_columns].itertuples(index=False)
+    ]
+
+
+def generate_rows(profiles, n_rows, rng, drop_rate=0.15, noise_rate=0.05):
+    """
+    Samples real disease profiles and perturbs them: each symptom is dropped with
+    `drop_rate` and one random vocabulary symptom is added with `noise_rate`.
+    Raw spellings (leading spaces, odd underscores) are kept so the loader's
+    normalization is exercised exactly as with the real file.
+    """
+    vocabulary = sorted({s for _, symptoms in profiles for s in symptoms})
+    for _ in range(n_rows):
+        disease, symptoms = rng.choice(profiles)
+        kept = [s for s in symptoms if rng.random() >= drop_rate] or symptoms[:1]
+        if rng.random() < noise_rate:
+            kept.append(rng.choice(vocabulary))
+        kept = list(dict.fromkeys(kept))[:MAX_SYMPTOMS]
+        yield [disease] + kept + [None] * (MAX_SYMPTOMS - len(kept))
+
+
+def write_synthetic_data_dir(source_path, target_dir, n_rows, seed=0):
+    """Writes a data directory with an `n_rows` synthetic dataset.csv and the real lookup CSVs."""
+    rng = random.Random(seed)
+    columns = ['Disease'] + [f'Symptom_{i}' for i in range(1, MAX_SYMPTOMS + 1)]
+    rows = list(generate_rows(load_profiles(source_path), n_rows, rng))
+    pd.DataFrame(rows, columns=columns).to_csv(os.path.join(target_dir, 'dataset.csv'), index=False)
+    for name in LOOKUP_FILES:
+        shutil.copy(os.path.join(source_path, name), os.path.join(target_dir, name))
+    return target_dir
+
+
+def sample_patients(all_symptoms, n, rng, min_symptoms=1, max_symptoms=6):
+    """Random patient symptom lists drawn from the canonical vocabulary."""
+    return [rng.sample(all_symptoms, rng.randint(min_symptoms, max_symptoms)) for _ in range(n)]
@@ -1,13 +1,135 @@
 # main.py
+import argparse
+import logging
 import os
 from dotenv import load_dotenv
-from symptom_checker.triage_system import TriageSystem
+from symptom_checker.disease_predictor import DEFAULT_PREDICTION_METHOD, PREDICTION_METHODS
+from symptom_checker.estimators import ESTIMATORS
+from symptom_checker.model_artifact import ModelArtifactStore
+from symptom_checker.precaution_index import PrecautionIndex, refresh_precaution_index
+from symptom_checker.triage_system import RAGOptions, ServingOptions, TriageSystem
 import pprint
 
+
+def warm_artifact(data_path='data/', artifact_dir='artifacts/', columnar_dir=None, chunk_size=None, estimator=None):
+    """
+    Builds (or verifies) the model artifact ahead of time so app workers start instantly.
+    """
+    return ModelArtifactStore(data_path, artifact_dir, columnar_dir, chunk_size, estimator).load_or_build()
+
+
+def ingest_columnar(data_path='data/', columnar_dir='artifacts/columnar/', chunk_size=None, artifact_dir='artifacts/'):
+    """
+    Converts the CSVs into the memory-mapped columnar store (a no-op when it is current).
+    With chunk_size set, dataset.csv is streamed in chunks so memory stays bounded.
+    """
+    from symptom_checker.data_loader import MedicalDataLoader
+
+    registry = ModelArtifactStore(data_path, artifact_dir).registry()
+    data_loader = MedicalDataLoader(data_path, columnar_dir, chunk_size, registry)
+    data_loader.load_and_process_data()
+    return data_loader.get_processed_data()
+
+
+def select_model(data_path='data/', artifact_dir='artifacts/', columnar_dir=None, estimators=None,
+                 folds=5, n_jobs=-1):
+    """
+    Cross-validates the registered estimators in parallel, prints the accuracy/latency
+    report and saves the chosen model as the artifact TriageSystem loads (it serves
+    predictions with prediction_method='tree').
+    """
+    from symptom_checker.data_loader import MedicalDataLoader
+    from symptom_checker.model_selection import candidate_grid, format_report, select_predictor
+
+    store = ModelArtifactStore(data_path, artifact_dir, columnar_dir)
+    data_loader = MedicalDataLoader(data_path, columnar_dir, registry=store.registry())
+    data_loader.load_and_process_data()
+    processed_data = data_loader.get_processed_data()
+    predictor, chosen, results = select_predictor(processed_data, candidate_grid(estimators), folds, n_jobs)
+    print(format_report(results, chosen))
+    print("Serve the chosen model with --prediction-method tree (the default ranks with the symptom index).")
+    return store.save(processed_data, predictor)
+
+
+def refresh_precautions(serp_api_key, groq_api_key, data_path='data/', artifact_dir='artifacts/',
+                        index_path='artifacts/precaution_index.json', max_age_hours=None, workers=4):
+    """
+    Offline job: (re)builds the precomputed precaution index for every known disease.
+    """
+    from symptom_checker.rag_precaution_fetcher import RAGPrecautionFetcher
+
+    artifact = warm_artifact(data_path, artifact_dir)
+    diseases = sorted(artifact['processed_data']['description_mapping'])
+    fetcher = RAGPrecautionFetcher(serp_api_key, groq_api_key)
+    index = PrecautionIndex(index_path).load()
+    max_age = max_age_hours * 3600 if max_age_hours is not None else None
+    return refresh_precaution_index(fetcher, diseases, index, max_age=max_age, max_workers=workers)
+
+
 def main():
     """
     Main function to initialize and run the symptom checker.
     """
+    parser = argparse.ArgumentParser(description="Medical Symptom Checker CLI")
+    parser.add_argument("--warm", action="store_true",
+                        help="Build the model artifact for the current data and exit.")
+    parser.add_argument("--data-path", default="data/")
+    parser.add_argument("--artifact-dir", default="artifacts/")
+    parser.add_argument("--ingest", action="store_true",
+                        help="Convert the CSVs into the memory-mapped columnar store and exit.")
+    parser.add_argument("--columnar-dir", default=None,
+                        help="Load the dataset from this memory-mapped columnar store (built on first use).")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Stream dataset.csv and train out-of-core, this many rows at a time "
+                             "(uses --columnar-dir, default artifacts/columnar/).")
+    parser.add_argument("--estimator", default=None, choices=tuple(ESTIMATORS),
+                        help="Classifier to train (default: tree, or naive_bayes with --chunk-size).")
+    parser.add_argument("--select-model", action="store_true",
+                        help="Cross-validate the registered estimators, save the best one as the artifact and exit.")
+    parser.add_argument("--candidates", nargs="+", default=None, choices=tuple(ESTIMATORS),
+                        help="Estimators to include in --select-model (default: all).")
+    parser.add_argument("--prediction-method", default=DEFAULT_PREDICTION_METHOD, choices=PREDICTION_METHODS,
+                        help="'index' ranks a full differential; 'tree' serves the trained (or selected) classifier.")
+    parser.add_argument("--cv-folds", type=int, default=5)
+    parser.add_argument("--cv-jobs", type=int, default=-1, help="Parallel CV jobs (-1 uses every core).")
+    parser.add_argument("--refresh-precautions", action="store_true",
+                        help="Refresh the precomputed precaution index and exit.")
+    parser.add_argument("--precaution-index", default=None,
+                        help="Serve precautions from this index instead of live RAG calls.")
+    parser.add_argument("--max-age-hours", type=float, default=None,
+                        help="Only refresh index entries older than this many hours "
+                             "(missing entries are always fetched).")
+    parser.add_argument("--policy", default=None,
+                        help="Triage policy JSON (thresholds, red flags); reloaded when the file changes.")
+    parser.add_argument("--offline", action="store_true",
+                        help="Never call SerpAPI/Groq; precautions come from the index or local data.")
+    parser.add_argument("--rag-replay", default=None, metavar="DIR",
+                        help="Serve SerpAPI/Groq responses from the record/replay cassettes in DIR (no keys needed).")
+    parser.add_argument("--rag-record", default=None, metavar="DIR",
+                        help="Call SerpAPI/Groq and record responses missing from the cassettes in DIR.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--log-level", default="INFO", help="Logging level (DEBUG shows per-request steps).")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Print per-stage latency metrics after the example assessment.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(message)s")
+    if args.chunk_size and not args.columnar_dir:
+        args.columnar_dir = 'artifacts/columnar/'
+
+    if args.ingest:
+        ingest_columnar(args.data_path, args.columnar_dir or 'artifacts/columnar/', args.chunk_size, args.artifact_dir)
+        return
+
+    if args.select_model:
+        select_model(args.data_path, args.artifact_dir, args.columnar_dir, args.candidates,
+                     args.cv_folds, args.cv_jobs)
+        return
+
+    if args.warm:
+        warm_artifact(args.data_path, args.artifact_dir, args.columnar_dir, args.chunk_size, args.estimator)
+        return
+
     # Load environment variables from .env file
     # Ensure you have a 'safe.env' file with your SERP_API_KEY and GROQ_API_KEY
     load_dotenv(dotenv_path='safe.env')
@@ -15,15 +137,47 @@ def main():
     serp_api_key = os.getenv("SERP_API_KEY")
     groq_api_key = os.getenv("GROQ_API_KEY")
 
-    if not serp_api_key or not groq_api_key:
-        print("❌ API Keys are missing! Please create a 'safe.env' file with SERP_API_KEY and GROQ_API_KEY.")
+    if args.refresh_precautions:
+        if not serp_api_key or not groq_api_key:
+            print("❌ API Keys are missing! Please create a 'safe.env' file with SERP_API_KEY and GROQ_API_KEY.")
+            return
+        refresh_precautions(
+            serp_api_key, groq_api_key, args.data_path, args.artifact_dir,
+            index_path=args.precaution_index or 'artifacts/precaution_index.json',
+            max_age_hours=args.max_age_hours, workers=args.workers
+        )
         return
 
+    search_backend = llm_backend = None
+    if args.rag_record:
+        if not serp_api_key or not groq_api_key:
+            print("❌ API Keys are missing! Recording needs SERP_API_KEY and GROQ_API_KEY in 'safe.env'.")
+            return
+        from symptom_checker.rag_backends import GroqLLM, SerpAPISearch, replay_backends
+
+        search_backend, llm_backend = replay_backends(
+            args.rag_record, 'auto', SerpAPISearch(serp_api_key), GroqLLM(groq_api_key)
+        )
+    elif args.rag_replay:
+        from symptom_checker.rag_backends import replay_backends
+
+        try:
+            search_backend, llm_backend = replay_backends(args.rag_replay)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return
+
     # Initialize the Triage System (this will load data and train the model)
     try:
         triage_system = TriageSystem(
             serp_api_key=serp_api_key,
-            groq_api_key=groq_api_key
+            groq_api_key=groq_api_key,
+            store=ModelArtifactStore(args.data_path, args.artifact_dir, args.columnar_dir, args.chunk_size,
+                                     args.estimator),
+            rag=RAGOptions(offline=True if args.offline else None, search_backend=search_backend,
+                           llm_backend=llm_backend),
+            serving=ServingOptions(prediction_method=args.prediction_method, policy_path=args.policy,
+                                   precaution_index_path=args.precaution_index)
         )
     except Exception as e:
         print(f"❌ Failed to initialize the Triage System: {e}")
@@ -43,6 +197,9 @@ def main():
     pprint.pprint(result)
     print("-----------------------------\n")
 
+    if args.metrics:
+        print(triage_system.export_metrics())
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,60 @@
+# server.py
+import argparse
+import logging
+import os
+from dotenv import load_dotenv
+from symptom_checker.http_service import TriageService
+from symptom_checker.model_artifact import ModelArtifactStore
+from symptom_checker.triage_system import ServingOptions, TriageSystem
+
+
+def main():
+    """
+    Runs the pre-fork HTTP/JSON triage service.
+    """
+    parser = argparse.ArgumentParser(description="Medical Symptom Checker HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--threads", type=int, default=8, help="Handler threads per worker.")
+    parser.add_argument("--queue-size", type=int, default=64,
+                        help="Queued connections per worker before answering 429.")
+    parser.add_argument("--data-path", default="data/")
+    parser.add_argument("--artifact-dir", default="artifacts/")
+    parser.add_argument("--precaution-index", default=None,
+                        help="Serve precautions from this index instead of live RAG calls.")
+    parser.add_argument("--prediction-method", default="index", choices=("tree", "index"),
+                        help="'index' ranks a full differential; 'tree' uses the trained classifier.")
+    parser.add_argument("--policy", default=None,
+                        help="Triage policy JSON; each worker picks up edits without a restart.")
+    parser.add_argument("--reload-interval", type=float, default=30.0,
+                        help="Seconds between data-change checks (0 disables; SIGHUP always reloads).")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(process)d %(message)s")
+    load_dotenv(dotenv_path='safe.env')
+
+    def build_system():
+        return TriageSystem(
+            serp_api_key=os.getenv("SERP_API_KEY"),
+            groq_api_key=os.getenv("GROQ_API_KEY"),
+            store=ModelArtifactStore(args.data_path, args.artifact_dir),
+            serving=ServingOptions(prediction_method=args.prediction_method, policy_path=args.policy,
+                                   precaution_index_path=args.precaution_index)
+        )
+
+    TriageService(
+        build_system,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        threads=args.threads,
+        queue_size=args.queue_size,
+        data_path=args.data_path,
+        reload_interval=args.reload_interval
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
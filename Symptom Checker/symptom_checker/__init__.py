@@ -1 +1,17 @@
-from .triage_system import TriageSystem
+# Names are resolved on first access (PEP 562) so `import symptom_checker` stays cheap
+# and submodules such as symptom_checker.triage_rules can be used without pulling in
+# the model stack.
+_LAZY_EXPORTS = {
+    'TriageSystem': '.triage_system',
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
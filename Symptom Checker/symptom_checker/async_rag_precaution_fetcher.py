@@ -0,0 +1,189 @@
+# symptom_checker/async_rag_precaution_fetcher.py
+import asyncio
+import logging
+import os
+
+from .cache import MemoryCache
+from .rag_precaution_fetcher import (
+    DEFAULT_SEARCH_TTL, DEFAULT_SUMMARY_TTL, GROQ_MODEL, NO_PRECAUTIONS_FOUND, SERP_ENGINE,
+    SUMMARY_UNAVAILABLE, build_prompt, build_query, join_snippets, organic_results, search_cache_key,
+    summary_cache_key,
+)
+
+logger = logging.getLogger(__name__)
+
+SERP_ENDPOINT = "https://serpapi.com/search"
+
+
+class AsyncRAGPrecautionFetcher:
+    """
+    asyncio counterpart of RAGPrecautionFetcher.
+
+    Search and summarization calls go through pooled async clients, at most
+    `max_concurrency` upstream pipelines run at once, and concurrent requests for the
+    same disease share one in-flight call. Like the synchronous fetcher, empty search
+    results, timeouts and upstream errors return the `fallback` LocalSummarizer's summary
+    (errors are raised instead if `fallback_on_error` is disabled). Search results and
+    summaries go through the same pluggable cache as the synchronous fetcher; lookups in a
+    blocking cache (e.g. SQLiteCache) run in a worker thread so they never stall the loop.
+
+    `http_client`, `llm_client` and `serp_endpoint` can be pointed at local stub servers or
+    fake clients for testing. `search_backend` / `llm_backend` (see rag_backends) replace
+    the SerpAPI / Groq calls altogether, e.g. with record/replay backends for offline load tests.
+    """
+
+    def __init__(self, serp_api_key=None, groq_api_key=None, fallback=None,
+                 max_concurrency=8, search_timeout=10.0, llm_timeout=20.0, fallback_on_error=True,
+                 serp_endpoint=SERP_ENDPOINT, http_client=None, llm_client=None, cache=None,
+                 search_ttl=DEFAULT_SEARCH_TTL, summary_ttl=DEFAULT_SUMMARY_TTL,
+                 search_backend=None, llm_backend=None):
+        self.serp_api_key = serp_api_key or os.getenv("SERP_API_KEY")
+        self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
+
+        if not self.serp_api_key and search_backend is None:
+            raise ValueError("❌ SERP API key is missing!")
+        if not self.groq_api_key and llm_client is None and llm_backend is None:
+            raise ValueError("❌ GROQ API key is missing!")
+
+        self.fallback = fallback
+        self.fallback_on_error = fallback_on_error
+        self.search_timeout = search_timeout
+        self.llm_timeout = llm_timeout
+        self.serp_endpoint = serp_endpoint
+        self.max_concurrency = max_concurrency
+        self.cache = cache if cache is not None else MemoryCache()
+        self.search_ttl = search_ttl
+        self.summary_ttl = summary_ttl
+        self.search_backend = search_backend
+        self.llm_backend = llm_backend
+        self.search_name = search_backend.name if search_backend is not None else SERP_ENGINE
+        self.llm_name = llm_backend.name if llm_backend is not None else GROQ_MODEL
+
+        # The network clients are imported here, not at module import, to keep offline startup
+        # light; with both backends supplied they are not needed at all
+        self.http_client, self.client = http_client, llm_client
+        needs_http = http_client is None and search_backend is None
+        needs_groq = llm_client is None and llm_backend is None
+        if needs_http or needs_groq:
+            import httpx
+
+            limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+            if needs_http:
+                self.http_client = httpx.AsyncClient(limits=limits, timeout=search_timeout)
+            if needs_groq:
+                from groq import AsyncGroq
+
+                self.client = AsyncGroq(
+                    api_key=self.groq_api_key,
+                    timeout=llm_timeout,
+                    http_client=httpx.AsyncClient(limits=limits, timeout=llm_timeout),
+                )
+        self._semaphore = None
+        self._inflight = {}
+
+    async def _cache_get(self, key):
+        if self.cache.blocking:
+            return await asyncio.to_thread(self.cache.get, key)
+        return self.cache.get(key)
+
+    async def _cache_set(self, key, value, ttl):
+        if self.cache.blocking:
+            await asyncio.to_thread(self.cache.set, key, value, ttl)
+        else:
+            self.cache.set(key, value, ttl)
+
+    async def query_serp_api(self, query):
+        """Query SERP API (DuckDuckGo engine) over the pooled HTTP client."""
+        key = search_cache_key(query, self.search_name)
+        cached = await self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        if self.search_backend is not None:
+            results = await asyncio.wait_for(self.search_backend.asearch(query), self.search_timeout)
+        else:
+            results = await self._serp_search(query)
+        # An empty answer is not cached: it may be a transient upstream problem
+        if results:
+            await self._cache_set(key, results, self.search_ttl)
+        return results
+
+    async def _serp_search(self, query):
+        params = {
+            'q': query,
+            'api_key': self.serp_api_key,
+            'engine': SERP_ENGINE,
+            'output': 'json'
+        }
+        response = await asyncio.wait_for(
+            self.http_client.get(self.serp_endpoint, params=params), self.search_timeout
+        )
+        response.raise_for_status()
+        return organic_results(response.json())
+
+    async def summarize_with_groq(self, snippets):
+        """Send SERP snippets to Groq for clean summarization."""
+        if not snippets:
+            return NO_PRECAUTIONS_FOUND
+
+        if self.llm_backend is not None:
+            return await asyncio.wait_for(self.llm_backend.acomplete(build_prompt(snippets)), self.llm_timeout)
+        response = await asyncio.wait_for(
+            self.client.chat.completions.create(
+                model=GROQ_MODEL,
+                messages=[{"role": "user", "content": build_prompt(snippets)}]
+            ),
+            self.llm_timeout,
+        )
+        return response.choices[0].message.content.strip()
+
+    async def fetch_precautions(self, disease):
+        """
+        Fetch & summarize precautions for a predicted disease.
+
+        Callers that ask for a disease whose fetch is already running await the same
+        future instead of issuing duplicate upstream calls.
+        """
+        cached = await self._cache_get(summary_cache_key(disease, self.llm_name))
+        if cached is not None:
+            return cached
+
+        future = self._inflight.get(disease)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_with_fallback(disease))
+            self._inflight[disease] = future
+            future.add_done_callback(lambda _: self._inflight.pop(disease, None))
+        # Shield so one cancelled caller does not cancel the call shared with the others
+        return await asyncio.shield(future)
+
+    async def fetch_many(self, diseases):
+        """Fetches precautions for several diseases concurrently, keyed by disease."""
+        diseases = list(dict.fromkeys(diseases))
+        summaries = await asyncio.gather(*(self.fetch_precautions(d) for d in diseases))
+        return dict(zip(diseases, summaries))
+
+    async def aclose(self):
+        """Closes the pooled HTTP connections."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+        close = getattr(self.client, 'close', None)
+        if close is not None:
+            await close()
+
+    async def _fetch_with_fallback(self, disease):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with self._semaphore:
+                results = await self.query_serp_api(build_query(disease))
+                summary = await self.summarize_with_groq(join_snippets(results))
+        except Exception as e:
+            if not self.fallback_on_error:
+                raise
+            logger.warning("⚠️ Async RAG fetch failed for %s (%s: %s), using local data.", disease, type(e).__name__, e)
+            results, summary = None, SUMMARY_UNAVAILABLE
+        if results:
+            await self._cache_set(summary_cache_key(disease, self.llm_name), summary, self.summary_ttl)
+        elif self.fallback is not None:
+            summary = self.fallback.summarize(disease) or summary
+        return summary
@@ -0,0 +1,165 @@
+# symptom_checker/columnar_store.py
+"""
+Compact on-disk dataset format that worker processes memory-map read-only.
+
+A store directory holds:
+    indptr.npy, indices.npy, data.npy   CSR symptom matrix (symptom IDs as int32 column indices)
+    disease_codes.npy                   categorical disease code per row (uint8/uint16)
+    manifest.json                       vocabulary, disease categories, lookup maps, data hash
+
+Arrays are opened with mmap_mode='r', so every process reading the same store shares
+one page-cache copy instead of holding its own DataFrames.
+"""
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_FORMAT_VERSION = 1
+ARRAY_NAMES = ('indptr', 'indices', 'data', 'disease_codes')
+
+
+def _atomic_save(path, write):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _index_dtype(nnz):
+    # indptr and indices must share one width for scipy to keep the mapped arrays zero-copy
+    return np.int32 if nnz < np.iinfo(np.int32).max else np.int64
+
+
+def _code_dtype(n_diseases):
+    return np.uint8 if n_diseases <= np.iinfo(np.uint8).max + 1 else np.uint16
+
+
+class ColumnarWriter:
+    """
+    Streams CSR row blocks into a store whose row and non-zero counts are known up front.
+
+    The arrays are preallocated as memory-mapped .npy files, so only the block being
+    appended is ever held in memory. Nothing is visible to readers until close().
+    """
+
+    def __init__(self, store_dir, n_rows, nnz, n_diseases):
+        os.makedirs(store_dir, exist_ok=True)
+        self.store_dir = store_dir
+        self.n_rows = n_rows
+        self.nnz = nnz
+        index_dtype = _index_dtype(nnz)
+        shapes = {
+            'indptr': (n_rows + 1, index_dtype),
+            'indices': (nnz, index_dtype),
+            'data': (nnz, np.uint8),
+            'disease_codes': (n_rows, _code_dtype(n_diseases)),
+        }
+        self._tmp_paths = {name: os.path.join(store_dir, f'{name}.npy.{os.getpid()}.tmp') for name in ARRAY_NAMES}
+        self._arrays = {
+            name: np.lib.format.open_memmap(self._tmp_paths[name], mode='w+', dtype=dtype, shape=(max(length, 1),))
+            for name, (length, dtype) in shapes.items()
+        }
+        self._arrays['indptr'][0] = 0
+        self._row = 0
+        self._offset = 0
+
+    def append(self, block, disease_codes):
+        """Writes the next rows: a CSR block and the matching disease codes."""
+        block = sparse.csr_matrix(block)
+        rows, nnz = block.shape[0], block.nnz
+        if self._row + rows > self.n_rows or self._offset + nnz > self.nnz:
+            raise ValueError("Block exceeds the row/non-zero counts the store was sized for.")
+        self._arrays['indices'][self._offset:self._offset + nnz] = block.indices
+        self._arrays['data'][self._offset:self._offset + nnz] = 1
+        self._arrays['indptr'][self._row + 1:self._row + rows + 1] = block.indptr[1:] + self._offset
+        self._arrays['disease_codes'][self._row:self._row + rows] = disease_codes
+        self._row += rows
+        self._offset += nnz
+
+    def close(self, data_hash, all_symptoms, diseases, processed_data):
+        """Publishes the arrays and then the manifest (taking the lookup maps from processed_data)."""
+        if self._row != self.n_rows or self._offset != self.nnz:
+            raise ValueError(f"Store incomplete: {self._row}/{self.n_rows} rows, {self._offset}/{self.nnz} entries.")
+        for array in self._arrays.values():
+            array.flush()
+        self._arrays = {}
+        for name, tmp_path in self._tmp_paths.items():
+            os.replace(tmp_path, os.path.join(self.store_dir, f'{name}.npy'))
+
+        manifest = {
+            'format_version': COLUMNAR_FORMAT_VERSION,
+            'data_hash': data_hash,
+            'n_rows': self.n_rows,
+            'all_symptoms': list(all_symptoms),
+            'diseases': [str(d) for d in diseases],
+            'severity_mapping': processed_data['severity_mapping'],
+            'precaution_mapping': processed_data['precaution_mapping'],
+            'description_mapping': processed_data['description_mapping'],
+        }
+        _atomic_save(os.path.join(self.store_dir, 'manifest.json'),
+                     lambda f: f.write(json.dumps(manifest, ensure_ascii=False).encode('utf-8')))
+        logger.info("💾 Columnar dataset (%d rows, %d symptom entries) written to %s",
+                    self.n_rows, self.nnz, self.store_dir)
+
+
+def write_columnar_dataset(processed_data, store_dir, data_hash):
+    """Writes processed loader output to `store_dir`; the manifest goes last to mark completion."""
+    X = processed_data['X_train']
+    matrix = sparse.csr_matrix(X.to_numpy() if hasattr(X, 'to_numpy') else X, dtype=np.uint8)
+    diseases, codes = np.unique(np.asarray(processed_data['y_train'], dtype=object), return_inverse=True)
+    writer = ColumnarWriter(store_dir, matrix.shape[0], matrix.nnz, len(diseases))
+    writer.append(matrix, codes)
+    writer.close(data_hash, processed_data['all_symptoms'], diseases, processed_data)
+
+
+def iter_row_blocks(X_train, y_train, chunk_rows):
+    """
+    Yields (CSR block, disease code array) slices of a loaded dataset, chunk_rows at a
+    time; with a memory-mapped store only the current slice is paged in.
+    """
+    codes = np.asarray(y_train.cat.codes)
+    for start in range(0, X_train.shape[0], chunk_rows):
+        yield X_train[start:start + chunk_rows], codes[start:start + chunk_rows]
+
+
+def load_columnar_dataset(store_dir, data_hash=None):
+    """
+    Memory-maps a columnar store into the loader's processed_data layout.
+
+    Returns None if the store is missing, has another format version, or was built from
+    data with a different content hash.
+    """
+    manifest_path = os.path.join(store_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != COLUMNAR_FORMAT_VERSION:
+        return None
+    if data_hash is not None and manifest.get('data_hash') != data_hash:
+        return None
+
+    arrays = {name: np.load(os.path.join(store_dir, f'{name}.npy'), mmap_mode='r') for name in ARRAY_NAMES}
+    all_symptoms = manifest['all_symptoms']
+    n_rows = manifest['n_rows']
+    nnz = int(arrays['indptr'][n_rows])
+    X_train = sparse.csr_matrix(
+        (arrays['data'][:nnz], arrays['indices'][:nnz], arrays['indptr']),
+        shape=(n_rows, len(all_symptoms)), copy=False,
+    )
+    y_train = pd.Series(pd.Categorical.from_codes(arrays['disease_codes'][:n_rows], categories=manifest['diseases']))
+    return {
+        'all_symptoms': all_symptoms,
+        'symptom_index': {symptom: i for i, symptom in enumerate(all_symptoms)},
+        'X_train': X_train,
+        'y_train': y_train,
+        'severity_mapping': manifest['severity_mapping'],
+        'precaution_mapping': manifest['precaution_mapping'],
+        'description_mapping': manifest['description_mapping'],
+    }
@@ -0,0 +1,15 @@
+# symptom_checker/data_hash.py
+import glob
+import hashlib
+import os
+
+
+def compute_data_hash(data_path='data/'):
+    """Returns a SHA-256 content hash over every CSV file in the data directory."""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(data_path, '*.csv'))):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
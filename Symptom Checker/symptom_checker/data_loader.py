@@ -1,86 +1,241 @@
 # symptom_checker/data_loader.py
+import logging
+
+import numpy as np
 import pandas as pd
+from scipy import sparse
+
+from .columnar_store import ColumnarWriter, load_columnar_dataset, write_columnar_dataset
+from .data_hash import compute_data_hash
+
+logger = logging.getLogger(__name__)
+
+# Row width used to pack (row, symptom code) pairs into one int64 key
+_PAIR_KEY_WIDTH = 1 << 32
+
+
+def normalize_symptom_column(column):
+    """Normalizes a column of raw symptom strings to the canonical snake_case form."""
+    return column.str.strip().str.lower().str.replace(' ', '_').replace('__', '_')
+
+
+def _symptom_pairs(chunk, symptom_columns, raw_to_code):
+    """
+    Returns the deduplicated (row, symptom code) pairs of a dataset chunk sorted in CSR
+    order; `raw_to_code` maps each distinct raw cell value to its symptom code.
+    """
+    raw = chunk[symptom_columns].to_numpy(dtype=object)
+    rows, cols = np.nonzero(pd.notna(raw))
+    raw_codes, raw_uniques = pd.factorize(raw[rows, cols])
+    codes = np.asarray(raw_to_code(raw_uniques), dtype=np.int64)[raw_codes]
+    keys = np.unique(rows.astype(np.int64) * _PAIR_KEY_WIDTH + codes)
+    return keys // _PAIR_KEY_WIDTH, keys % _PAIR_KEY_WIDTH
+
 
 class MedicalDataLoader:
-    """Loads and processes the medical datasets."""
+    """
+    Loads and processes the medical datasets.
+
+    With `columnar_dir` set, the processed data is written once to a compact columnar
+    store and memory-mapped from there on every later load while the CSVs are unchanged.
+    With `chunk_size` set as well, dataset.csv is streamed into that store in chunks of
+    that many rows, so peak memory does not grow with the size of the file.
 
-    def __init__(self, data_path='data/'):
+    With a SymptomRegistry, symptom columns follow its stable IDs (new symptoms are
+    appended) instead of being re-sorted, so column positions never shift between versions.
+    """
+
+    def __init__(self, data_path='data/', columnar_dir=None, chunk_size=None, registry=None):
+        if chunk_size and not columnar_dir:
+            raise ValueError("Streaming ingestion (chunk_size) needs a columnar_dir to write the dataset to.")
         self.data_path = data_path
+        self.columnar_dir = columnar_dir
+        self.chunk_size = chunk_size
+        self.registry = registry
         self.datasets = {}
         self.processed_data = {}
 
     def load_and_process_data(self):
         """Load all CSV files and process them into usable structures."""
-        print("🔄 Loading and Processing Medical Datasets...")
+        data_hash = None
+        if self.columnar_dir:
+            data_hash = compute_data_hash(self.data_path)
+            processed_data = load_columnar_dataset(self.columnar_dir, data_hash)
+            if processed_data is not None and not self._follows_registry(processed_data['all_symptoms']):
+                logger.info("🔄 Columnar dataset predates the symptom registry, rebuilding it.")
+                processed_data = None
+            if processed_data is not None:
+                logger.info("✅ Memory-mapped columnar dataset from %s", self.columnar_dir)
+                self.processed_data = processed_data
+                return
+
+        if self.chunk_size:
+            self._stream_to_columnar(data_hash)
+            return
+
+        logger.info("🔄 Loading and Processing Medical Datasets...")
         try:
             self.datasets['main'] = pd.read_csv(f'{self.data_path}dataset.csv')
-            self.datasets['descriptions'] = pd.read_csv(f'{self.data_path}symptom_Description.csv')
-            self.datasets['precautions'] = pd.read_csv(f'{self.data_path}symptom_precaution.csv')
-            self.datasets['severity'] = pd.read_csv(f'{self.data_path}symptom_severity.csv')
-            print("✅ All datasets loaded successfully!")
+            self._read_lookup_tables()
+            logger.info("✅ All datasets loaded successfully!")
             self._process_datasets()
+            # The raw frames are not needed once everything is processed
+            self.datasets.clear()
         except FileNotFoundError as e:
-            print(f"❌ Error loading datasets: {e}")
+            logger.error("❌ Error loading datasets: %s", e)
             # You could add a fallback mechanism here if needed
             raise
 
+        if self.columnar_dir:
+            write_columnar_dataset(self.processed_data, self.columnar_dir, data_hash)
+            self.processed_data = load_columnar_dataset(self.columnar_dir)
+
     def _process_datasets(self):
         """Process raw DataFrames into application-ready dictionaries and lists."""
         main_df = self.datasets['main']
         symptom_columns = [col for col in main_df.columns if col.startswith('Symptom_')]
 
+        # Flatten the (row, column) grid to the positions that actually hold a symptom
+        raw = main_df[symptom_columns].to_numpy(dtype=object)
+        rows, cols = np.nonzero(pd.notna(raw))
+
+        # Normalize each distinct raw spelling once instead of every cell
+        raw_codes, raw_uniques = pd.factorize(raw[rows, cols])
+        normalized = normalize_symptom_column(pd.Series(raw_uniques, dtype=object))
+
         # Create a comprehensive list of all unique symptoms
-        all_symptoms_set = set()
-        for col in symptom_columns:
-            main_df[col] = main_df[col].str.strip().str.lower().str.replace(' ', '_').replace('__', '_')
-            all_symptoms_set.update(main_df[col].dropna().unique())
-        
-        all_symptoms = sorted(list(all_symptoms_set))
+        all_symptoms = self._vocabulary(normalized.unique())
         self.processed_data['all_symptoms'] = all_symptoms
-        symptom_index = {symptom: i for i, symptom in enumerate(all_symptoms)}
-
-        # Prepare data for model training (X, y)
-        X = []
-        y = []
-        for _, row in main_df.iterrows():
-            features = [0] * len(all_symptoms)
-            for col in symptom_columns:
-                symptom = row.get(col)
-                if pd.notna(symptom) and symptom in symptom_index:
-                    features[symptom_index[symptom]] = 1
-            X.append(features)
-            y.append(row['Disease'].strip().lower())
+        self.processed_data['symptom_index'] = {symptom: i for i, symptom in enumerate(all_symptoms)}
+
+        # One-hot encode with a single scatter into a compact uint8 matrix
+        codes = pd.Index(all_symptoms).get_indexer(normalized)[raw_codes]
+        X = np.zeros((len(main_df), len(all_symptoms)), dtype=np.uint8)
+        X[rows, codes] = 1
 
         self.processed_data['X_train'] = pd.DataFrame(X, columns=all_symptoms)
-        self.processed_data['y_train'] = pd.Series(y)
-        
+        self.processed_data['y_train'] = main_df['Disease'].str.strip().str.lower().reset_index(drop=True)
+
+        self._process_lookup_tables()
+        logger.info("✅ Processed %d unique symptoms and prepared data for model training.", len(all_symptoms))
+
+    def _process_lookup_tables(self):
+        """Processes the small severity, precaution and description tables."""
         # Process severity mapping
         severity_df = self.datasets['severity']
-        severity_mapping = {}
-        for _, row in severity_df.iterrows():
-            symptom = row['Symptom'].strip().lower().replace(' ', '_').replace('__', '_')
-            severity_mapping[symptom] = float(row['weight'])
-        self.processed_data['severity_mapping'] = severity_mapping
+        severity_symptoms = (severity_df['Symptom'].str.strip().str.lower()
+                             .str.replace(' ', '_').str.replace('__', '_'))
+        self.processed_data['severity_mapping'] = dict(
+            zip(severity_symptoms, severity_df['weight'].astype(float))
+        )
 
         # Process precaution mapping (from local CSV)
         precaution_df = self.datasets['precautions']
-        precaution_mapping = {}
-        for _, row in precaution_df.iterrows():
-            disease = row['Disease'].strip().lower()
-            precautions = [row[f'Precaution_{i}'].strip() for i in range(1, 5) if f'Precaution_{i}' in row and pd.notna(row[f'Precaution_{i}'])]
-            precaution_mapping[disease] = precautions
-        self.processed_data['precaution_mapping'] = precaution_mapping
-        
+        precaution_columns = [f'Precaution_{i}' for i in range(1, 5) if f'Precaution_{i}' in precaution_df.columns]
+        precaution_values = precaution_df[precaution_columns].apply(lambda col: col.str.strip()).to_numpy(dtype=object)
+        self.processed_data['precaution_mapping'] = {
+            disease: [p for p in precautions if pd.notna(p)]
+            for disease, precautions in zip(precaution_df['Disease'].str.strip().str.lower(), precaution_values)
+        }
+
         # Process description mapping
         desc_df = self.datasets['descriptions']
-        description_mapping = {}
-        for _, row in desc_df.iterrows():
-            disease = row['Disease'].strip().lower()
-            description_mapping[disease] = row.get('Description', "").strip()
-        self.processed_data['description_mapping'] = description_mapping
-
-        print(f"✅ Processed {len(all_symptoms)} unique symptoms and prepared data for model training.")
-        
+        self.processed_data['description_mapping'] = dict(
+            zip(desc_df['Disease'].str.strip().str.lower(), desc_df['Description'].fillna("").str.strip())
+        )
+
+    def _vocabulary(self, symptoms):
+        """Column order: stable registry IDs when a registry is set, otherwise sorted."""
+        if self.registry is None:
+            return sorted(symptoms)
+        return self.registry.extend(sorted(symptoms))
+
+    def _follows_registry(self, all_symptoms):
+        if self.registry is None:
+            return True
+        self.registry.extend(all_symptoms)
+        return self.registry.symptoms[:len(all_symptoms)] == list(all_symptoms)
+
+    def _read_lookup_tables(self):
+        self.datasets['descriptions'] = pd.read_csv(f'{self.data_path}symptom_Description.csv')
+        self.datasets['precautions'] = pd.read_csv(f'{self.data_path}symptom_precaution.csv')
+        self.datasets['severity'] = pd.read_csv(f'{self.data_path}symptom_severity.csv')
+
+    def _iter_main_chunks(self):
+        return pd.read_csv(f'{self.data_path}dataset.csv', chunksize=self.chunk_size, dtype=str)
+
+    def scan_vocabulary(self):
+        """
+        First streaming pass: collects the symptom vocabulary, the disease labels and the
+        exact row and non-zero counts, so the second pass can write into preallocated arrays.
+        """
+        raw_to_symptom, provisional = {}, {}
+        diseases = set()
+        n_rows = nnz = 0
+
+        def raw_to_code(raw_values):
+            new = [v for v in raw_values if v not in raw_to_symptom]
+            if new:
+                raw_to_symptom.update(zip(new, normalize_symptom_column(pd.Series(new, dtype=object))))
+            return [provisional.setdefault(raw_to_symptom[v], len(provisional)) for v in raw_values]
+
+        for chunk in self._iter_main_chunks():
+            symptom_columns = [col for col in chunk.columns if col.startswith('Symptom_')]
+            rows, _ = _symptom_pairs(chunk, symptom_columns, raw_to_code)
+            diseases.update(chunk['Disease'].str.strip().str.lower().unique())
+            n_rows += len(chunk)
+            nnz += len(rows)
+
+        return {
+            'raw_to_symptom': raw_to_symptom,
+            'all_symptoms': self._vocabulary(provisional),
+            'diseases': sorted(diseases),
+            'n_rows': n_rows,
+            'nnz': nnz,
+        }
+
+    def iter_feature_blocks(self, vocabulary):
+        """
+        Second streaming pass: yields one (CSR uint8 block, disease code array) pair per
+        chunk, with columns and codes following `vocabulary` from scan_vocabulary().
+        """
+        symptom_index = {symptom: i for i, symptom in enumerate(vocabulary['all_symptoms'])}
+        disease_index = pd.Index(vocabulary['diseases'])
+        raw_to_symptom = vocabulary['raw_to_symptom']
+
+        def raw_to_code(raw_values):
+            return [symptom_index[raw_to_symptom[v]] for v in raw_values]
+
+        for chunk in self._iter_main_chunks():
+            symptom_columns = [col for col in chunk.columns if col.startswith('Symptom_')]
+            rows, codes = _symptom_pairs(chunk, symptom_columns, raw_to_code)
+            indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(chunk)))])
+            block = sparse.csr_matrix((np.ones(len(codes), dtype=np.uint8), codes, indptr),
+                                      shape=(len(chunk), len(symptom_index)))
+            yield block, disease_index.get_indexer(chunk['Disease'].str.strip().str.lower())
+
+    def _stream_to_columnar(self, data_hash):
+        logger.info("🔄 Streaming %sdataset.csv into %s in chunks of %d rows...",
+                    self.data_path, self.columnar_dir, self.chunk_size)
+        try:
+            self._read_lookup_tables()
+            vocabulary = self.scan_vocabulary()
+        except FileNotFoundError as e:
+            logger.error("❌ Error loading datasets: %s", e)
+            raise
+        self._process_lookup_tables()
+        self.datasets.clear()
+        missing = [s for s in vocabulary['all_symptoms'] if s not in self.processed_data['severity_mapping']]
+        if missing:
+            logger.warning("⚠️ %d symptoms have no severity weight: %s", len(missing), ", ".join(missing[:10]))
+
+        writer = ColumnarWriter(self.columnar_dir, vocabulary['n_rows'], vocabulary['nnz'], len(vocabulary['diseases']))
+        for block, disease_codes in self.iter_feature_blocks(vocabulary):
+            writer.append(block, disease_codes)
+        writer.close(data_hash, vocabulary['all_symptoms'], vocabulary['diseases'], self.processed_data)
+        self.processed_data = load_columnar_dataset(self.columnar_dir)
+        logger.info("✅ Streamed %d rows with %d unique symptoms.", vocabulary['n_rows'], len(vocabulary['all_symptoms']))
+
     def get_processed_data(self):
         """Returns all the processed data structures."""
         return self.processed_data
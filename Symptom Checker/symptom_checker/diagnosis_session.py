@@ -0,0 +1,185 @@
+# symptom_checker/diagnosis_session.py
+"""
+Multi-turn differential diagnosis with incremental scoring.
+
+DifferentialModel turns the predictor's indexed symptom profiles into a symptom ->
+disease incidence table: for every symptom, the diseases it occurs with and the share
+of each disease's profiles that contain it, P(symptom | disease). A symptom never seen
+with a disease gets a small MISSING_LIKELIHOOD instead of zero, so one unexpected
+answer lowers a disease rather than ruling it out.
+
+A DiagnosisSession keeps a log-likelihood score per disease. Because the missing
+likelihood is the same for every disease, confirming, denying or retracting a symptom
+only changes the scores of the diseases in that symptom's incidence list (the common
+term cancels out when the scores are normalized). The next question is the unasked
+symptom with the highest expected information gain over the current posterior.
+"""
+import numpy as np
+
+# P(symptom | disease) assumed when no profile of the disease has the symptom
+MISSING_LIKELIHOOD = 0.01
+
+# Diseases below this posterior are left out of the information-gain computation
+MIN_POSTERIOR = 1e-6
+
+
+class DifferentialModel:
+    """Precomputed symptom -> disease incidence for one trained predictor."""
+
+    def __init__(self, predictor):
+        ranker = predictor.ranker
+        self.diseases = ranker.diseases
+        indptr, disease_ids, counts, profiles = ranker.symptom_incidence()
+        self.n_symptoms = len(indptr) - 1
+        self.indptr, self.disease_ids = indptr, disease_ids
+
+        likelihood = np.clip(counts / profiles[disease_ids], MISSING_LIKELIHOOD, 1 - MISSING_LIKELIHOOD)
+        # Score changes relative to the common missing-likelihood term
+        self.log_yes = np.log(likelihood) - np.log(MISSING_LIKELIHOOD)
+        self.log_no = np.log1p(-likelihood) - np.log1p(-MISSING_LIKELIHOOD)
+
+        # Dense disease x symptom likelihoods for the information-gain computation
+        self.likelihood = np.full((len(self.diseases), self.n_symptoms), MISSING_LIKELIHOOD)
+        symptom_ids = np.repeat(np.arange(self.n_symptoms), np.diff(indptr))
+        self.likelihood[disease_ids, symptom_ids] = likelihood
+
+    def incidence(self, symptom_id):
+        """Slice bounds of the symptom's entries in disease_ids/log_yes/log_no (empty if unknown)."""
+        if symptom_id >= self.n_symptoms:
+            return 0, 0
+        return self.indptr[symptom_id], self.indptr[symptom_id + 1]
+
+
+def _entropy_terms(joint):
+    """Column sums of p*log(p) for a (disease x symptom) matrix of joint probabilities."""
+    return (joint * np.log(joint)).sum(axis=0)
+
+
+class DiagnosisSession:
+    """
+    One patient's running differential. Symptoms are matched like assess_patient()
+    input; every step updates only the diseases the symptom occurs with.
+    """
+
+    def __init__(self, model, snapshot, top_k=3):
+        self.model = model
+        self.snapshot = snapshot
+        self.top_k = top_k
+        self.scores = np.zeros(len(model.diseases))
+        # Confirmed symptoms each disease has been seen with, for the candidate set
+        self.hits = np.zeros(len(model.diseases), dtype=np.int64)
+        self.present = {}   # symptom -> ID, in the order they were confirmed
+        self.absent = {}    # symptom -> ID of symptoms the patient denied
+
+    @property
+    def symptoms(self):
+        return list(self.present)
+
+    def _resolve(self, text):
+        match = self.snapshot.symptom_matcher.match(text)
+        if match is None:
+            return None, None
+        return match.symptom, self.snapshot.symptom_index[match.symptom]
+
+    def _apply(self, symptom_id, weights, sign, count_hits):
+        start, end = self.model.incidence(symptom_id)
+        diseases = self.model.disease_ids[start:end]
+        self.scores[diseases] += sign * weights[start:end]
+        if count_hits:
+            self.hits[diseases] += sign
+
+    def add(self, text):
+        """Confirms a symptom; returns the matched symptom name or None if unrecognized."""
+        symptom, symptom_id = self._resolve(text)
+        if symptom is None or symptom in self.present:
+            return symptom
+        if symptom in self.absent:
+            self._apply(self.absent.pop(symptom), self.model.log_no, -1, False)
+        self.present[symptom] = symptom_id
+        self._apply(symptom_id, self.model.log_yes, 1, True)
+        return symptom
+
+    def deny(self, text):
+        """Records that the patient does not have a symptom (a 'no' to a suggested question)."""
+        symptom, symptom_id = self._resolve(text)
+        if symptom is None or symptom in self.absent:
+            return symptom
+        if symptom in self.present:
+            self._apply(self.present.pop(symptom), self.model.log_yes, -1, True)
+        self.absent[symptom] = symptom_id
+        self._apply(symptom_id, self.model.log_no, 1, False)
+        return symptom
+
+    def remove(self, text):
+        """Retracts a confirmed or denied symptom; returns its name or None if it was not recorded."""
+        symptom, _ = self._resolve(text)
+        if symptom in self.present:
+            self._apply(self.present.pop(symptom), self.model.log_yes, -1, True)
+        elif symptom in self.absent:
+            self._apply(self.absent.pop(symptom), self.model.log_no, -1, False)
+        else:
+            return None
+        return symptom
+
+    def set_symptoms(self, texts):
+        """Syncs the confirmed symptoms to a full selection (e.g. a multiselect), applying only the difference."""
+        wanted = {}
+        for text in texts:
+            symptom, symptom_id = self._resolve(text)
+            if symptom is not None:
+                wanted[symptom] = symptom_id
+        for symptom in [s for s in self.present if s not in wanted]:
+            self.remove(symptom)
+        for symptom in wanted:
+            self.add(symptom)
+        return self.symptoms
+
+    def posterior(self):
+        """Probability of every disease given the answers so far (uniform prior)."""
+        exp = np.exp(self.scores - self.scores.max())
+        return exp / exp.sum()
+
+    def candidates(self):
+        """Diseases seen with every confirmed symptom (or with the most of them if none fits all)."""
+        if not self.present:
+            return []
+        best = self.hits.max()
+        return list(self.model.diseases[np.flatnonzero(self.hits == best)]) if best else []
+
+    def differential(self, k=None):
+        """Top-k (disease, probability) pairs, best first; empty until a symptom is confirmed."""
+        if not self.present:
+            return []
+        posterior = self.posterior()
+        order = np.argsort(-posterior, kind='stable')[:k or self.top_k]
+        return [(self.model.diseases[i], float(posterior[i])) for i in order]
+
+    def suggest(self, n=1):
+        """
+        The n unasked symptoms whose yes/no answer is expected to reduce the uncertainty
+        about the disease the most, as (symptom, information gain in nats) pairs.
+        """
+        if not self.present:
+            return []
+        posterior = self.posterior()
+        live = np.flatnonzero(posterior > MIN_POSTERIOR)
+        prior = posterior[live] / posterior[live].sum()
+        likelihood = self.model.likelihood[live]
+
+        yes = prior[:, None] * likelihood
+        no = prior[:, None] - yes
+        p_yes = yes.sum(axis=0)
+        p_no = 1.0 - p_yes
+        # H(D | answer) = sum over answers of p(a) * H(D | a), with H(D | a) = log p(a) - sum p(d, a) log p(d, a) / p(a)
+        expected = (p_yes * np.log(p_yes) - _entropy_terms(yes)) + (p_no * np.log(p_no) - _entropy_terms(no))
+        gain = -(prior * np.log(prior)).sum() - expected
+        asked = [i for i in (*self.present.values(), *self.absent.values()) if i < self.model.n_symptoms]
+        gain[asked] = -np.inf
+
+        order = np.argsort(-gain, kind='stable')[:n]
+        all_symptoms = self.snapshot.all_symptoms
+        return [(all_symptoms[i], float(gain[i])) for i in order if gain[i] > 0]
+
+    def triage(self):
+        """Risk score, severity, care and red flags for the confirmed symptoms under the current policy."""
+        return self.snapshot.rules.evaluate(list(self.present.values()))
@@ -1,4 +1,5 @@
 from symptom_checker.disease_predictor import DiseasePredictor
 
-def predict_disease(symptoms, symptom_disease_map):
-    return DiseasePredictor.predict(symptoms, symptom_disease_map)
+def predict_disease(symptoms, predictor: DiseasePredictor, k=5, method='index'):
+    """Top-k (disease, score) pairs for validated symptoms from a trained predictor."""
+    return predictor.rank(symptoms, k=k, method=method)
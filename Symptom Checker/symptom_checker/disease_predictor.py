@@ -1,37 +1,209 @@
 # symptom_checker/disease_predictor.py
-from sklearn.tree import DecisionTreeClassifier
+import logging
+import pickle
+
+import numpy as np
+
+from .disease_ranker import DiseaseRanker
+from .estimators import ESTIMATORS, make_estimator
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_METHODS = ('tree', 'index')
+
+# The fully grown decision tree puts all probability on one disease, so its "differential"
+# is a single entry; on partial symptom sets (benchmarks/bench_disease_ranking.py) the
+# index ranks the right disease first ~96% of the time and in the top 3 always, against
+# ~61% for the tree. 'tree' stays available for other registered estimators.
+DEFAULT_PREDICTION_METHOD = 'index'
 
 class DiseasePredictor:
     """A classifier to predict diseases based on symptoms."""
     
-    def __init__(self, random_state=42):
-        self.model = DecisionTreeClassifier(random_state=random_state)
+    def __init__(self, random_state=42, estimator='tree', params=None):
+        # The registered estimator serves the 'tree' prediction method (the name predates the registry)
+        self.estimator = estimator
+        self.params = dict(params or {})
+        # Kept so a refit (e.g. after a live update) reproduces the same kind of model
+        self.random_state = random_state
+        self._model = make_estimator(estimator, random_state, **self.params)
+        self._model_blob = None
+        self.ranker = None
         self.symptom_columns = []
+        self._column_index = {}
+        # Leading symptom columns the estimator was fitted on; later columns are appended by
+        # live updates and only reach the estimator after a refit
+        self.model_columns = 0
         self._is_trained = False
 
-    def train(self, X_train, y_train):
-        """Trains the Decision Tree model."""
-        print("⚙️ Training Decision Tree Classifier for disease prediction...")
-        self.symptom_columns = X_train.columns.tolist()
-        self.model.fit(X_train, y_train)
+    @property
+    def model(self):
+        """The fitted estimator; after unpickling it is restored (importing sklearn) on first access."""
+        return self.load_model()
+
+    def load_model(self):
+        """Restores the estimator kept as bytes by an unpickled predictor, if not done yet; returns it."""
+        if self._model is None:
+            self._model = pickle.loads(self._model_blob)
+            self._model_blob = None
+        return self._model
+
+    def __getstate__(self):
+        # Keep the estimator as opaque bytes so loading an artifact does not import sklearn
+        # until the model is used; index-only serving never pays for it
+        state = self.__dict__.copy()
+        if state['_model'] is not None:
+            state['_model_blob'] = pickle.dumps(state['_model'], protocol=pickle.HIGHEST_PROTOCOL)
+            state['_model'] = None
+        return state
+
+    def train(self, X_train, y_train, symptom_columns=None):
+        """
+        Trains the Decision Tree model and builds the inverted symptom index.
+
+        X_train may be a DataFrame or a (memory-mapped) sparse matrix; for the latter
+        pass the column names as `symptom_columns`.
+        """
+        logger.info("⚙️ Training %s classifier for disease prediction...", self.estimator)
+        if hasattr(X_train, 'columns'):
+            symptom_columns = X_train.columns.tolist()
+            X_train = X_train.to_numpy()
+        self.symptom_columns = list(symptom_columns)
+        self._column_index = {symptom: i for i, symptom in enumerate(self.symptom_columns)}
+        self.model_columns = len(self.symptom_columns)
+        # Fit on the bare array; column order is tracked in symptom_columns
+        self.model.fit(X_train, np.asarray(y_train, dtype=object))
+        self.ranker = DiseaseRanker(X_train, y_train)
         self._is_trained = True
-        print("✅ Disease prediction model trained!")
+        logger.info("✅ Disease prediction model trained! (%d distinct symptom profiles indexed)", self.ranker.n_rows)
+
+    def train_incremental(self, blocks, symptom_columns, diseases):
+        """
+        Out-of-core training from (CSR block, disease code array) pairs, e.g. streamed from
+        a columnar store. The model is updated with partial_fit and the symptom index is
+        built in the same single pass, so memory is bounded by one block.
+        """
+        if not ESTIMATORS[self.estimator].incremental:
+            raise ValueError(f"Estimator '{self.estimator}' does not support incremental training.")
+        logger.info("⚙️ Incrementally training %s classifier for disease prediction...", self.estimator)
+        self.symptom_columns = list(symptom_columns)
+        self._column_index = {symptom: i for i, symptom in enumerate(self.symptom_columns)}
+        self.model_columns = len(self.symptom_columns)
+        diseases = np.asarray(diseases, dtype=object)
+
+        def fitted(blocks):
+            for block, codes in blocks:
+                self.model.partial_fit(block, diseases[codes], classes=diseases)
+                yield block, codes
+
+        self.ranker = DiseaseRanker.from_blocks(fitted(blocks), diseases)
+        self._is_trained = True
+        logger.info("✅ Disease prediction model trained! (%d distinct symptom profiles indexed)", self.ranker.n_rows)
+
+    def extended(self, symptom_columns, X_delta, y_delta):
+        """
+        A copy that also covers delta rows: `symptom_columns` is the current vocabulary
+        (the old columns followed by newly registered ones) and X_delta a binary CSR matrix
+        over it. The symptom index is extended right away; the estimator is shared as-is
+        until with_model() swaps in a refitted one.
+        """
+        self._check_trained()
+        predictor = self._copy()
+        predictor.symptom_columns = list(symptom_columns)
+        predictor._column_index = {symptom: i for i, symptom in enumerate(predictor.symptom_columns)}
+        predictor.ranker = self.ranker.extended(X_delta, y_delta)
+        return predictor
 
-    def predict(self, symptoms):
+    def with_model(self, model, model_columns):
+        """A copy serving a refitted estimator trained on the first `model_columns` columns."""
+        predictor = self._copy()
+        predictor._model, predictor._model_blob = model, None
+        predictor.model_columns = model_columns
+        return predictor
+
+    def _copy(self):
+        # Shallow copy without going through __getstate__ (which would pickle the model)
+        predictor = DiseasePredictor.__new__(DiseasePredictor)
+        predictor.__dict__.update(self.__dict__)
+        return predictor
+
+    def predict(self, symptoms, method=DEFAULT_PREDICTION_METHOD):
         """Predicts the disease from a list of validated symptoms."""
+        if method == 'index' or self._has_unfitted_columns(symptoms):
+            ranked = self.rank(symptoms, k=1, method='index')
+            return ranked[0][0] if ranked else None
+        return self.model.predict(self._vectorize(symptoms))[0] # Returns the single predicted disease name
+
+    def rank(self, symptoms, k=5, method=DEFAULT_PREDICTION_METHOD):
+        """
+        Returns the top-k (disease, score) pairs for a list of validated symptoms: class
+        probabilities for 'tree', normalized Jaccard match scores for 'index'.
+
+        Symptoms added by a live update are unknown to the estimator until it is refitted,
+        so queries containing one are ranked by the index in the meantime.
+        """
+        if method == 'index' or (method == 'tree' and self._has_unfitted_columns(symptoms)):
+            self._check_trained()
+            ids = [self._column_index[s] for s in symptoms if s in self._column_index]
+            return self.ranker.rank(ids, k)
+        if method != 'tree':
+            raise ValueError(f"Unknown prediction method '{method}', expected one of {PREDICTION_METHODS}")
+        return self._top_k(self.model.predict_proba(self._vectorize(symptoms))[0], k)
+
+    def predict_many(self, symptom_matrix, method=DEFAULT_PREDICTION_METHOD):
+        """Predicts diseases for every row of a binary symptom matrix in one call."""
+        if method == 'index':
+            return np.array([ranked[0][0] if ranked else None for ranked in self.rank_many(symptom_matrix, 1, method)],
+                            dtype=object)
+        self._check_trained()
+        predicted = self.model.predict(self._model_input(symptom_matrix)).astype(object)
+        rows = self._unfitted_rows(symptom_matrix)
+        for row, ranked in zip(rows, self.ranker.rank_many(symptom_matrix[rows], 1) if len(rows) else ()):
+            predicted[row] = ranked[0][0] if ranked else None
+        return predicted
+
+    def rank_many(self, symptom_matrix, k=5, method=DEFAULT_PREDICTION_METHOD):
+        """rank() for every row of a binary CSR symptom matrix, as one predict_proba call or one sparse product."""
+        self._check_trained()
+        if method == 'index':
+            return self.ranker.rank_many(symptom_matrix, k)
+        if method != 'tree':
+            raise ValueError(f"Unknown prediction method '{method}', expected one of {PREDICTION_METHODS}")
+        ranked = [self._top_k(row, k) for row in self.model.predict_proba(self._model_input(symptom_matrix))]
+        rows = self._unfitted_rows(symptom_matrix)
+        for row, row_ranked in zip(rows, self.ranker.rank_many(symptom_matrix[rows], k) if len(rows) else ()):
+            ranked[row] = row_ranked
+        return ranked
+
+    def _has_unfitted_columns(self, symptoms):
+        return any(self._column_index.get(s, -1) >= self.model_columns for s in symptoms)
+
+    def _unfitted_rows(self, symptom_matrix):
+        """Rows of a CSR matrix with a symptom registered after the last fit."""
+        if symptom_matrix.shape[1] <= self.model_columns:
+            return []
+        return np.unique(symptom_matrix[:, self.model_columns:].nonzero()[0])
+
+    def _vectorize(self, symptoms):
+        self._check_trained()
+        # One-row binary vector in training column order
+        vector = np.zeros((1, self.model_columns), dtype=np.uint8)
+        for symptom in symptoms:
+            i = self._column_index.get(symptom)
+            if i is not None and i < self.model_columns:
+                vector[0, i] = 1
+        return vector
+
+    def _model_input(self, symptom_matrix):
+        # Columns registered after the last fit are unknown to the estimator
+        if symptom_matrix.shape[1] > self.model_columns:
+            return symptom_matrix[:, :self.model_columns]
+        return symptom_matrix
+
+    def _top_k(self, probabilities, k):
+        order = np.argsort(-probabilities, kind='stable')[:k]
+        return [(self.model.classes_[i], float(probabilities[i])) for i in order if probabilities[i] > 0]
+
+    def _check_trained(self):
         if not self._is_trained:
             raise RuntimeError("Model has not been trained yet. Call train() first.")
-        
-        # Create a zero-vector based on the training columns
-        input_vector = {symptom: 0 for symptom in self.symptom_columns}
-        
-        # Set the patient's symptoms to 1
-        for symptom in symptoms:
-            if symptom in input_vector:
-                input_vector[symptom] = 1
-        
-        # Convert to list in the correct order for prediction
-        ordered_input = [input_vector[symptom] for symptom in self.symptom_columns]
-        
-        prediction = self.model.predict([ordered_input])
-        return prediction[0] # Returns the single predicted disease name
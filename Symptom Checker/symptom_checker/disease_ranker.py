@@ -0,0 +1,201 @@
+# symptom_checker/disease_ranker.py
+from itertools import islice
+
+import numpy as np
+
+
+class DiseaseRanker:
+    """
+    Ranks diseases for a set of symptoms through an inverted symptom -> dataset-row index.
+
+    Duplicate (disease, symptom set) rows are collapsed when the index is built. A query
+    only touches the rows that share at least one symptom with it; each candidate row is
+    scored by Jaccard overlap and every disease takes the score of its best-matching row.
+    The returned scores are those Jaccard maxima normalized to sum to 1 over the matched
+    diseases: a relative match strength, not a calibrated probability.
+    """
+
+    # Rows densified at a time while deduplicating, which bounds the temporary memory
+    DEDUP_CHUNK_ROWS = 100_000
+
+    # Cells of the dense (query x indexed row) score block in rank_many(), which bounds its memory
+    RANK_CHUNK_CELLS = 1 << 21
+
+    def __init__(self, X_train, y_train):
+        from scipy import sparse
+
+        X = sparse.csr_matrix(X_train)
+        if hasattr(y_train, 'cat'):
+            diseases, disease_codes = np.asarray(y_train.cat.categories, dtype=object), np.asarray(y_train.cat.codes)
+        else:
+            diseases, disease_codes = np.unique(np.asarray(y_train, dtype=object), return_inverse=True)
+        self._build(
+            ((X[start:start + self.DEDUP_CHUNK_ROWS], disease_codes[start:start + self.DEDUP_CHUNK_ROWS])
+             for start in range(0, X.shape[0], self.DEDUP_CHUNK_ROWS)),
+            diseases,
+        )
+
+    @classmethod
+    def from_blocks(cls, blocks, diseases):
+        """Builds the index from streamed (CSR block, disease code array) pairs."""
+        ranker = cls.__new__(cls)
+        ranker._build(blocks, diseases)
+        return ranker
+
+    def extended(self, X_delta, y_delta):
+        """
+        A new ranker over the indexed rows plus delta rows. X_delta may have more columns
+        (newly registered symptoms, appended after the existing ones) and y_delta may name
+        new diseases; the existing rows are re-deduplicated from the index itself.
+        """
+        from scipy import sparse
+
+        y_delta = np.asarray(y_delta, dtype=object)
+        diseases = np.array(sorted(set(self.diseases) | set(y_delta)), dtype=object)
+        remap = np.searchsorted(diseases, self.diseases)
+        n_columns = X_delta.shape[1]
+        # Rebuild the unique-row matrix from the postings, padded with empty new columns
+        indptr = np.concatenate([
+            self._postings_indptr,
+            np.full(n_columns + 1 - len(self._postings_indptr), self._postings_indptr[-1]),
+        ])
+        indexed = sparse.csc_matrix((np.ones(len(self._postings_rows), dtype=np.uint8), self._postings_rows, indptr),
+                                    shape=(self.n_rows, n_columns)).tocsr()
+        blocks = [(indexed[start:start + self.DEDUP_CHUNK_ROWS], remap[self.row_disease[start:start + self.DEDUP_CHUNK_ROWS]])
+                  for start in range(0, self.n_rows, self.DEDUP_CHUNK_ROWS)]
+        blocks.append((sparse.csr_matrix(X_delta), np.searchsorted(diseases, y_delta)))
+        return DiseaseRanker.from_blocks(blocks, diseases)
+
+    def _build(self, blocks, diseases):
+        # scipy is only needed to build the index; loading and querying a pickled ranker is numpy-only
+        from scipy import sparse
+
+        self.diseases = np.asarray(diseases, dtype=object)
+
+        # Collapse duplicate rows: pack each row's bits, append its disease code and keep first occurrences
+        seen = set()
+        unique_blocks, unique_codes = [], []
+        for block, codes in blocks:
+            codes = np.asarray(codes)
+            keyed = np.concatenate([
+                np.packbits(block.toarray() > 0, axis=1),
+                codes.astype('>u4').view(np.uint8).reshape(-1, 4),
+            ], axis=1)
+            _, first = np.unique(keyed, axis=0, return_index=True)
+            new_rows = []
+            for row in np.sort(first):
+                key = keyed[row].tobytes()
+                if key not in seen:
+                    seen.add(key)
+                    new_rows.append(row)
+            unique_blocks.append(sparse.csr_matrix(block)[new_rows])
+            unique_codes.append(codes[new_rows])
+
+        unique_rows = sparse.vstack(unique_blocks, format='csr')
+        unique_rows.data = np.ones_like(unique_rows.data, dtype=np.uint8)
+        self.row_disease = np.concatenate(unique_codes).astype(np.int64)
+        self.row_sizes = np.asarray(unique_rows.sum(axis=1)).ravel()
+        postings = unique_rows.tocsc()
+        self._postings_indptr = postings.indptr
+        self._postings_rows = postings.indices
+        self.n_rows = unique_rows.shape[0]
+
+    def symptom_incidence(self):
+        """
+        Symptom -> disease incidence of the indexed profiles in CSR layout: for symptom
+        column j, disease_ids[indptr[j]:indptr[j + 1]] are the diseases with a profile
+        containing it and counts the number of such profiles. Also returns the number of
+        profiles per disease.
+        """
+        n_diseases = len(self.diseases)
+        n_columns = len(self._postings_indptr) - 1
+        columns = np.repeat(np.arange(n_columns, dtype=np.int64), np.diff(self._postings_indptr))
+        keys, counts = np.unique(columns * n_diseases + self.row_disease[self._postings_rows], return_counts=True)
+        symptom_ids, disease_ids = np.divmod(keys, n_diseases)
+        indptr = np.searchsorted(symptom_ids, np.arange(n_columns + 1))
+        return indptr, disease_ids, counts, np.bincount(self.row_disease, minlength=n_diseases)
+
+    def rank(self, symptom_ids, k=5):
+        """Returns up to k (disease, score) pairs, best first, for a list of symptom column ids."""
+        symptom_ids = np.unique(np.asarray(symptom_ids, dtype=np.int64))
+        if symptom_ids.size == 0:
+            return []
+        candidates = np.concatenate(
+            [self._postings_rows[self._postings_indptr[j]:self._postings_indptr[j + 1]] for j in symptom_ids]
+        )
+        if candidates.size == 0:
+            return []
+        rows, overlap = np.unique(candidates, return_counts=True)
+        jaccard = overlap / (symptom_ids.size + self.row_sizes[rows] - overlap)
+
+        scores = np.zeros(len(self.diseases))
+        np.maximum.at(scores, self.row_disease[rows], jaccard)
+        nonzero = np.flatnonzero(scores)
+        # Sort by score descending, then by name for stable ties
+        order = nonzero[np.lexsort((self.diseases[nonzero], -scores[nonzero]))][:k]
+        # Summed left to right, exactly like the per-query totals of rank_many()
+        total = sum(scores[nonzero].tolist())
+        return [(self.diseases[i], float(scores[i] / total)) for i in order]
+
+    def rank_many(self, symptom_matrix, k=5):
+        """
+        rank() for every row of a binary CSR symptom matrix. The overlaps of a chunk of
+        queries with every indexed row come from one sparse product; their Jaccard scores
+        are scattered into a dense block with the rows grouped by disease, so each
+        disease's best score is one maximum.reduceat over that block.
+        """
+        from scipy import sparse
+
+        Q = sparse.csr_matrix(symptom_matrix, dtype=np.int64, copy=True)
+        Q.sum_duplicates()
+        Q.eliminate_zeros()
+        Q.data[:] = 1
+        n_columns = len(self._postings_indptr) - 1
+        query_sizes = np.diff(Q.indptr)
+        if Q.shape[1] != n_columns:
+            # Columns the index has never seen still count towards the query size
+            Q = Q[:, :n_columns] if Q.shape[1] > n_columns else sparse.csr_matrix(
+                (Q.data, Q.indices, Q.indptr), shape=(Q.shape[0], n_columns))
+        # Symptom -> indexed-row postings are the CSR form of the transposed row matrix
+        postings = sparse.csr_matrix(
+            (np.ones(len(self._postings_rows), dtype=np.int64), self._postings_rows, self._postings_indptr),
+            shape=(n_columns, self.n_rows),
+        )
+        # Dense-block column of every indexed row, grouped by disease
+        by_disease = np.argsort(self.row_disease, kind='stable')
+        position = np.empty(self.n_rows, dtype=np.int64)
+        position[by_disease] = np.arange(self.n_rows)
+        grouped = self.row_disease[by_disease]
+        group_starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]]) if self.n_rows else grouped
+        name_rank = np.empty(len(self.diseases), dtype=np.int64)
+        name_rank[np.argsort(self.diseases, kind='stable')] = np.arange(len(self.diseases))
+
+        chunk_rows = max(1, self.RANK_CHUNK_CELLS // max(1, self.n_rows))
+        ranked = []
+        for start in range(0, Q.shape[0], chunk_rows):
+            overlap = Q[start:start + chunk_rows] @ postings
+            ranked.extend(self._rank_chunk(overlap, query_sizes[start:start + chunk_rows], position,
+                                           group_starts, grouped[group_starts], name_rank, k))
+        return ranked
+
+    def _rank_chunk(self, overlap, query_sizes, position, group_starts, group_diseases, name_rank, k):
+        n_queries = overlap.shape[0]
+        if not overlap.nnz:
+            return [[] for _ in range(n_queries)]
+        queries = np.repeat(np.arange(n_queries, dtype=np.int64), np.diff(overlap.indptr))
+        rows, counts = overlap.indices, overlap.data
+        jaccard = np.zeros((n_queries, self.n_rows))
+        jaccard[queries, position[rows]] = counts / (query_sizes[queries] + self.row_sizes[rows] - counts)
+        best = np.maximum.reduceat(jaccard, group_starts, axis=1)
+        # Non-zeros come out ordered by query, then disease
+        queries, groups = np.nonzero(best)
+        scores, diseases = best[queries, groups], group_diseases[groups]
+
+        # Normalize by each query's total (summed left to right in disease order, like rank()), keep its top k
+        bounds = np.searchsorted(queries, np.arange(n_queries + 1))
+        totals = np.bincount(queries, weights=scores, minlength=n_queries)
+        by_rank = np.lexsort((name_rank[diseases], -scores, queries))
+        top = by_rank[np.arange(len(by_rank)) - bounds[queries[by_rank]] < k]
+
+        pairs = zip(self.diseases[diseases[top]].tolist(), (scores[top] / totals[queries[top]]).tolist())
+        return [list(islice(pairs, n)) for n in np.bincount(queries[top], minlength=n_queries).tolist()]
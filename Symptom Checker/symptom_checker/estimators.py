@@ -0,0 +1,53 @@
+# symptom_checker/estimators.py
+"""
+Registry of classifiers DiseasePredictor can train on the binary symptom matrix.
+
+Each entry has a factory taking (random_state, **params), the hyperparameter grid the
+model-selection pipeline searches by default, and whether it supports partial_fit for
+out-of-core training. Register extra models with register_estimator().
+"""
+from collections import namedtuple
+
+EstimatorSpec = namedtuple('EstimatorSpec', ['factory', 'param_grid', 'incremental'])
+
+ESTIMATORS = {}
+
+
+def register_estimator(name, factory, param_grid=None, incremental=False):
+    """Adds (or replaces) an estimator; `param_grid` maps parameter names to candidate values."""
+    ESTIMATORS[name] = EstimatorSpec(factory, param_grid or {}, incremental)
+
+
+def make_estimator(name, random_state=42, **params):
+    """Builds an unfitted estimator from the registry."""
+    if name not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator '{name}', expected one of {tuple(ESTIMATORS)}")
+    return ESTIMATORS[name].factory(random_state, **params)
+
+
+# sklearn is imported inside the factories: it takes seconds to import and is only
+# needed when a model is actually trained (or a pickled one is first used)
+def _decision_tree(random_state, **params):
+    from sklearn.tree import DecisionTreeClassifier
+    return DecisionTreeClassifier(random_state=random_state, **params)
+
+
+def _naive_bayes(random_state, **params):
+    from sklearn.naive_bayes import BernoulliNB
+    return BernoulliNB(**params)
+
+
+def _random_forest(random_state, **params):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+
+
+def _extra_trees(random_state, **params):
+    from sklearn.ensemble import ExtraTreesClassifier
+    return ExtraTreesClassifier(random_state=random_state, n_jobs=1, **params)
+
+
+register_estimator('tree', _decision_tree, {'criterion': ['gini', 'entropy'], 'min_samples_leaf': [1, 2]})
+register_estimator('naive_bayes', _naive_bayes, {'alpha': [0.01, 0.1, 1.0]}, incremental=True)
+register_estimator('random_forest', _random_forest, {'n_estimators': [25, 100], 'max_features': ['sqrt']})
+register_estimator('extra_trees', _extra_trees, {'n_estimators': [25, 100], 'max_features': ['sqrt']})
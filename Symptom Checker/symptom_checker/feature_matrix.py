@@ -0,0 +1,31 @@
+# symptom_checker/feature_matrix.py
+import numpy as np
+from scipy import sparse
+
+
+def build_symptom_matrix(symptom_lists, symptom_index, dtype=np.uint8):
+    """
+    Builds a CSR matrix with one row per symptom list and one column per known symptom.
+
+    Each cell holds how often the symptom occurs in that list, so repeated symptoms add up
+    the same way they do in the single-patient path. Unknown symptoms are ignored.
+    """
+    indptr = [0]
+    indices = []
+    for symptoms in symptom_lists:
+        indices.extend(symptom_index[s] for s in symptoms if s in symptom_index)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=dtype)
+    matrix = sparse.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(symptom_lists), len(symptom_index)),
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+def binarize(matrix):
+    """Returns a copy of a count matrix with every non-zero cell set to 1."""
+    binary = matrix.copy()
+    binary.data = np.ones_like(binary.data)
+    return binary
@@ -0,0 +1,379 @@
+# symptom_checker/http_service.py
+"""
+Pre-fork HTTP/JSON service around TriageSystem.
+
+The master process builds the TriageSystem once, freezes the GC so the loaded model and
+lookup tables stay in shared copy-on-write pages, and forks worker processes that all
+accept on one inherited listening socket. Each worker serves requests from a fixed
+thread pool fed by a bounded queue; when the queue is full the connection is answered
+with 429 immediately. A connection that stays silent for REQUEST_TIMEOUT seconds is
+dropped, so idle clients cannot hold the handler threads. The master watches the data directory and rolls a new worker
+generation (SIGHUP does the same on demand) when the data artifact changes.
+
+Endpoints:
+    GET  /healthz        liveness
+    GET  /readyz         readiness (503 while draining)
+    GET  /metrics        Prometheus text metrics of this worker
+    POST /assess         {"symptoms": [...]}
+    POST /assess/batch   {"patients": [[...], ...], "fetch_precautions": false}
+
+Fork-based serving is POSIX-only; elsewhere a single in-process worker is used.
+"""
+import gc
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from .data_hash import compute_data_hash
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# Seconds a handler thread waits on a silent connection before dropping it
+REQUEST_TIMEOUT = 10.0
+
+# Seconds a rejected connection is kept open to drain its request before it is closed
+REJECT_LINGER = 1.0
+
+
+def _is_symptom_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+class TriageRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SymptomChecker/1.0"
+    # Applied to the connection socket, so a stalled read times out and frees the thread
+    timeout = REQUEST_TIMEOUT
+
+    def do_GET(self):
+        if self.path == '/healthz':
+            self._send_json(200, {"status": "ok", "pid": os.getpid()})
+        elif self.path == '/readyz':
+            if self.server.draining:
+                self._send_json(503, {"status": "draining"})
+            else:
+                self._send_json(200, {"status": "ready", "data_hash": self.server.data_hash})
+        elif self.path == '/metrics':
+            self._send(200, self.server.triage_system.export_metrics().encode('utf-8'), 'text/plain; version=0.0.4')
+        else:
+            self._send_json(404, {"error": "Not found."})
+
+    def do_POST(self):
+        if self.path not in ('/assess', '/assess/batch'):
+            self._send_json(404, {"error": "Not found."})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            self._send_json(400, {"error": "Invalid Content-Length."})
+            return
+        if length < 0:
+            self._send_json(400, {"error": "Invalid Content-Length."})
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "Request body too large."})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, UnicodeDecodeError):
+            self._send_json(400, {"error": "Request body must be valid JSON."})
+            return
+        if not isinstance(payload, dict):
+            self._send_json(400, {"error": "Request body must be a JSON object."})
+            return
+
+        try:
+            self._dispatch(payload)
+        except Exception:
+            logger.exception("❌ Failed to handle %s", self.path)
+            self._send_json(500, {"error": "Internal server error."})
+
+    def _dispatch(self, payload):
+        system = self.server.triage_system
+        if self.path == '/assess':
+            symptoms = payload.get('symptoms')
+            if not _is_symptom_list(symptoms):
+                self._send_json(400, {"error": "'symptoms' must be a list of strings."})
+                return
+            self._send_json(200, system.assess_patient(symptoms))
+        else:
+            patients = payload.get('patients')
+            if not isinstance(patients, list) or not all(_is_symptom_list(p) for p in patients):
+                self._send_json(400, {"error": "'patients' must be a list of symptom lists (of strings)."})
+                return
+            results = system.assess_patients(patients, fetch_precautions=bool(payload.get('fetch_precautions', False)))
+            self._send_json(200, {"results": results})
+
+    def _send_json(self, status, body):
+        self._send(status, json.dumps(body, default=str).encode('utf-8'), 'application/json')
+
+    def _send(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class BoundedHTTPServer(HTTPServer):
+    """
+    HTTPServer on an already-listening socket, served by `threads` handler threads.
+
+    Accepted connections wait in a queue of at most `queue_size`; beyond that they are
+    answered with 429 straight from the accept loop so overload never piles up memory.
+    The accept loop only writes the response; a separate thread drains and closes the
+    rejected sockets.
+    """
+
+    REJECT_BODY = b'{"error": "Server is overloaded, retry later."}'
+    REJECT_RESPONSE = (b"HTTP/1.0 429 Too Many Requests\r\nRetry-After: 1\r\nContent-Type: application/json\r\n"
+                       + f"Content-Length: {len(REJECT_BODY)}\r\n\r\n".encode('ascii') + REJECT_BODY)
+
+    def __init__(self, listen_socket, triage_system, data_hash=None, threads=8, queue_size=64,
+                 handler_class=TriageRequestHandler):
+        super().__init__(listen_socket.getsockname()[:2], handler_class, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listen_socket
+        self.triage_system = triage_system
+        self.data_hash = data_hash
+        self.draining = False
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(threads)]
+        for thread in self._threads:
+            thread.start()
+        self._rejected = queue.SimpleQueue()
+        threading.Thread(target=self._close_rejected, name='reject-closer', daemon=True).start()
+
+    def process_request(self, request, client_address):
+        try:
+            self._queue.put_nowait((request, client_address))
+        except queue.Full:
+            self.triage_system.metrics.increment("rejected_overload")
+            self._reject(request)
+
+    def _reject(self, request):
+        # Never blocks: the response fits in the empty send buffer of a fresh connection
+        try:
+            request.setblocking(False)
+            request.send(self.REJECT_RESPONSE)
+            request.shutdown(socket.SHUT_WR)
+        except OSError:
+            request.close()
+            return
+        self._rejected.put((request, time.monotonic() + REJECT_LINGER))
+
+    def _close_rejected(self):
+        """
+        Closes rejected sockets once the client has finished (or REJECT_LINGER has passed),
+        reading whatever request data arrives meanwhile: closing with unread data would
+        reset the connection and could discard the 429 before the client reads it.
+        """
+        lingering = []
+        while True:
+            try:
+                lingering.append(self._rejected.get(timeout=0.05 if lingering else None))
+                while True:
+                    lingering.append(self._rejected.get_nowait())
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            still_open = []
+            for request, deadline in lingering:
+                if self._drained(request) or now >= deadline:
+                    request.close()
+                else:
+                    still_open.append((request, deadline))
+            lingering = still_open
+
+    @staticmethod
+    def _drained(request):
+        """Reads pending data from a non-blocking socket; True once the peer has closed it."""
+        try:
+            while request.recv(65536):
+                pass
+            return True
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def drain(self):
+        """Stops the handler threads after every queued request has been answered."""
+        self.draining = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def server_close(self):
+        # The listening socket belongs to the master process; never close it from a worker
+        pass
+
+
+class TriageService:
+    """Master process: loads the system once, forks workers, reloads on data changes."""
+
+    def __init__(self, system_factory, host='127.0.0.1', port=8000, workers=None, threads=8,
+                 queue_size=64, data_path='data/', reload_interval=30.0, drain_timeout=30.0):
+        self.system_factory = system_factory
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.threads = threads
+        self.queue_size = queue_size
+        self.data_path = data_path
+        self.reload_interval = reload_interval
+        self.drain_timeout = drain_timeout
+        self.listen_socket = None
+        self.triage_system = None
+        self.data_hash = None
+        self._children = {}
+        self._stopping = False
+        self._reload_requested = False
+
+    def serve_forever(self):
+        self.listen_socket = socket.create_server((self.host, self.port), backlog=1024)
+        self.port = self.listen_socket.getsockname()[1]
+        self._load()
+        if not hasattr(os, 'fork'):
+            logger.warning("⚠️ os.fork is unavailable; serving from a single in-process worker.")
+            self._run_worker()
+            return
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+        self._spawn_generation()
+        logger.info("✅ Triage service listening on %s:%d with %d workers.", self.host, self.port, self.workers)
+
+        last_check = time.monotonic()
+        while not self._stopping:
+            time.sleep(0.2)
+            self._reap_children()
+            if self._reload_requested or (
+                    self.reload_interval and time.monotonic() - last_check >= self.reload_interval):
+                last_check = time.monotonic()
+                forced, self._reload_requested = self._reload_requested, False
+                if forced or compute_data_hash(self.data_path) != self.data_hash:
+                    self._reload()
+        self._terminate(list(self._children))
+        self.listen_socket.close()
+
+    def _load(self):
+        gc.unfreeze()
+        self.data_hash = compute_data_hash(self.data_path)
+        self.triage_system = self.system_factory()
+        # Move everything loaded so far out of GC tracking so workers do not dirty the shared pages
+        gc.collect()
+        gc.freeze()
+
+    def _reload(self):
+        logger.info("🔄 Data changed, loading a new worker generation...")
+        old_children = list(self._children)
+        try:
+            self._load()
+        except Exception as e:
+            logger.error("❌ Reload failed, keeping the current workers: %s", e)
+            return
+        self._spawn_generation()
+        self._terminate(old_children)
+        logger.info("✅ Reload complete (data hash %s).", self.data_hash[:16])
+
+    def _spawn_generation(self):
+        generation = self.data_hash
+        for _ in range(self.workers):
+            self._spawn_worker(generation)
+
+    def _spawn_worker(self, generation):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGHUP, signal.SIG_IGN)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                self._run_worker()
+            except Exception:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self._children[pid] = generation
+
+    def _run_worker(self):
+        server = BoundedHTTPServer(self.listen_socket, self.triage_system, self.data_hash,
+                                   threads=self.threads, queue_size=self.queue_size)
+
+        def stop(signum, frame):
+            server.draining = True
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        if hasattr(signal, 'SIGTERM'):
+            signal.signal(signal.SIGTERM, stop)
+        server.serve_forever(poll_interval=0.2)
+        server.drain()
+
+    def _reap_children(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation = self._children.pop(pid, None)
+            if generation == self.data_hash and not self._stopping:
+                logger.warning("⚠️ Worker %d exited unexpectedly (status %d), restarting.", pid, status)
+                self._spawn_worker(generation)
+
+    def _terminate(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.drain_timeout
+        for pid in pids:
+            while time.monotonic() < deadline:
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if done:
+                    break
+                time.sleep(0.05)
+            else:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                except (ProcessLookupError, ChildProcessError):
+                    pass
+            self._children.pop(pid, None)
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload_requested = True
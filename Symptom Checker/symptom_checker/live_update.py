@@ -0,0 +1,381 @@
+# symptom_checker/live_update.py
+"""
+Live updates of a running TriageSystem without a full rebuild.
+
+Everything a request reads lives in one ServingSnapshot. An update builds the next
+snapshot off to the side (new symptoms get appended registry IDs, the lookup maps are
+copied and extended, the symptom index and triage policy are extended for the delta
+rows) and publishes it with a single reference assignment, so a request that already
+picked up a snapshot finishes on it and the next one sees the complete update.
+
+The classifier is refreshed separately: a partial_fit capable estimator absorbs delta
+rows over known symptoms and diseases right away; anything else is refitted on the base
+training matrix (cached next to the model artifact, so the CSVs are not reprocessed)
+plus all delta rows, by default in a background thread, and swapped in when done.
+Until then the 'index' method already reflects every update; the 'tree' method serves
+on the columns it was fitted on and hands queries with a newer symptom to the index.
+
+An update is validated and its snapshot built before anything is written; it is then
+appended to the artifact directory's update log and published. A restarted system
+replays the entries its artifact does not include yet, setting aside any that cannot be
+applied, refits once and saves the result as the new artifact, so no update is lost and
+the next start loads the refitted model instead of retraining.
+"""
+import copy
+import json
+import logging
+import math
+import os
+import threading
+
+import numpy as np
+
+from .diagnosis_session import DifferentialModel
+from .estimators import ESTIMATORS, make_estimator
+from .model_artifact import SERVING_KEYS
+from .symptom_matcher import SymptomMatcher
+from .symptom_registry import normalize_symptom_name
+
+logger = logging.getLogger(__name__)
+
+REFIT_MODES = ('background', True, False)
+
+
+class ServingSnapshot:
+    """An immutable version of the data, predictor and policy that requests are served from."""
+
+    def __init__(self, processed_data, predictor, rules, version=0):
+        self.processed_data = processed_data
+        self.predictor = predictor
+        self.rules = rules
+        self.version = version
+        self.all_symptoms = processed_data['all_symptoms']
+        self.symptom_index = processed_data['symptom_index']
+        self.severity_mapping = processed_data['severity_mapping']
+        self.description_mapping = processed_data['description_mapping']
+        self.precaution_mapping = processed_data['precaution_mapping']
+        self.symptom_matcher = SymptomMatcher(self.all_symptoms)
+        self._differential = None
+
+    def differential_model(self):
+        """The symptom -> disease incidence model for multi-turn sessions, built on first use."""
+        if self._differential is None:
+            self._differential = DifferentialModel(self.predictor)
+        return self._differential
+
+
+def _disease_key(name):
+    return name.strip().lower()
+
+
+def _text(value, what):
+    if not isinstance(value, str):
+        raise ValueError(f"{what} must be a string, got {value!r}")
+    return value
+
+
+def _text_list(values, what):
+    if isinstance(values, str) or not isinstance(values, (list, tuple)):
+        raise ValueError(f"{what} must be a list of strings, got {values!r}")
+    return [_text(value, what) for value in values]
+
+
+def _mapping(value, what):
+    if not isinstance(value, dict):
+        raise ValueError(f"{what} must be a mapping, got {value!r}")
+    return value
+
+
+def normalize_update(rows=None, severity=None, descriptions=None, precautions=None):
+    """
+    Validated, normalized copies of an update's parts; raises ValueError on a malformed
+    entry, before anything is applied or logged. Rows without a disease or any symptom
+    are dropped.
+    """
+    normalized_rows = []
+    for row in rows or ():
+        if isinstance(row, str) or not isinstance(row, (list, tuple)) or len(row) != 2:
+            raise ValueError(f"Rows must be (disease, [symptoms]) pairs, got {row!r}")
+        disease = _disease_key(_text(row[0], "Disease name"))
+        symptoms = [normalize_symptom_name(s) for s in _text_list(row[1], "Row symptoms") if s.strip()]
+        if disease and symptoms:
+            normalized_rows.append((disease, symptoms))
+
+    weights = {}
+    for symptom, weight in _mapping(severity or {}, "Severity").items():
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not math.isfinite(weight):
+            raise ValueError(f"Severity weight for '{symptom}' must be a finite number, got {weight!r}")
+        weights[normalize_symptom_name(_text(symptom, "Symptom"))] = float(weight)
+
+    descriptions = {_disease_key(_text(disease, "Disease name")): _text(text, "Description").strip()
+                    for disease, text in _mapping(descriptions or {}, "Descriptions").items()}
+    precautions = {_disease_key(_text(disease, "Disease name")): _text_list(items, "Precautions")
+                   for disease, items in _mapping(precautions or {}, "Precautions").items()}
+    return normalized_rows, weights, descriptions, precautions
+
+
+def _encode_rows(rows, symptom_index):
+    """Binary CSR matrix and disease labels for normalized (disease, symptoms) rows."""
+    from .feature_matrix import binarize, build_symptom_matrix
+
+    X = binarize(build_symptom_matrix([symptoms for _, symptoms in rows], symptom_index))
+    return X, np.array([disease for disease, _ in rows], dtype=object)
+
+
+class LiveUpdater:
+    """Applies delta updates to a TriageSystem, logs them and keeps its classifier fresh."""
+
+    def __init__(self, system, registry, store, data_hash=None, applied_updates=0):
+        self.system = system
+        self.registry = registry
+        self.store = store
+        self.log_path = store.update_log_path
+        self._data_hash = data_hash
+        # Serving from a saved artifact: replayed updates are compacted into a new one
+        self._artifact_backed = data_hash is not None
+        # Leading log entries already included in the loaded artifact
+        self.applied_updates = applied_updates
+        self._lock = threading.Lock()
+        # Every delta row applied so far; a full refit trains on the base data plus these
+        self._delta_rows = []
+        # Base (X, y) training data, loaded on the first refit
+        self._base = None
+        self._refit_thread = None
+        self._refit_running = False
+        self._refit_again = False
+
+    def apply(self, rows=None, severity=None, descriptions=None, precautions=None, refit='background',
+              log=True):
+        """
+        Ingests delta rows and lookup-table entries and publishes a new snapshot.
+
+        rows: (disease, [symptoms]) pairs, like dataset.csv lines.
+        severity: {symptom: weight}; descriptions: {disease: text}; precautions: {disease: [text]}.
+        refit: 'background' refits the classifier in a thread, True refits before returning,
+               False only extends the symptom index (the estimator keeps its last fit).
+        log: append the update to the update log so it survives a restart.
+        Raises ValueError (with nothing applied or logged) on a malformed update.
+        Returns the version of the published snapshot.
+        """
+        if refit not in REFIT_MODES:
+            raise ValueError(f"refit must be one of {REFIT_MODES}")
+        rows, severity, descriptions, precautions = normalize_update(rows, severity, descriptions, precautions)
+
+        with self._lock:
+            snapshot = self.system._snapshot
+            data = {key: snapshot.processed_data[key] for key in SERVING_KEYS}
+            if rows:
+                data['all_symptoms'] = self.registry.extend(
+                    list(snapshot.all_symptoms) + [s for _, symptoms in rows for s in symptoms]
+                )
+                data['symptom_index'] = {symptom: i for i, symptom in enumerate(data['all_symptoms'])}
+            if severity:
+                data['severity_mapping'] = {**data['severity_mapping'], **severity}
+            if descriptions:
+                data['description_mapping'] = {**data['description_mapping'], **descriptions}
+            if precautions:
+                data['precaution_mapping'] = {**data['precaution_mapping'], **precautions}
+
+            predictor = snapshot.predictor
+            needs_refit = bool(rows and refit)
+            if rows:
+                X_delta, y_delta = _encode_rows(rows, data['symptom_index'])
+                predictor = predictor.extended(data['all_symptoms'], X_delta, y_delta)
+                self._delta_rows.extend(rows)
+                if refit and self._absorbs(predictor, X_delta, y_delta):
+                    model = copy.deepcopy(predictor.model)
+                    model.partial_fit(X_delta[:, :predictor.model_columns], y_delta)
+                    predictor = predictor.with_model(model, predictor.model_columns)
+                    needs_refit = False
+            rules = snapshot.rules
+            if data['all_symptoms'] is not snapshot.all_symptoms or severity:
+                rules = rules.for_vocabulary(data['all_symptoms'], data['severity_mapping'])
+
+            # Logged only once the snapshot is built, so the log never holds an update that fails to apply
+            if log:
+                self._log_update(rows, severity, descriptions, precautions)
+            version = self._publish(data, predictor, rules)
+
+        logger.info("🆕 Published snapshot v%d (%d symptoms, %d delta rows so far).",
+                    version, len(data['all_symptoms']), len(self._delta_rows))
+        if needs_refit:
+            self._schedule_refit(wait=refit is True)
+        return version
+
+    def _log_update(self, rows, severity, descriptions, precautions):
+        entry = {'rows': rows, 'severity': severity or {}, 'descriptions': descriptions or {},
+                 'precautions': precautions or {}}
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replay(self):
+        """
+        Re-applies the logged updates the loaded artifact does not include yet (at startup)
+        and refits the classifier once if any rows were added. An entry that cannot be read
+        or applied is logged and set aside rather than failing the start. When serving from
+        an artifact, the result is saved as the new artifact so the next start neither
+        replays nor refits. Returns the number of updates replayed.
+        """
+        if not os.path.exists(self.log_path):
+            return 0
+        replayed = consumed = 0
+        with open(self.log_path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                consumed = line_number
+                if line_number <= self.applied_updates:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    self.apply(entry.get('rows'), entry.get('severity'), entry.get('descriptions'),
+                               entry.get('precautions'), refit=False, log=False)
+                except (ValueError, AttributeError) as e:
+                    # e.g. a torn last line from a crash mid-write, or an entry edited by hand
+                    logger.error("❌ Setting aside line %d of %s, it cannot be applied: %s",
+                                 line_number, self.log_path, e)
+                    continue
+                replayed += 1
+        if consumed <= self.applied_updates:
+            return 0
+        if self._delta_rows:
+            self._refit()
+        logger.info("🔁 Replayed %d logged updates (%d delta rows).", replayed, len(self._delta_rows))
+        if self._artifact_backed:
+            self._compact(consumed)
+        return replayed
+
+    def _compact(self, applied_updates):
+        """Saves the current snapshot as the artifact, with its base features covering every replayed row."""
+        from scipy import sparse
+
+        X_base, y_base = self._base_features()
+        n_columns = len(self.system._snapshot.all_symptoms)
+        X_base = sparse.csr_matrix((X_base.data, X_base.indices, X_base.indptr), shape=(X_base.shape[0], n_columns))
+        if self._delta_rows:
+            X_delta, y_delta = _encode_rows(self._delta_rows, self.system._snapshot.symptom_index)
+            X_base, y_base = sparse.vstack([X_base, X_delta], format='csr'), np.concatenate([y_base, y_delta])
+
+        snapshot = self.system._snapshot
+        previous = self.applied_updates
+        self.store.save(snapshot.processed_data, snapshot.predictor, self._data_hash,
+                        applied_updates=applied_updates, features=(X_base, y_base))
+        with self._lock:
+            self._base, self._delta_rows, self.applied_updates = (X_base, y_base), [], applied_updates
+        if previous:
+            self.store.discard_features(self._data_hash, previous)
+        logger.info("🗜️ Compacted %d logged updates into the model artifact.", applied_updates)
+
+    def _publish(self, data, predictor, rules):
+        # Caller holds the lock; one reference assignment makes the whole update visible at once
+        snapshot = ServingSnapshot(data, predictor, rules, self.system._snapshot.version + 1)
+        self.system._snapshot = snapshot
+        if self.system.rag_fetcher is not None:
+            # The async fetcher shares this summarizer
+            self.system.rag_fetcher.fallback.precaution_mapping = data['precaution_mapping']
+        return snapshot.version
+
+    @staticmethod
+    def _absorbs(predictor, X_delta, y_delta):
+        """Whether partial_fit can take the delta (known columns and classes only)."""
+        if not ESTIMATORS[predictor.estimator].incremental:
+            return False
+        if X_delta[:, predictor.model_columns:].nnz:
+            return False
+        return set(y_delta) <= set(predictor.model.classes_)
+
+    def _schedule_refit(self, wait=False):
+        with self._lock:
+            if self._refit_running:
+                # The running refit starts over with the new rows when it finishes
+                self._refit_again = True
+                thread = self._refit_thread
+            else:
+                self._refit_running = True
+                thread = self._refit_thread = threading.Thread(target=self._refit_loop, name='model-refit', daemon=True)
+                thread.start()
+        if wait:
+            self.wait(thread=thread)
+
+    def wait(self, timeout=None, thread=None):
+        """Blocks until the running refit (if any) finishes; returns False on timeout."""
+        thread = thread or self._refit_thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _refit_loop(self):
+        while True:
+            try:
+                self._refit()
+            except Exception:
+                logger.exception("❌ Background model refit failed; serving the previous model.")
+            with self._lock:
+                if not self._refit_again:
+                    self._refit_running = False
+                    return
+                self._refit_again = False
+
+    def _base_features(self):
+        """
+        The base training matrix and labels: from memory, else from the features file next
+        to the artifact, else (columnar store or no artifact yet) from the data loader.
+        """
+        if self._base is not None:
+            return self._base
+        from scipy import sparse
+
+        from .data_hash import compute_data_hash
+
+        data_hash = self._data_hash = self._data_hash or compute_data_hash(self.store.data_path)
+        base = self.store.load_features(data_hash, self.applied_updates)
+        if base is None:
+            if self.applied_updates:
+                logger.warning("⚠️ Base features for the %d compacted updates are missing; refitting without "
+                               "their rows (the symptom index still has them).", self.applied_updates)
+            from .data_loader import MedicalDataLoader
+
+            loader = MedicalDataLoader(self.store.data_path, self.store.columnar_dir, registry=self.registry)
+            loader.load_and_process_data()
+            processed = loader.get_processed_data()
+            X = processed['X_train']
+            base = (sparse.csr_matrix(X.to_numpy() if hasattr(X, 'columns') else X),
+                    np.asarray(processed['y_train'], dtype=object))
+            if not self.store.columnar_dir:
+                self.store.save_features(*base, data_hash)
+        self._base = base
+        return base
+
+    def _refit(self):
+        """Retrains the estimator on the base data plus every delta row, then swaps it in."""
+        from scipy import sparse
+
+        with self._lock:
+            snapshot = self.system._snapshot
+            delta_rows = list(self._delta_rows)
+        logger.info("🔄 Refitting %s on the base data plus %d delta rows...",
+                    snapshot.predictor.estimator, len(delta_rows))
+
+        X_base, y_base = self._base_features()
+        n_columns = len(snapshot.all_symptoms)
+        # Base columns are a prefix of the registry, so padding aligns them with the snapshot
+        X_base = sparse.csr_matrix((X_base.data, X_base.indices, X_base.indptr), shape=(X_base.shape[0], n_columns))
+        X_delta, y_delta = _encode_rows(delta_rows, snapshot.symptom_index)
+        X = sparse.vstack([X_base, X_delta], format='csr')
+        y = np.concatenate([y_base, y_delta])
+
+        predictor = snapshot.predictor
+        model = make_estimator(predictor.estimator, predictor.random_state, **predictor.params)
+        model.fit(X, y)
+
+        with self._lock:
+            if len(self._delta_rows) > len(delta_rows):
+                # Rows arrived (and may have been partial_fit) meanwhile; retrain once more with them
+                self._refit_again = True
+            current = self.system._snapshot
+            self._publish(current.processed_data, current.predictor.with_model(model, n_columns), current.rules)
+        logger.info("✅ Refitted model swapped in (%d rows, %d symptom columns).", X.shape[0], n_columns)
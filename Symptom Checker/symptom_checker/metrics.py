@@ -0,0 +1,137 @@
+# symptom_checker/metrics.py
+import bisect
+import cProfile
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Log-spaced bucket upper bounds from 1 us to ~100 s, about 10% apart
+_BUCKET_BOUNDS = [1e-6 * (1.1 ** i) for i in range(int(math.log(1e8) / math.log(1.1)) + 2)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are accurate to one bucket (~10%)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper bound (seconds) of the bucket holding the q-th quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(_BUCKET_BOUNDS[i], self.max) if i < len(_BUCKET_BOUNDS) else self.max
+        return self.max
+
+
+class PipelineMetrics:
+    """Thread-safe per-stage latency histograms and event counters for the triage pipeline."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def time(self, stage):
+        """Context manager that records the wall-clock duration of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """Per-stage count, mean and p50/p95/p99 in milliseconds, plus counters."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": h.count,
+                    "mean_ms": h.total / h.count * 1e3 if h.count else 0.0,
+                    "max_ms": h.max * 1e3,
+                    **{f"p{round(q * 100)}_ms": h.percentile(q) * 1e3 for q in QUANTILES},
+                }
+                for stage, h in self.histograms.items()
+            }
+            return {"stages": stages, "counters": dict(self.counters)}
+
+    def to_prometheus(self, prefix="triage", extra_gauges=None):
+        """Renders the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        for stage, s in sorted(snapshot["stages"].items()):
+            for q in QUANTILES:
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} '
+                             f'{s[f"p{round(q * 100)}_ms"] / 1e3:.9f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {s["mean_ms"] * s["count"] / 1e3:.9f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, value in sorted((extra_gauges or {}).items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestProfiler:
+    """
+    Opt-in cProfile hook. Profiles a request when asked explicitly or, with a sample
+    rate, a random fraction of requests; stats are dumped to `output_dir` for pstats/snakeviz.
+    """
+
+    def __init__(self, sample_rate=0.0, output_dir='profiles/'):
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def should_profile(self):
+        if self.sample_rate <= 0:
+            return False
+        with self._lock:
+            self._counter += 1
+            # Deterministic sampling: every 1/sample_rate-th request
+            return self._counter % max(1, round(1 / self.sample_rate)) == 0
+
+    def run(self, label, func, *args, **kwargs):
+        """Runs func under cProfile and writes the stats file; returns (result, stats_path)."""
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args, **kwargs)
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{id(profiler):x}.prof")
+        profiler.dump_stats(path)
+        return result, path
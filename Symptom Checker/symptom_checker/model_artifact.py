@@ -0,0 +1,185 @@
+# symptom_checker/model_artifact.py
+import logging
+import os
+
+import joblib
+import numpy as np
+
+from .data_hash import compute_data_hash
+from .disease_predictor import DiseasePredictor
+from .symptom_registry import SymptomRegistry
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the artifact layout changes so stale files are never unpickled into new code
+ARTIFACT_FORMAT_VERSION = 8
+
+# Processed structures that serving needs; the training matrices are deliberately left out
+SERVING_KEYS = ('all_symptoms', 'symptom_index', 'severity_mapping', 'precaution_mapping', 'description_mapping')
+
+
+def resolve_estimator(estimator=None, chunk_size=None):
+    """The estimator to train: tree by default, naive_bayes (partial_fit capable) when streaming."""
+    return estimator or ('naive_bayes' if chunk_size else 'tree')
+
+
+def train_predictor(processed_data, chunk_size=None, estimator=None):
+    """
+    Trains a DiseasePredictor on loader output. With chunk_size set the model is fitted
+    out-of-core, chunk_size rows at a time (estimator defaults to naive_bayes then).
+    """
+    from .columnar_store import iter_row_blocks
+
+    X_train, y_train = processed_data['X_train'], processed_data['y_train']
+    predictor = DiseasePredictor(estimator=resolve_estimator(estimator, chunk_size))
+    if chunk_size:
+        predictor.train_incremental(iter_row_blocks(X_train, y_train, chunk_size),
+                                    processed_data['all_symptoms'], y_train.cat.categories)
+    else:
+        predictor.train(X_train, y_train, processed_data['all_symptoms'])
+    return predictor
+
+
+class ModelArtifactStore:
+    """
+    Saves and loads the processed lookup tables plus the fitted predictor as one artifact.
+
+    Next to each artifact it keeps the base training matrix (unless a columnar store
+    already holds it), so live-update refits never reprocess the CSVs, and the append-only
+    log of live updates applied on top of the base data. An artifact records how many
+    leading log entries it already includes ('applied_updates'); its base matrix then
+    covers their rows too.
+    """
+
+    def __init__(self, data_path='data/', artifact_dir='artifacts/', columnar_dir=None,
+                 chunk_size=None, estimator=None, registry_path=None):
+        self.data_path = data_path
+        self.artifact_dir = artifact_dir
+        self.columnar_dir = columnar_dir
+        self.chunk_size = chunk_size
+        # None accepts whichever estimator the current artifact holds (e.g. one chosen by model selection)
+        self.estimator = estimator
+        # Stable symptom IDs shared by every artifact built in this directory
+        self.registry_path = registry_path or os.path.join(artifact_dir, 'symptom_registry.json')
+
+    def registry(self):
+        """The symptom ID registry for this artifact directory."""
+        return SymptomRegistry(self.registry_path).load()
+
+    def artifact_path(self, data_hash):
+        """Path of the artifact built from data with the given content hash."""
+        return os.path.join(self.artifact_dir, f'triage_v{ARTIFACT_FORMAT_VERSION}_{data_hash[:16]}.joblib')
+
+    def features_path(self, data_hash, applied_updates=0):
+        """Path of the cached base training matrix for the data plus the first `applied_updates` logged updates."""
+        suffix = f'_u{applied_updates}' if applied_updates else ''
+        return os.path.join(self.artifact_dir, f'features_{data_hash[:16]}{suffix}.npz')
+
+    @property
+    def update_log_path(self):
+        """Append-only JSON-lines log of the live updates applied in this artifact directory."""
+        return os.path.join(self.artifact_dir, 'live_updates.jsonl')
+
+    def save_features(self, X_train, y_train, data_hash, applied_updates=0):
+        """Writes the binary training matrix (any layout) and its disease labels as one .npz."""
+        from scipy import sparse
+
+        X = sparse.csr_matrix(X_train.to_numpy() if hasattr(X_train, 'columns') else X_train)
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        path = self.features_path(data_hash, applied_updates)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, indptr=X.indptr, indices=X.indices, shape=np.array(X.shape),
+                     labels=np.asarray(y_train, dtype=str))
+        os.replace(tmp_path, path)
+
+    def load_features(self, data_hash, applied_updates=0):
+        """(CSR matrix, disease labels) saved by save_features(), or None if there are none."""
+        from scipy import sparse
+
+        path = self.features_path(data_hash, applied_updates)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as arrays:
+            indices = arrays['indices']
+            X = sparse.csr_matrix((np.ones(len(indices), dtype=np.uint8), indices, arrays['indptr']),
+                                  shape=tuple(arrays['shape']))
+            return X, arrays['labels'].astype(object)
+
+    def discard_features(self, data_hash, applied_updates):
+        """Removes a base matrix superseded by a later compaction."""
+        try:
+            os.remove(self.features_path(data_hash, applied_updates))
+        except FileNotFoundError:
+            pass
+
+    def load(self, data_hash=None):
+        """Loads the artifact for the current data, or returns None if there is no current one."""
+        data_hash = data_hash or compute_data_hash(self.data_path)
+        path = self.artifact_path(data_hash)
+        if not os.path.exists(path):
+            return None
+        try:
+            artifact = joblib.load(path)
+        except Exception as e:
+            logger.warning("⚠️ Could not read model artifact %s (%s), it will be rebuilt.", path, e)
+            return None
+        if artifact.get('format_version') != ARTIFACT_FORMAT_VERSION or artifact.get('data_hash') != data_hash:
+            return None
+        if self.estimator and artifact['predictor'].estimator != self.estimator:
+            return None
+        # Columns must still match the stable symptom IDs (e.g. if the registry was reset)
+        symptoms = list(artifact['processed_data']['all_symptoms'])
+        if self.registry().extend(symptoms)[:len(symptoms)] != symptoms:
+            return None
+        return artifact
+
+    def build(self, data_hash=None):
+        """Processes the CSVs, trains the predictor and writes a fresh artifact atomically."""
+        # The loader (pandas) is only needed when the artifact has to be rebuilt
+        from .data_loader import MedicalDataLoader
+
+        data_hash = data_hash or compute_data_hash(self.data_path)
+        data_loader = MedicalDataLoader(self.data_path, self.columnar_dir, self.chunk_size, self.registry())
+        data_loader.load_and_process_data()
+        processed_data = data_loader.get_processed_data()
+        predictor = train_predictor(processed_data, self.chunk_size, self.estimator)
+        return self.save(processed_data, predictor, data_hash)
+
+    def save(self, processed_data, predictor, data_hash=None, applied_updates=0, features=None):
+        """
+        Writes an artifact for an already trained predictor atomically and returns it.
+
+        applied_updates: leading update-log entries already included in processed_data and
+        the predictor; `features` is then their (X, y) base matrix including those rows.
+        """
+        data_hash = data_hash or compute_data_hash(self.data_path)
+        artifact = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'data_hash': data_hash,
+            'processed_data': {key: processed_data[key] for key in SERVING_KEYS},
+            'predictor': predictor,
+            'applied_updates': applied_updates,
+        }
+
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        if features is not None:
+            # Written first: an artifact must never point at a base matrix that is not there yet
+            self.save_features(*features, data_hash, applied_updates)
+        elif not self.columnar_dir and 'X_train' in processed_data:
+            self.save_features(processed_data['X_train'], processed_data['y_train'], data_hash)
+        path = self.artifact_path(data_hash)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, path)
+        logger.info("💾 Model artifact saved to %s", path)
+        return artifact
+
+    def load_or_build(self):
+        """Returns the current artifact, retraining only when the data has changed."""
+        data_hash = compute_data_hash(self.data_path)
+        artifact = self.load(data_hash)
+        if artifact is not None:
+            logger.info("✅ Loaded model artifact %s", self.artifact_path(data_hash))
+            return artifact
+        return self.build(data_hash)
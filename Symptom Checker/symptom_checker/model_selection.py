@@ -0,0 +1,175 @@
+# symptom_checker/model_selection.py
+"""
+Cross-validated model selection over the estimator registry.
+
+Every (estimator, hyperparameters, fold) combination is an independent task run in
+parallel with joblib, one core each. For every candidate the report holds the mean
+k-fold accuracy next to its fit time and its single-row and batch predict latency,
+so accuracy can be weighed against serving cost. Latencies are measured while other
+folds run on the remaining cores, so compare them relative to each other.
+
+dataset.csv repeats most symptom profiles many times, so the folds are split over the
+distinct (profile, disease) rows: a test profile is never also in the training fold.
+Each test profile is scored twice, on its full symptom set and as a partial query
+holding a random PARTIAL_QUERY_SHARE of its symptoms, which is what patients actually
+enter; candidates are ranked and chosen on the partial-query accuracy.
+"""
+import itertools
+import logging
+import time
+from collections import namedtuple
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy import sparse
+from sklearn.model_selection import StratifiedKFold
+
+from .disease_predictor import DiseasePredictor
+from .estimators import ESTIMATORS, make_estimator
+
+logger = logging.getLogger(__name__)
+
+CandidateResult = namedtuple('CandidateResult', [
+    'estimator', 'params', 'accuracy', 'accuracy_std', 'full_accuracy', 'fit_s', 'predict_single_us',
+    'predict_batch_us',
+])
+
+# Rows timed one at a time per fold for the single-row predict latency
+SINGLE_PREDICT_SAMPLES = 50
+
+# Share of a test profile's symptoms kept in its partial query (at least one)
+PARTIAL_QUERY_SHARE = 0.5
+
+
+def candidate_grid(estimators=None):
+    """Expands the registered parameter grids into (estimator, params) pairs."""
+    candidates = []
+    for name in estimators or ESTIMATORS:
+        grid = ESTIMATORS[name].param_grid
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            candidates.append((name, dict(zip(keys, values))))
+    return candidates
+
+
+def unique_profiles(X, y):
+    """The distinct (symptom profile, disease) rows of X, y, in first-seen order."""
+    dense = X.toarray() if sparse.issparse(X) else X
+    first = {}
+    for i, (row, label) in enumerate(zip(dense, y)):
+        first.setdefault((np.flatnonzero(row).tobytes(), label), i)
+    keep = np.fromiter(first.values(), dtype=np.int64)
+    return X[keep], y[keep]
+
+
+def partial_queries(X, share=PARTIAL_QUERY_SHARE, random_state=42):
+    """A copy of X keeping a random `share` of each row's symptoms (at least one per row)."""
+    rng = np.random.default_rng(random_state)
+    partial = (X.toarray() if sparse.issparse(X) else np.array(X)).copy()
+    for row in partial:
+        present = np.flatnonzero(row)
+        if len(present) > 1:
+            dropped = rng.permutation(present)[max(1, round(len(present) * share)):]
+            row[dropped] = 0
+    return sparse.csr_matrix(partial) if sparse.issparse(X) else partial
+
+
+def _evaluate_fold(name, params, X, y, train_idx, test_idx, X_partial, random_state):
+    model = make_estimator(name, random_state, **params)
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_s = time.perf_counter() - start
+
+    X_test = X[test_idx]
+    start = time.perf_counter()
+    predicted = model.predict(X_test)
+    batch_s = time.perf_counter() - start
+    partial_accuracy = float(np.mean(model.predict(X_partial) == y[test_idx]))
+
+    single = []
+    for i in range(min(SINGLE_PREDICT_SAMPLES, X_test.shape[0])):
+        row = X_test[i:i + 1]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    return (partial_accuracy, float(np.mean(predicted == y[test_idx])), fit_s,
+            float(np.median(single)) * 1e6, batch_s / X_test.shape[0] * 1e6)
+
+
+def cross_validate_candidates(X, y, candidates=None, folds=5, n_jobs=-1, random_state=42):
+    """
+    Runs stratified k-fold CV over the distinct profiles for every candidate in parallel;
+    returns CandidateResults, best partial-query accuracy first.
+    """
+    X = sparse.csr_matrix(X) if sparse.issparse(X) else np.asarray(X)
+    y = np.asarray(y, dtype=object)
+    n_rows = len(y)
+    X, y = unique_profiles(X, y)
+    candidates = candidates or candidate_grid()
+    # Every class needs a member in each fold
+    folds = max(2, min(folds, int(np.unique(y, return_counts=True)[1].min())))
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state).split(np.zeros(len(y)), y))
+    # The same partial queries for every candidate
+    partials = [partial_queries(X[test_idx], random_state=random_state + fold) for fold, (_, test_idx) in enumerate(splits)]
+
+    logger.info("🔍 Cross-validating %d candidates x %d folds over %d distinct profiles (of %d rows)...",
+                len(candidates), folds, len(y), n_rows)
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(name, params, X, y, train_idx, test_idx, X_partial, random_state)
+        for name, params in candidates
+        for (train_idx, test_idx), X_partial in zip(splits, partials)
+    )
+
+    results = []
+    for i, (name, params) in enumerate(candidates):
+        fold_scores = np.array(scores[i * folds:(i + 1) * folds])
+        results.append(CandidateResult(
+            name, params,
+            accuracy=float(fold_scores[:, 0].mean()),
+            accuracy_std=float(fold_scores[:, 0].std()),
+            full_accuracy=float(fold_scores[:, 1].mean()),
+            fit_s=float(fold_scores[:, 2].mean()),
+            predict_single_us=float(fold_scores[:, 3].mean()),
+            predict_batch_us=float(fold_scores[:, 4].mean()),
+        ))
+    return sorted(results, key=lambda r: (-r.accuracy, r.predict_single_us))
+
+
+def choose_candidate(results, tolerance=0.005):
+    """
+    The fastest single-row predictor among candidates whose partial-query accuracy is
+    within `tolerance` of the best one.
+    """
+    best_accuracy = max(r.accuracy for r in results)
+    return min((r for r in results if r.accuracy >= best_accuracy - tolerance), key=lambda r: r.predict_single_us)
+
+
+def format_report(results, chosen=None):
+    """Renders the CV results as a fixed-width table."""
+    lines = [f"{'estimator':>14} {'params':<40} {'partial':>9} {'+/-':>6} {'full':>7} {'fit s':>7} "
+             f"{'single us':>10} {'batch us':>9}"]
+    for r in results:
+        marker = '  <- chosen' if r is chosen else ''
+        params = ", ".join(f"{k}={v}" for k, v in r.params.items())
+        lines.append(f"{r.estimator:>14} {params:<40} {r.accuracy:9.4f} {r.accuracy_std:6.4f} {r.full_accuracy:7.4f} {r.fit_s:7.3f} "
+                     f"{r.predict_single_us:10.1f} {r.predict_batch_us:9.2f}{marker}")
+    return "\n".join(lines)
+
+
+def select_predictor(processed_data, candidates=None, folds=5, n_jobs=-1, tolerance=0.005, random_state=42):
+    """
+    Cross-validates the candidates, then trains the chosen one on all rows.
+
+    Returns (trained DiseasePredictor, chosen CandidateResult, all results).
+    """
+    X, y = processed_data['X_train'], processed_data['y_train']
+    if hasattr(X, 'columns'):
+        X = X.to_numpy()
+    results = cross_validate_candidates(X, y, candidates, folds, n_jobs, random_state)
+    chosen = choose_candidate(results, tolerance)
+    logger.info("✅ Chose %s %s (partial-query accuracy %.4f, %.1f us per prediction)",
+                chosen.estimator, chosen.params, chosen.accuracy, chosen.predict_single_us)
+
+    predictor = DiseasePredictor(random_state, estimator=chosen.estimator, params=chosen.params)
+    predictor.train(X, y, processed_data['all_symptoms'])
+    return predictor, chosen, results
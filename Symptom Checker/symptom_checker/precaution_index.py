@@ -0,0 +1,131 @@
+# symptom_checker/precaution_index.py
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .rag_precaution_fetcher import GROQ_MODEL, NO_PRECAUTIONS_FOUND, PROMPT_VERSION, SUMMARY_UNAVAILABLE
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+class PrecautionIndex:
+    """
+    Precomputed disease -> precautions lookup written by the offline refresh job.
+
+    The file is plain JSON so it can be inspected and shipped alongside the model
+    artifact; serving only ever does a dict lookup.
+    """
+
+    def __init__(self, path='artifacts/precaution_index.json'):
+        self.path = path
+        self.version = 0
+        self.generated_at = None
+        self.entries = {}
+
+    def load(self):
+        """Loads the index from disk if it exists; returns self for chaining."""
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, encoding='utf-8') as f:
+            payload = json.load(f)
+        if payload.get('format_version') != INDEX_FORMAT_VERSION:
+            logger.warning("⚠️ Ignoring precaution index %s with unsupported format.", self.path)
+            return self
+        self.version = payload['version']
+        self.generated_at = payload['generated_at']
+        self.entries = payload['entries']
+        return self
+
+    def save(self):
+        """Writes the index atomically, bumping its version."""
+        self.version += 1
+        self.generated_at = time.time()
+        payload = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'version': self.version,
+            'generated_at': self.generated_at,
+            'model': GROQ_MODEL,
+            'prompt_version': PROMPT_VERSION,
+            'entries': self.entries,
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def get(self, disease):
+        """Returns the stored precautions for a disease, or None."""
+        entry = self.entries.get(disease)
+        return entry['precautions'] if entry is not None else None
+
+    def set(self, disease, precautions, fetched_at=None):
+        self.entries[disease] = {
+            'precautions': precautions,
+            'fetched_at': fetched_at if fetched_at is not None else time.time(),
+        }
+
+    def stale_diseases(self, diseases, max_age=None, now=None):
+        """Diseases that are missing from the index or older than `max_age` seconds."""
+        now = now if now is not None else time.time()
+        stale = []
+        for disease in diseases:
+            entry = self.entries.get(disease)
+            if entry is None or (max_age is not None and now - entry['fetched_at'] > max_age):
+                stale.append(disease)
+        return stale
+
+    def __contains__(self, disease):
+        return disease in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def _fetch_with_retries(fetcher, disease, retries, backoff):
+    """Runs fetcher.fetch_precautions, retrying when it returns an upstream failure placeholder."""
+    for attempt in range(retries + 1):
+        try:
+            summary = fetcher.fetch_precautions(disease)
+            if summary not in (SUMMARY_UNAVAILABLE, NO_PRECAUTIONS_FOUND):
+                return summary
+        except Exception as e:
+            logger.warning("⚠️ Precaution fetch for %s failed (attempt %d): %s", disease, attempt + 1, e)
+        if attempt < retries:
+            time.sleep(backoff * (2 ** attempt))
+    return None
+
+
+def refresh_precaution_index(fetcher, diseases, index, max_age=None, max_workers=4, retries=2, backoff=1.0):
+    """
+    Offline bulk job: fetches precautions for every missing or stale disease and saves the index.
+
+    At most `max_workers` fetches run at once and each is retried with exponential backoff.
+    Diseases that still fail keep their previous entry (if any). Pass a fetcher with a fresh
+    cache so refreshed entries are not served from a long-lived summary cache.
+    Returns a dict with the refreshed and failed disease lists.
+    """
+    stale = index.stale_diseases(diseases, max_age=max_age)
+    logger.info("🔄 Refreshing precautions for %d of %d diseases...", len(stale), len(diseases))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        summaries = list(pool.map(lambda d: _fetch_with_retries(fetcher, d, retries, backoff), stale))
+
+    refreshed, failed = [], []
+    for disease, summary in zip(stale, summaries):
+        if summary is None:
+            failed.append(disease)
+        else:
+            index.set(disease, summary)
+            refreshed.append(disease)
+
+    index.save()
+    logger.info("✅ Precaution index v%d saved to %s (%d refreshed, %d failed).",
+                index.version, index.path, len(refreshed), len(failed))
+    return {'refreshed': refreshed, 'failed': failed}
@@ -0,0 +1,259 @@
+# symptom_checker/rag_backends.py
+"""
+Pluggable search and LLM backends for the RAG precaution fetchers.
+
+A search backend turns a query into a list of organic results ({'title', 'snippet', ...});
+an LLM backend turns a prompt into text. Each has a `name` that scopes its entries in the
+fetcher caches, so responses from different backends never mix.
+
+- SerpAPISearch / GroqLLM: the real upstream services (clients imported on first use).
+- LocalSearch / LocalSummarizer: deterministic stand-ins built from precaution_mapping,
+  for machines without network access or API keys.
+- RecordReplaySearch / RecordReplayLLM: save upstream responses to a JSON cassette and
+  serve them back, optionally with injected latency, slow-tail responses and errors, so
+  throughput and tail-latency tests are reproducible offline.
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+from .rag_precaution_fetcher import GROQ_MODEL, SERP_ENGINE, build_query, organic_results
+
+REPLAY_MODES = ('replay', 'record', 'auto')
+
+
+class InjectedFailure(ConnectionError):
+    """Error raised by a replay backend to simulate an upstream failure."""
+
+
+class ReplayMiss(LookupError):
+    """The replay cassette has no response recorded for this request."""
+
+
+class SearchBackend:
+    name = 'search'
+
+    def search(self, query):
+        """Organic results for a query."""
+        raise NotImplementedError
+
+    async def asearch(self, query):
+        return await asyncio.to_thread(self.search, query)
+
+
+class LLMBackend:
+    name = 'llm'
+
+    def complete(self, prompt):
+        """The model's answer to a prompt."""
+        raise NotImplementedError
+
+    async def acomplete(self, prompt):
+        return await asyncio.to_thread(self.complete, prompt)
+
+
+class SerpAPISearch(SearchBackend):
+    def __init__(self, api_key, engine=SERP_ENGINE):
+        self.api_key = api_key
+        self.engine = engine
+        self.name = engine
+
+    def search(self, query):
+        from serpapi import GoogleSearch
+
+        return organic_results(GoogleSearch({'q': query, 'api_key': self.api_key, 'engine': self.engine}).get_dict())
+
+
+class GroqLLM(LLMBackend):
+    def __init__(self, api_key, model=GROQ_MODEL):
+        from groq import Groq
+
+        self.client = Groq(api_key=api_key)
+        self.model = model
+        self.name = model
+
+    def complete(self, prompt):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content.strip()
+
+
+class LocalSearch(SearchBackend):
+    """Answers precaution queries with one result per disease from the local precaution data."""
+
+    name = 'local'
+
+    def __init__(self, precaution_mapping):
+        self.precaution_mapping = precaution_mapping
+        self._by_query = {build_query(disease): disease for disease in precaution_mapping}
+
+    def search(self, query):
+        disease = self._by_query.get(query)
+        precautions = self.precaution_mapping.get(disease)
+        if not precautions:
+            return []
+        return [{'title': f"Precautions for {disease}", 'snippet': ". ".join(p.capitalize() for p in precautions) + "."}]
+
+
+class LocalSummarizer(LLMBackend):
+    """
+    Deterministic summarizer: turns the source sentences in a prompt into markdown
+    bullet points. summarize() formats a disease's local precautions the same way, for
+    use as a fallback when the upstream pipeline fails.
+    """
+
+    name = 'local-summarizer'
+
+    def __init__(self, precaution_mapping=None, max_points=5):
+        self.precaution_mapping = precaution_mapping or {}
+        self.max_points = max_points
+
+    def complete(self, prompt):
+        # The sources follow the instruction line of build_prompt()
+        sources = prompt.split("\n\n", 1)[-1]
+        sentences = [s.strip() for s in sources.replace("\n", " ").split(".")]
+        return self._bullets(s for s in sentences if s)
+
+    def summarize(self, disease):
+        """Local precautions for a disease as markdown bullets, or None if there are none."""
+        precautions = self.precaution_mapping.get(disease)
+        return self._bullets(precautions) if precautions else None
+
+    def _bullets(self, points):
+        points = list(dict.fromkeys(p[0].upper() + p[1:] for p in points))[:self.max_points]
+        return "\n".join(f"- {p}" for p in points)
+
+
+class _RecordReplay:
+    """
+    Shared cassette logic. Modes: 'replay' serves recorded responses only (a missing one
+    raises ReplayMiss), 'record' calls the upstream backend and saves every response,
+    'auto' replays what is recorded and records the rest.
+
+    Replayed responses wait `latency` seconds plus up to `jitter`; a `slow_rate` share of
+    them take `slow_latency` instead, and an `error_rate` share raise InjectedFailure.
+    Pass `seed` for a reproducible sequence of delays and failures.
+    """
+
+    def __init__(self, path, upstream=None, mode='replay', latency=0.0, jitter=0.0,
+                 slow_rate=0.0, slow_latency=0.0, error_rate=0.0, seed=None):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode '{mode}', expected one of {REPLAY_MODES}")
+        if mode != 'replay' and upstream is None:
+            raise ValueError(f"Mode '{mode}' needs an upstream backend to record from.")
+        self.path = path
+        self.upstream = upstream
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # Replayed calls and injected failures, for load-test reports
+        self.calls = 0
+        self.failures = 0
+        self.responses = {}
+        self.name = upstream.name if upstream is not None else None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                cassette = json.load(f)
+            self.responses = cassette['responses']
+            self.name = self.name or cassette['name']
+        elif mode == 'replay':
+            raise FileNotFoundError(f"No replay cassette at {path}; record one first.")
+
+    def __len__(self):
+        return len(self.responses)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'name': self.name, 'responses': self.responses}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def _fault(self):
+        """Draws the injected delay and whether this call fails."""
+        with self._lock:
+            if self._rng.random() < self.slow_rate:
+                delay = self.slow_latency
+            else:
+                delay = self.latency + self._rng.random() * self.jitter
+            failed = self._rng.random() < self.error_rate
+            self.calls += 1
+            self.failures += failed
+            return delay, failed
+
+    def _replayed(self, request):
+        response = self.responses.get(request)
+        if response is None:
+            raise ReplayMiss(f"No recorded {self.name} response for {request!r}")
+        return response
+
+    def _record(self, request, response):
+        with self._lock:
+            self.responses[request] = response
+            self.save()
+        return response
+
+    def _should_record(self, request):
+        return self.mode == 'record' or (self.mode == 'auto' and request not in self.responses)
+
+    def _call(self, request, upstream_call):
+        if self._should_record(request):
+            return self._record(request, upstream_call(request))
+        delay, failed = self._fault()
+        time.sleep(delay)
+        if failed:
+            raise InjectedFailure(f"Injected {self.name} failure")
+        return self._replayed(request)
+
+    async def _acall(self, request, upstream_call):
+        if self._should_record(request):
+            return self._record(request, await upstream_call(request))
+        delay, failed = self._fault()
+        await asyncio.sleep(delay)
+        if failed:
+            raise InjectedFailure(f"Injected {self.name} failure")
+        return self._replayed(request)
+
+
+class RecordReplaySearch(_RecordReplay, SearchBackend):
+    def search(self, query):
+        return self._call(query, lambda q: self.upstream.search(q))
+
+    async def asearch(self, query):
+        return await self._acall(query, lambda q: self.upstream.asearch(q))
+
+
+class RecordReplayLLM(_RecordReplay, LLMBackend):
+    def complete(self, prompt):
+        return self._call(prompt, lambda p: self.upstream.complete(p))
+
+    async def acomplete(self, prompt):
+        return await self._acall(prompt, lambda p: self.upstream.acomplete(p))
+
+
+def replay_backends(directory, mode='replay', search_upstream=None, llm_upstream=None, **faults):
+    """
+    Record/replay search and LLM backends with cassettes in `directory` (search.json and
+    llm.json); `faults` (latency, jitter, slow_rate, slow_latency, error_rate, seed)
+    apply to both.
+    """
+    llm_faults = dict(faults)
+    if faults.get('seed') is not None:
+        # Independent (but still reproducible) fault sequences for the two backends
+        llm_faults['seed'] = faults['seed'] + 1
+    return (
+        RecordReplaySearch(os.path.join(directory, 'search.json'), search_upstream, mode, **faults),
+        RecordReplayLLM(os.path.join(directory, 'llm.json'), llm_upstream, mode, **llm_faults),
+    )
@@ -1,83 +1,150 @@
-from symptom_checker.disease_predictor import DiseasePredictor
-from serpapi import GoogleSearch
-from groq import Groq
-from dotenv import load_dotenv
+# serpapi and groq are imported on first use so the constants and helpers below stay
+# cheap to import (precaution_index and the offline TriageSystem only need those)
+from symptom_checker.cache import MemoryCache
+import logging
 import os
 
-# === Load environment variables ===
-load_dotenv(dotenv_path='C:/Users/akshi/OneDrive/Documents/Symptom Checker/symptom_checker/safe.env')
+logger = logging.getLogger(__name__)
+
+SERP_ENGINE = 'duckduckgo'
+GROQ_MODEL = "llama3-8b-8192"
+# Bump whenever build_prompt() changes so cached summaries from the old prompt are ignored
+PROMPT_VERSION = 1
+NO_PRECAUTIONS_FOUND = "No relevant precautions found."
+SUMMARY_UNAVAILABLE = "Summary unavailable due to API error."
+DEFAULT_SEARCH_TTL = 7 * 24 * 3600
+DEFAULT_SUMMARY_TTL = 24 * 3600
+
+
+class SearchAPIError(RuntimeError):
+    """The search API answered with an error payload (e.g. an invalid key or exhausted quota)."""
+
+
+def organic_results(payload):
+    """Organic results of a SerpAPI response; an 'error' payload raises SearchAPIError."""
+    if payload.get('error'):
+        raise SearchAPIError(payload['error'])
+    return payload.get('organic_results', [])
+
+
+def build_query(disease):
+    """Search query used to look up precautions for a disease."""
+    return f"precautions for {disease}"
+
+
+def join_snippets(results, limit=5):
+    """Joins the snippets of the top search results into one context string."""
+    return " ".join([r.get("snippet", "") for r in results[:limit]])
+
+
+def build_prompt(snippets):
+    """Summarization prompt sent to the LLM."""
+    return f"Based on the following sources, summarize key medical precautions in simple points:\n\n{snippets}"
+
+
+def search_cache_key(query, engine=SERP_ENGINE):
+    """Cache key for a search result, scoped to the search engine (backend name)."""
+    return f"search:{engine}:{query}"
+
+
+def summary_cache_key(disease, model=GROQ_MODEL):
+    """Cache key for a summary, scoped to the LLM model (backend name) and prompt version."""
+    return f"summary:{model}:p{PROMPT_VERSION}:{disease}"
+
 
 class RAGPrecautionFetcher:
-    def __init__(self, serp_api_key=None, groq_api_key=None):
+    """
+    Fetches precautions through a search backend and an LLM backend (SerpAPI and Groq by
+    default, see rag_backends for local and record/replay stand-ins). API keys are only
+    required for the default backends that are actually used. With a `fallback`
+    LocalSummarizer, upstream failures return its local summary instead of a placeholder.
+    """
+
+    def __init__(self, serp_api_key=None, groq_api_key=None, cache=None,
+                 search_ttl=DEFAULT_SEARCH_TTL, summary_ttl=DEFAULT_SUMMARY_TTL,
+                 search_backend=None, llm_backend=None, fallback=None):
+        from .rag_backends import GroqLLM, SerpAPISearch
+
         self.serp_api_key = serp_api_key or os.getenv("SERP_API_KEY")
         self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
 
-        if not self.serp_api_key:
+        if search_backend is None and not self.serp_api_key:
             raise ValueError("❌ SERP API key is missing!")
-        if not self.groq_api_key:
+        if llm_backend is None and not self.groq_api_key:
             raise ValueError("❌ GROQ API key is missing!")
 
-        self.client = Groq(api_key=self.groq_api_key)
-        self.cache = {}
+        self.search_backend = search_backend if search_backend is not None else SerpAPISearch(self.serp_api_key)
+        self.llm_backend = llm_backend if llm_backend is not None else GroqLLM(self.groq_api_key)
+        self.fallback = fallback
+        # Any BaseCache works here, e.g. SQLiteCache to share results between worker processes
+        self.cache = cache if cache is not None else MemoryCache()
+        self.search_ttl = search_ttl
+        self.summary_ttl = summary_ttl
 
     def query_serp_api(self, query):
-        """Query SERP API (DuckDuckGo engine)"""
-        if query in self.cache:
-            return self.cache[query]
-
-        params = {
-            'q': query,
-            'api_key': self.serp_api_key,
-            'engine': 'duckduckgo'
-        }
+        """Query the search backend (SERP API with the DuckDuckGo engine by default)"""
+        key = search_cache_key(query, self.search_backend.name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            organic_results = results.get('organic_results', [])
-            self.cache[query] = organic_results
-            return organic_results
+            results = self.search_backend.search(query)
+            # An empty answer is not cached: it may be a transient upstream problem
+            if results:
+                self.cache.set(key, results, ttl=self.search_ttl)
+            return results
         except Exception as e:
-            print(f"❌ SERP API query failed: {e}")
+            logger.error("❌ SERP API query failed: %s", e)
             return []
 
     def summarize_with_groq(self, snippets):
-        """Send SERP snippets to Groq for clean summarization"""
+        """Send SERP snippets to the LLM backend (Groq by default) for clean summarization"""
         if not snippets:
-            return "No relevant precautions found."
+            return NO_PRECAUTIONS_FOUND
 
-        prompt = f"Based on the following sources, summarize key medical precautions in simple points:\n\n{snippets}"
+        prompt = build_prompt(snippets)
         try:
-            response = self.client.chat.completions.create(
-                model="llama3-8b-8192",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.choices[0].message.content.strip()
+            return self.llm_backend.complete(prompt)
         except Exception as e:
-            print(f"❌ Groq summarization failed: {e}")
-            return "Summary unavailable due to API error."
+            logger.error("❌ Groq summarization failed: %s", e)
+            return SUMMARY_UNAVAILABLE
 
     def fetch_precautions(self, disease):
         """Fetch & summarize precautions for a predicted disease"""
-        query = f"precautions for {disease}"
+        key = summary_cache_key(disease, self.llm_backend.name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        query = build_query(disease)
         results = self.query_serp_api(query)
-        snippets = " ".join([r.get("snippet", "") for r in results[:5]])
-        return self.summarize_with_groq(snippets)
+        snippets = join_snippets(results)
+        summary = self.summarize_with_groq(snippets)
+        # Only cache real summaries, never the placeholders produced by upstream failures
+        if results and summary != SUMMARY_UNAVAILABLE:
+            self.cache.set(key, summary, ttl=self.summary_ttl)
+        elif self.fallback is not None:
+            summary = self.fallback.summarize(disease) or summary
+        return summary
 
 # ======= Example Standalone Run =======
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from symptom_checker.model_artifact import ModelArtifactStore
+
+    # === Load environment variables ===
+    load_dotenv(dotenv_path='safe.env')
+
     # Example patient symptoms
-    patient_symptoms = ["fever", "cough", "body pain"]
+    patient_symptoms = ["high_fever", "cough", "muscle_pain"]
 
-    # Dummy mapping for rule-based fallback (if model not trained)
-    symptom_disease_map = {
-        "fever": ["flu", "dengue"],
-        "cough": ["flu", "bronchitis"],
-        "body pain": ["flu", "dengue"]
-    }
+    # Load (or build) the trained predictor
+    predictor = ModelArtifactStore().load_or_build()['predictor']
 
     # Predict disease
-    predicted_diseases = DiseasePredictor.predict(patient_symptoms, symptom_disease_map)
-    predicted_disease = predicted_diseases[0] if predicted_diseases else "Unknown"
+    predicted_diseases = predictor.rank(patient_symptoms, k=3, method='index')
+    predicted_disease = predicted_diseases[0][0] if predicted_diseases else "Unknown"
 
     print(f"🩺 Predicted Disease: {predicted_disease}")
 
@@ -1,9 +1,12 @@
 class SeverityAssessor:
+    HIGH_THRESHOLD = 12
+    MEDIUM_THRESHOLD = 8
+
     @staticmethod
     def classify(risk_score):
-        if risk_score >= 12:
+        if risk_score >= SeverityAssessor.HIGH_THRESHOLD:
             return "HIGH"
-        elif risk_score >= 8:
+        elif risk_score >= SeverityAssessor.MEDIUM_THRESHOLD:
             return "MEDIUM"
         else:
             return "LOW"
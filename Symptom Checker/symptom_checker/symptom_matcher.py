@@ -0,0 +1,176 @@
+# symptom_checker/symptom_matcher.py
+import re
+from collections import Counter, namedtuple
+from difflib import SequenceMatcher
+
+SymptomMatch = namedtuple('SymptomMatch', ['input', 'symptom', 'confidence'])
+
+# Common lay terms mapped to the canonical dataset symptom they most likely mean
+DEFAULT_SYNONYMS = {
+    'rash': 'skin_rash',
+    'itchy': 'itching',
+    'tired': 'fatigue',
+    'tiredness': 'fatigue',
+    'throwing_up': 'vomiting',
+    'puking': 'vomiting',
+    'diarrhea': 'diarrhoea',
+    'stuffy_nose': 'congestion',
+    'sneezing': 'continuous_sneezing',
+    'shortness_of_breath': 'breathlessness',
+    'short_of_breath': 'breathlessness',
+    'body_pain': 'muscle_pain',
+    'body_ache': 'muscle_pain',
+    'stomach_ache': 'stomach_pain',
+    'stomachache': 'stomach_pain',
+    'heartburn': 'acidity',
+    'dizzy': 'dizziness',
+    'jaundice': 'yellowish_skin',
+    'frequent_urination': 'polyuria',
+    'blurred_vision': 'blurred_and_distorted_vision',
+    'joint_ache': 'joint_pain',
+}
+
+# A bare 'fever' is deliberately not a synonym: it could be mild_fever or high_fever
+
+# Words that say nothing about where or what the symptom is; a fuzzy match only has to
+# find the other words of the symptom (the body part, the sensation, ...) in the input
+GENERIC_TOKENS = frozenset({'pain', 'ache', 'aches', 'aching', 'sore', 'of', 'in', 'on', 'the', 'and', 'my', 'a'})
+
+# How close a symptom word has to be to the matching part of the input
+MIN_TOKEN_SIMILARITY = 0.8
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_FUZZY_CACHE_LIMIT = 10000
+# Marks a cache miss, since None is a cached "no match"
+_NOT_CACHED = object()
+
+
+def canonical_key(text):
+    """Lowercases and collapses every run of non-alphanumerics to one underscore."""
+    return _NON_ALNUM.sub('_', text.lower()).strip('_')
+
+
+def _fuzzy_contains(text, token):
+    """
+    Whether `text` contains `token`, a window of about its length that is close to it,
+    or a same-length window with the same letters (a transposition typo).
+    """
+    if token in text:
+        return True
+    letters = sorted(token)
+    for size in range(max(1, len(token) - 1), len(token) + 2):
+        for start in range(len(text) - size + 1):
+            window = text[start:start + size]
+            if size == len(token) and sorted(window) == letters:
+                return True
+            if SequenceMatcher(None, token, window).ratio() >= MIN_TOKEN_SIMILARITY:
+                return True
+    return False
+
+
+def _specific_words(key):
+    return [token for token in key.split('_') if len(token) > 2 and token not in GENERIC_TOKENS]
+
+
+def tokens_covered(key, candidate_key):
+    """
+    Whether the specific (non-generic) words of the input and of the candidate symptom
+    each appear, allowing a typo, in the other. Spacing is ignored so run-together and
+    split words still match.
+    """
+    text, candidate_text = key.replace('_', ''), candidate_key.replace('_', '')
+    return (all(_fuzzy_contains(text, token) for token in _specific_words(candidate_key))
+            and all(_fuzzy_contains(candidate_text, token) for token in _specific_words(key)))
+
+
+def _trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymptomMatcher:
+    """
+    Precomputed index that maps free-text symptoms to canonical dataset symptoms.
+
+    Exact spellings, spacing/underscore variants and synonyms resolve with one dict lookup.
+    Anything else is matched by generating candidates from a character-trigram inverted
+    index and rescoring the best few with difflib, so only a handful of strings are ever
+    compared in full. Every specific word of a fuzzy match must also be found in the input,
+    so 'eye pain' is not taken for knee_pain just because most of the characters agree.
+    """
+
+    def __init__(self, all_symptoms, synonyms=None, min_confidence=0.8, max_candidates=5):
+        self.all_symptoms = list(all_symptoms)
+        self.min_confidence = min_confidence
+        self.max_candidates = max_candidates
+
+        self._exact = {symptom: symptom for symptom in self.all_symptoms}
+        self._by_key = {}
+        for symptom in self.all_symptoms:
+            self._by_key.setdefault(canonical_key(symptom), symptom)
+        for alias, symptom in (DEFAULT_SYNONYMS if synonyms is None else synonyms).items():
+            if symptom in self._exact:
+                self._by_key.setdefault(canonical_key(alias), symptom)
+
+        self._keys = list(self._by_key)
+        self._key_trigrams = [_trigrams(key) for key in self._keys]
+        self._trigram_index = {}
+        for i, grams in enumerate(self._key_trigrams):
+            for gram in grams:
+                self._trigram_index.setdefault(gram, []).append(i)
+        self._fuzzy_cache = {}
+
+    def match(self, text):
+        """Returns the best SymptomMatch for one input, or None if nothing is close enough."""
+        symptom = self._exact.get(text)
+        if symptom is not None:
+            return SymptomMatch(text, symptom, 1.0)
+        key = canonical_key(text)
+        symptom = self._by_key.get(key)
+        if symptom is not None:
+            return SymptomMatch(text, symptom, 1.0)
+        if not key:
+            return None
+        # Read once and keep the local result: another thread may clear the cache in between
+        best = self._fuzzy_cache.get(key, _NOT_CACHED)
+        if best is _NOT_CACHED:
+            best = self._fuzzy_match(key)
+            if len(self._fuzzy_cache) >= _FUZZY_CACHE_LIMIT:
+                self._fuzzy_cache.clear()
+            self._fuzzy_cache[key] = best
+        return SymptomMatch(text, best[0], best[1]) if best is not None else None
+
+    def match_many(self, texts):
+        """match() over many inputs; unmatched inputs are returned as None in place."""
+        return [self.match(text) for text in texts]
+
+    def candidates(self, text, limit=None):
+        """Ranked (symptom, confidence) candidates for an input, best first."""
+        key = canonical_key(text)
+        ranked = {}
+        for k, confidence in self._score_candidates(key, limit or self.max_candidates):
+            # Synonym keys of one symptom collapse to its best score
+            ranked.setdefault(self._by_key[k], confidence)
+        return list(ranked.items())
+
+    def _fuzzy_match(self, key):
+        for candidate_key, confidence in self._score_candidates(key, self.max_candidates):
+            if confidence < self.min_confidence:
+                break
+            if tokens_covered(key, candidate_key):
+                return self._by_key[candidate_key], confidence
+        return None
+
+    def _score_candidates(self, key, limit):
+        grams = _trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigram_index.get(gram, ()))
+        # Dice coefficient on trigrams picks the shortlist, SequenceMatcher ranks it
+        shortlist = sorted(
+            shared,
+            key=lambda i: 2 * shared[i] / (len(grams) + len(self._key_trigrams[i])),
+            reverse=True,
+        )[:limit]
+        scored = [(self._keys[i], round(SequenceMatcher(None, key, self._keys[i]).ratio(), 3)) for i in shortlist]
+        return sorted(scored, key=lambda item: item[1], reverse=True)
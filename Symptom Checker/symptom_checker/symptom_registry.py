@@ -0,0 +1,115 @@
+# symptom_checker/symptom_registry.py
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads within one process are serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_symptom_name(raw):
+    """Scalar form of the loader's symptom normalization (strip, lower-case, spaces to underscores)."""
+    name = raw.strip().lower().replace(' ', '_')
+    return '_' if name == '__' else name
+
+
+class SymptomRegistry:
+    """
+    Append-only symptom -> ID registry persisted as JSON.
+
+    IDs are the symptom's position in `symptoms` and double as feature-matrix column
+    indices. New symptoms are only ever appended, so a symptom keeps its ID across data
+    versions and anything built for an older vocabulary (a fitted model, a stored matrix)
+    covers a prefix of the current columns.
+
+    Several processes (pre-fork workers, CLI jobs) may share one registry file: extend()
+    holds an exclusive lock on `<path>.lock` while it re-reads the file, appends and
+    saves, so two processes never hand out the same ID to different symptoms.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.symptoms = []
+        self.index = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.symptoms)
+
+    def load(self):
+        """Reads the registry file if it exists; returns self."""
+        symptoms = self._read()
+        if symptoms is not None:
+            self.symptoms = symptoms
+            self.index = {symptom: i for i, symptom in enumerate(self.symptoms)}
+        return self
+
+    def _read(self):
+        if self.path and os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)['symptoms']
+        return None
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive inter-process lock on the registry (a no-op without a path or fcntl)."""
+        if not self.path or fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f'{self.path}.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'symptoms': self.symptoms}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def extend(self, symptoms):
+        """
+        Appends the symptoms not registered yet (in the given order) and saves the registry
+        if it grew. IDs other processes registered meanwhile are merged in first. Returns
+        the full symptom list in ID order.
+        """
+        with self._lock:
+            symptoms = list(dict.fromkeys(symptoms))
+            if all(s in self.index for s in symptoms):
+                return list(self.symptoms)
+            with self._file_lock():
+                self._merge(self._read() or [])
+                new = [s for s in symptoms if s not in self.index]
+                if new:
+                    for symptom in new:
+                        self.index[symptom] = len(self.symptoms)
+                        self.symptoms.append(symptom)
+                    self.save()
+                    logger.info("🆕 Registered %d new symptom IDs (%d total).", len(new), len(self.symptoms))
+            return list(self.symptoms)
+
+    def _merge(self, on_disk):
+        """Adopts the IDs in the file; symptoms only known in memory are appended after them."""
+        if on_disk[:len(self.symptoms)] != self.symptoms:
+            if self.symptoms[:len(on_disk)] == on_disk:
+                return
+            logger.warning("⚠️ Symptom registry %s was rewritten by another process; adopting its IDs.", self.path)
+        local_only = [s for s in self.symptoms if s not in set(on_disk)]
+        self.symptoms = list(on_disk) + local_only
+        self.index = {symptom: i for i, symptom in enumerate(self.symptoms)}
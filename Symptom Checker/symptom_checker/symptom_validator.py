@@ -7,3 +7,8 @@ class SymptomValidator:
             if norm_symptom in all_symptoms:
                 validated.append(norm_symptom)
         return validated
+
+    @staticmethod
+    def match(symptoms, matcher):
+        """Typo- and synonym-tolerant validation through a SymptomMatcher; returns the matches found."""
+        return [m for m in matcher.match_many(symptoms) if m is not None]
@@ -0,0 +1,226 @@
+# symptom_checker/triage_rules.py
+"""
+Site-configurable triage policy, compiled into lookup tables indexed by symptom ID.
+
+A policy is a JSON file such as:
+
+    {
+        "name": "example-clinic",
+        "default_weight": 1,
+        "weight_overrides": {"chest_pain": 9},
+        "levels": [
+            {"level": "LOW", "care": "SELF CARE"},
+            {"level": "MEDIUM", "min_score": 8, "care": "CONSULT DOCTOR"},
+            {"level": "HIGH", "min_score": 12, "care": "IMMEDIATE MEDICAL ATTENTION"}
+        ],
+        "red_flags": {"chest_pain": "HIGH", "coma": "HIGH"}
+    }
+
+Levels are listed from least to most severe; the first has no min_score. A red-flag
+symptom raises the severity to at least its level whatever the score, and is always
+reported. Symptom names are normalized like the dataset's ('Chest Pain' is chest_pain);
+names that are not in the vocabulary are logged and ignored. Every key is optional and
+falls back to DEFAULT_POLICY, which reproduces the built-in
+RiskAssessor/SeverityAssessor/CareRecommender behaviour.
+
+Compiling turns the policy into a weight and a red-flag floor per symptom ID plus a
+sorted threshold list, so risk, severity and care come out of one pass over the
+patient's symptom IDs (or one sparse product for a batch).
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .care_recommendation import CareRecommender
+from .severity_assessment import SeverityAssessor
+from .symptom_registry import normalize_symptom_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY = {
+    'name': 'default',
+    'default_weight': 1,
+    'weight_overrides': {},
+    'levels': [
+        {'level': level, 'min_score': threshold, 'care': CareRecommender.recommend(level)}
+        for level, threshold in (('LOW', None),
+                                 ('MEDIUM', SeverityAssessor.MEDIUM_THRESHOLD),
+                                 ('HIGH', SeverityAssessor.HIGH_THRESHOLD))
+    ],
+    'red_flags': {},
+}
+
+TriageDecision = namedtuple('TriageDecision', ['risk_score', 'severity_level', 'care_recommendation', 'red_flags'])
+
+
+class CompiledPolicy:
+    """Immutable lookup tables for one policy over one symptom vocabulary."""
+
+    def __init__(self, policy, all_symptoms, severity_mapping):
+        policy = {**DEFAULT_POLICY, **policy}
+        self.name = policy['name']
+        self.all_symptoms = list(all_symptoms)
+        symptom_index = {symptom: i for i, symptom in enumerate(self.all_symptoms)}
+
+        levels = policy['levels']
+        if not levels or any('level' not in level or 'care' not in level for level in levels):
+            raise ValueError("Policy 'levels' must be a non-empty list of {level, care[, min_score]} entries.")
+        thresholds = [level.get('min_score') for level in levels[1:]]
+        if any(t is None for t in thresholds) or thresholds != sorted(thresholds):
+            raise ValueError("Every level after the first needs a min_score, in ascending order.")
+        self.level_names = [level['level'] for level in levels]
+        self.care = [level['care'] for level in levels]
+        self.thresholds = [float(t) for t in thresholds]
+        level_rank = {name: rank for rank, name in enumerate(self.level_names)}
+
+        overrides = self._known_symptoms(policy['weight_overrides'], symptom_index, 'overrides the weight of')
+        weights = {**severity_mapping, **overrides}
+        self.weights = [float(weights.get(symptom, policy['default_weight'])) for symptom in self.all_symptoms]
+        self.red_flag_floor = [0] * len(self.all_symptoms)
+        for symptom, level in policy['red_flags'].items():
+            if level not in level_rank:
+                raise ValueError(f"Red flag '{symptom}' names unknown level '{level}'.")
+        red_flags = self._known_symptoms(policy['red_flags'], symptom_index, 'flags')
+        for symptom, level in red_flags.items():
+            self.red_flag_floor[symptom_index[symptom]] = level_rank[level]
+        # Kept apart from the floors: a flag at the first level has floor 0 but is still reported
+        self.red_flag_ids = frozenset(symptom_index[symptom] for symptom in red_flags)
+
+        # numpy copies of the tables for batch evaluation
+        self.weight_array = np.array(self.weights, dtype=np.float64)
+        self.floor_array = np.array(self.red_flag_floor, dtype=np.int64)
+        self.flag_array = np.zeros(len(self.all_symptoms), dtype=bool)
+        self.flag_array[list(self.red_flag_ids)] = True
+        self.threshold_array = np.array(self.thresholds, dtype=np.float64)
+        self.level_array = np.array(self.level_names, dtype=object)
+        self.care_array = np.array(self.care, dtype=object)
+
+    def _known_symptoms(self, table, symptom_index, action):
+        """A symptom-keyed policy table with normalized names, dropping (and logging) unknown symptoms."""
+        known = {}
+        for name, value in table.items():
+            symptom = normalize_symptom_name(name)
+            if symptom in symptom_index:
+                known[symptom] = value
+            else:
+                logger.warning("⚠️ Policy '%s' %s unknown symptom '%s'; ignoring it.", self.name, action, name)
+        return known
+
+    def evaluate(self, symptom_ids):
+        """Risk score, severity, care and triggered red flags (in vocabulary order) for one patient's symptom IDs."""
+        score = float(sum(map(self.weights.__getitem__, symptom_ids)))
+        rank = bisect.bisect_right(self.thresholds, score)
+        flagged = self.red_flag_ids.intersection(symptom_ids)
+        if not flagged:
+            return TriageDecision(score, self.level_names[rank], self.care[rank], [])
+        rank = max(rank, max(self.red_flag_floor[i] for i in flagged))
+        return TriageDecision(score, self.level_names[rank], self.care[rank],
+                              [self.all_symptoms[i] for i in sorted(flagged)])
+
+    def evaluate_many(self, symptom_matrix):
+        """
+        evaluate() for every row of a CSR symptom count matrix; returns arrays of scores,
+        levels and care recommendations plus a list of red flags per row.
+        """
+        n_rows = symptom_matrix.shape[0]
+        scores = np.asarray(symptom_matrix @ self.weight_array).ravel()
+        ranks = np.searchsorted(self.threshold_array, scores, side='right')
+
+        indptr, indices = symptom_matrix.indptr, symptom_matrix.indices
+        red_flags = [[] for _ in range(n_rows)]
+        flagged = np.flatnonzero(self.flag_array[indices])
+        if flagged.size:
+            rows = np.searchsorted(indptr, flagged, side='right') - 1
+            np.maximum.at(ranks, rows, self.floor_array[indices[flagged]])
+            for row, i in zip(rows, indices[flagged]):
+                red_flags[row].append(self.all_symptoms[i])
+        return scores, self.level_array[ranks], self.care_array[ranks], red_flags
+
+
+class TriageRulesEngine:
+    """
+    Holds the compiled policy and recompiles it when the policy file changes.
+
+    The file's mtime is checked at most every `check_interval` seconds; a new policy is
+    compiled off to the side and swapped in with one reference assignment, so requests
+    in flight keep using the tables they started with. A policy that fails to compile
+    is logged and the previous one stays active.
+    """
+
+    def __init__(self, all_symptoms, severity_mapping, policy_path=None, check_interval=5.0):
+        self.all_symptoms = all_symptoms
+        self.severity_mapping = severity_mapping
+        self.policy_path = policy_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0.0
+        self.source = {}
+        self.policy = CompiledPolicy({}, all_symptoms, severity_mapping)
+        if policy_path:
+            self.reload(strict=True)
+
+    def reload(self, strict=False):
+        """Recompiles the policy file now; returns True if a new policy was swapped in."""
+        with self._lock:
+            try:
+                # Remember the version even if it fails, so a broken file is reported once, not on every check
+                self._mtime = os.path.getmtime(self.policy_path)
+                with open(self.policy_path, encoding='utf-8') as f:
+                    source = json.load(f)
+                policy = CompiledPolicy(source, self.all_symptoms, self.severity_mapping)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                if strict:
+                    raise
+                logger.error("❌ Could not reload triage policy %s, keeping '%s': %s",
+                             self.policy_path, self.policy.name, e)
+                return False
+            self.source, self.policy = source, policy
+            logger.info("📋 Triage policy '%s' loaded from %s", policy.name, self.policy_path)
+            return True
+
+    def for_vocabulary(self, all_symptoms, severity_mapping):
+        """
+        A new engine with the active policy recompiled for another vocabulary or severity
+        weights (e.g. after a live update); it keeps watching the same policy file.
+        """
+        engine = TriageRulesEngine(all_symptoms, severity_mapping, check_interval=self.check_interval)
+        engine.policy_path, engine._mtime, engine._next_check = self.policy_path, self._mtime, self._next_check
+        engine.source = self.source
+        engine.policy = CompiledPolicy(self.source, all_symptoms, severity_mapping)
+        return engine
+
+    def current(self):
+        """The active compiled policy, reloading it first if the file changed."""
+        if self.policy_path and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                changed = os.path.getmtime(self.policy_path) != self._mtime
+            except OSError:
+                changed = False
+            if changed:
+                self.reload()
+        return self.policy
+
+    def _known_symptoms(self, table, symptom_index, action):
+        """A symptom-keyed policy table with normalized names, dropping (and logging) unknown symptoms."""
+        known = {}
+        for name, value in table.items():
+            symptom = normalize_symptom_name(name)
+            if symptom in symptom_index:
+                known[symptom] = value
+            else:
+                logger.warning("⚠️ Policy '%s' %s unknown symptom '%s'; ignoring it.", self.name, action, name)
+        return known
+
+    def evaluate(self, symptom_ids):
+        return self.current().evaluate(symptom_ids)
+
+    def evaluate_many(self, symptom_matrix):
+        return self.current().evaluate_many(symptom_matrix)
@@ -1,83 +1,398 @@
 # symptom_checker/triage_system.py
-from .data_loader import MedicalDataLoader
-from .disease_predictor import DiseasePredictor
-from .rag_precaution_fetcher import RAGPrecautionFetcher
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import namedtuple
+from itertools import islice
+
+# Only the serving core is imported here. The data loader (pandas), the RAG clients
+# (serpapi, groq, httpx) and scipy are imported where they are first needed.
+from .diagnosis_session import DiagnosisSession
+from .disease_predictor import DEFAULT_PREDICTION_METHOD
+from .live_update import LiveUpdater, ServingSnapshot
+from .model_artifact import ModelArtifactStore
+from .precaution_index import PrecautionIndex
 from .symptom_validator import SymptomValidator
-from .risk_assessment import RiskAssessor
-from .severity_assessment import SeverityAssessor
-from .care_recommendation import CareRecommender
+from .triage_rules import TriageRulesEngine
+from .metrics import PipelineMetrics, RequestProfiler
+
+logger = logging.getLogger(__name__)
+
+# How precautions are fetched. offline=None goes offline when the API keys (or backends) are
+# missing; search_backend / llm_backend (see rag_backends) stand in for SerpAPI / Groq.
+RAGOptions = namedtuple('RAGOptions', ['offline', 'cache', 'search_backend', 'llm_backend'],
+                        defaults=(None, None, None, None))
+
+# How assessments are served: ranking method and depth, triage policy file, precomputed
+# precaution index, and the sampling request profiler.
+ServingOptions = namedtuple('ServingOptions', [
+    'prediction_method', 'top_k', 'policy_path', 'precaution_index_path', 'profile_sample_rate', 'profile_dir',
+], defaults=(DEFAULT_PREDICTION_METHOD, 3, None, None, 0.0, 'profiles/'))
+
 
 class TriageSystem:
-    def __init__(self, data_path='data/', serp_api_key=None, groq_api_key=None):
-        # 1. Load and process all data
-        data_loader = MedicalDataLoader(data_path)
-        data_loader.load_and_process_data()
-        self.processed_data = data_loader.get_processed_data()
-
-        # Extract data for easy access
-        self.all_symptoms = self.processed_data['all_symptoms']
-        self.severity_mapping = self.processed_data['severity_mapping']
-        self.description_mapping = self.processed_data['description_mapping']
-        self.precaution_mapping = self.processed_data['precaution_mapping']
-
-        # 2. Initialize and train the disease predictor
-        self.predictor = DiseasePredictor()
-        self.predictor.train(self.processed_data['X_train'], self.processed_data['y_train'])
-        
-        # 3. Initialize the RAG fetcher for dynamic information
-        self.rag_fetcher = RAGPrecautionFetcher(serp_api_key, groq_api_key)
+    def __init__(self, data_path='data/', serp_api_key=None, groq_api_key=None, store=None,
+                 rag=None, serving=None, use_artifact=True):
+        """
+        store: ModelArtifactStore holding the loading options (artifact and columnar dirs,
+        chunk size, estimator, registry); defaults to ModelArtifactStore(data_path), and when
+        given its data_path is used. rag / serving: RAGOptions / ServingOptions.
+        """
+        store = store if store is not None else ModelArtifactStore(data_path)
+        rag = rag if rag is not None else RAGOptions()
+        serving = serving if serving is not None else ServingOptions()
+
+        # 1. Load processed data and the trained predictor (from the saved artifact when current).
+        #    Symptom columns follow the append-only registry so their IDs never shift.
+        if use_artifact:
+            artifact = store.load_or_build()
+            processed_data = artifact['processed_data']
+            predictor = artifact['predictor']
+            registry = store.registry()
+            data_hash = artifact['data_hash']
+            applied_updates = artifact.get('applied_updates', 0)
+        else:
+            from .data_loader import MedicalDataLoader
+            from .model_artifact import train_predictor
+
+            registry = store.registry()
+            data_loader = MedicalDataLoader(store.data_path, store.columnar_dir, store.chunk_size, registry)
+            data_loader.load_and_process_data()
+            processed_data = data_loader.get_processed_data()
+
+            # 2. Initialize and train the disease predictor
+            predictor = train_predictor(processed_data, store.chunk_size, store.estimator)
+            data_hash, applied_updates = None, 0
+
+        # Risk, severity and care come from the (hot-reloadable) compiled triage policy
+        rules = TriageRulesEngine(processed_data['all_symptoms'], processed_data['severity_mapping'],
+                                  serving.policy_path)
+        # Requests read one snapshot; apply_update() publishes a new one atomically
+        self._snapshot = ServingSnapshot(processed_data, predictor, rules)
+        self.updater = LiveUpdater(self, registry, store, data_hash, applied_updates)
+        self.prediction_method = serving.prediction_method
+        self.top_k = serving.top_k
+        if serving.prediction_method == 'tree':
+            # Restore the pickled estimator now rather than on the first request
+            predictor.load_model()
+
+        # 3. Initialize the RAG fetcher for dynamic information. Offline (the default when no
+        #    API keys or backends are configured) precautions come from the index or the local
+        #    data and the RAG stack is never imported. Search/LLM backends (see rag_backends,
+        #    e.g. record/replay) stand in for SerpAPI/Groq.
+        serp_api_key = serp_api_key or os.getenv("SERP_API_KEY")
+        groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
+        offline, search_backend, llm_backend = rag.offline, rag.search_backend, rag.llm_backend
+        if offline is None:
+            offline = not ((serp_api_key or search_backend is not None) and (groq_api_key or llm_backend is not None))
+            if offline:
+                logger.warning("⚠️ SERP/GROQ API keys are not set; running offline with local precautions.")
+        self.offline = offline
+        self.rag_fetcher = None
+        self._rag_backends = (search_backend, llm_backend)
+        if not offline:
+            from .rag_backends import LocalSummarizer
+            from .rag_precaution_fetcher import RAGPrecautionFetcher
+
+            self.rag_fetcher = RAGPrecautionFetcher(
+                serp_api_key, groq_api_key, cache=rag.cache, search_backend=search_backend,
+                llm_backend=llm_backend, fallback=LocalSummarizer(processed_data['precaution_mapping'])
+            )
+        # One async fetcher per event loop: its clients and semaphore belong to the loop that created them
+        self._async_rag_fetchers = weakref.WeakKeyDictionary()
+        self._async_rag_lock = threading.Lock()
+
+        # 4. Optional precomputed precaution index; when present, RAG never runs inline
+        index_path = serving.precaution_index_path
+        self.precaution_index = PrecautionIndex(index_path).load() if index_path else None
+
+        # 5. Per-stage latency metrics and the opt-in request profiler
+        self.metrics = PipelineMetrics()
+        self.profiler = RequestProfiler(serving.profile_sample_rate, serving.profile_dir)
+
+        # 6. Re-apply the live updates logged since the artifact was saved (compacting them into it)
+        self.updater.replay()
         
         # ## New Method for logging status ##
         self._log_status()
 
+    # Read-only views of the current snapshot
+    processed_data = property(lambda self: self._snapshot.processed_data)
+    predictor = property(lambda self: self._snapshot.predictor)
+    rules = property(lambda self: self._snapshot.rules)
+    all_symptoms = property(lambda self: self._snapshot.all_symptoms)
+    symptom_index = property(lambda self: self._snapshot.symptom_index)
+    severity_mapping = property(lambda self: self._snapshot.severity_mapping)
+    description_mapping = property(lambda self: self._snapshot.description_mapping)
+    precaution_mapping = property(lambda self: self._snapshot.precaution_mapping)
+    symptom_matcher = property(lambda self: self._snapshot.symptom_matcher)
+
+    @property
+    def version(self):
+        """Version of the snapshot being served (starts at 0, +1 per update or model refit, replayed ones included)."""
+        return self._snapshot.version
+
+    def apply_update(self, rows=None, severity=None, descriptions=None, precautions=None, refit='background'):
+        """
+        Adds dataset rows and lookup-table entries to the live system without a rebuild.
+
+        rows are (disease, [symptoms]) pairs; unseen symptoms get new, stable IDs. The update
+        is logged in the artifact directory and replayed when the system is next started.
+        See LiveUpdater.apply() for the refit modes. Returns the new snapshot version.
+        """
+        return self.updater.apply(rows, severity, descriptions, precautions, refit)
+
+    def start_session(self, symptoms=()):
+        """
+        Starts a multi-turn DiagnosisSession on the current snapshot. The session keeps
+        serving from that snapshot for its whole lifetime, even across live updates.
+        """
+        snapshot = self._snapshot
+        session = DiagnosisSession(snapshot.differential_model(), snapshot, self.top_k)
+        session.set_symptoms(symptoms)
+        return session
+
+    def wait_for_refit(self, timeout=None):
+        """Blocks until a background model refit has been swapped in; False on timeout."""
+        return self.updater.wait(timeout)
+
     def _log_status(self):
         """Logs the status of the system after initialization."""
-        print("✅ Triage System Initialized Successfully.")
-        print(f"-> Loaded {len(self.all_symptoms)} symptoms.")
-        print("-> Disease prediction model trained.")
+        logger.info("✅ Triage System Initialized Successfully.")
+        logger.info("-> Loaded %d symptoms.", len(self.all_symptoms))
+        logger.info("-> Disease prediction model ready.")
+        logger.info("-> Triage policy '%s'.", self.rules.policy.name)
+        if self.offline:
+            logger.info("-> Offline mode: precautions from local data.")
+        if self.precaution_index is not None:
+            logger.info("-> Precaution index v%d with %d diseases.",
+                        self.precaution_index.version, len(self.precaution_index))
+
+    def get_metrics(self):
+        """Per-stage latency percentiles, counters and RAG cache statistics."""
+        snapshot = self.metrics.snapshot()
+        if self.rag_fetcher is not None:
+            snapshot["rag_cache"] = self.rag_fetcher.cache.stats()
+        return snapshot
+
+    def export_metrics(self):
+        """The metrics in Prometheus text format."""
+        extra_gauges = {}
+        if self.rag_fetcher is not None:
+            cache_stats = self.rag_fetcher.cache.stats()
+            extra_gauges = {
+                "rag_cache_hit_rate": cache_stats["hit_rate"],
+                "rag_cache_size": cache_stats["size"],
+            }
+        return self.metrics.to_prometheus(extra_gauges=extra_gauges)
 
 
-    def assess_patient(self, patient_symptoms):
+    def assess_patient(self, patient_symptoms, profile=False):
         """
         Runs the full triage assessment for a given list of patient symptoms.
+
+        With profile=True (or when the sampling profiler picks this request) the call runs
+        under cProfile and the stats file path is logged.
         """
-        print(f"\nAssessing symptoms: {patient_symptoms}")
+        if profile or self.profiler.should_profile():
+            result, path = self.profiler.run("assess_patient", self._assess_patient, patient_symptoms)
+            logger.info("Profile for assess_patient written to %s", path)
+            return result
+        return self._assess_patient(patient_symptoms)
 
-        # Step 1: Validate symptoms against our known list
-        validated_symptoms = SymptomValidator.validate(patient_symptoms, self.all_symptoms)
-        if not validated_symptoms:
-            return {"error": "No valid symptoms provided or recognized."}
+    def _assess_patient(self, patient_symptoms):
+        logger.debug("Assessing symptoms: %s", patient_symptoms)
+        start = time.perf_counter()
+        snapshot = self._snapshot
+        result, predicted_disease = self._assess_without_precautions(patient_symptoms, snapshot)
+        if predicted_disease is not None:
+            with self.metrics.time("precautions"):
+                result["predicted_disease"]["precautions"] = self._fetch_precautions(predicted_disease, snapshot)
+        self.metrics.observe("total", time.perf_counter() - start)
+        self.metrics.increment("assessments")
+        return result
+
+    async def assess_patient_async(self, patient_symptoms):
+        """
+        asyncio variant of assess_patient() that fetches precautions through the
+        pooled, request-coalescing AsyncRAGPrecautionFetcher.
+        """
+        start = time.perf_counter()
+        snapshot = self._snapshot
+        result, predicted_disease = self._assess_without_precautions(patient_symptoms, snapshot)
+        if predicted_disease is not None:
+            with self.metrics.time("precautions"):
+                if self.precaution_index is not None or self.rag_fetcher is None:
+                    precautions = self._indexed_precautions(predicted_disease, snapshot)
+                else:
+                    precautions = await self._get_async_rag_fetcher().fetch_precautions(predicted_disease)
+            result["predicted_disease"]["precautions"] = precautions
+        self.metrics.observe("total", time.perf_counter() - start)
+        self.metrics.increment("assessments")
+        return result
 
-        # Step 2: Calculate risk score
-        risk_score = RiskAssessor.calculate(validated_symptoms, self.severity_mapping)
+    def _assess_without_precautions(self, patient_symptoms, snapshot):
+        """Runs every triage step except the precaution fetch against one snapshot; returns (result, disease)."""
+        metrics = self.metrics
 
-        # Step 3: Assess severity level
-        severity_level = SeverityAssessor.classify(risk_score)
+        # Step 1: Validate symptoms against our known list (tolerating typos and synonyms)
+        with metrics.time("validation"):
+            symptom_matches = SymptomValidator.match(patient_symptoms, snapshot.symptom_matcher)
+            validated_symptoms = [m.symptom for m in symptom_matches]
+        if not validated_symptoms:
+            metrics.increment("rejected")
+            return {"error": "No valid symptoms provided or recognized."}, None
 
-        # Step 4: Recommend care
-        care_recommendation = CareRecommender.recommend(severity_level)
+        # Steps 2-4: Risk score, severity level (including red flags) and care in one policy pass
+        with metrics.time("rules"):
+            decision = snapshot.rules.evaluate([snapshot.symptom_index[s] for s in validated_symptoms])
 
-        # Step 5: Predict the most likely disease
-        predicted_disease = self.predictor.predict(validated_symptoms)
+        # Step 5: Rank the most likely diseases ('tree' model or 'index' inverted-index scoring)
+        with metrics.time("prediction"):
+            differential = snapshot.predictor.rank(validated_symptoms, k=self.top_k, method=self.prediction_method)
+        if not differential:
+            metrics.increment("rejected")
+            return {"error": "No disease matches the provided symptoms."}, None
+        predicted_disease = differential[0][0]
         
         # Step 6: Fetch information about the predicted disease
-        description = self.description_mapping.get(predicted_disease, "No description available.")
-        
-        try:
-            print(f"Fetching RAG precautions for: {predicted_disease}")
-            precautions = self.rag_fetcher.fetch_precautions(predicted_disease)
-        except Exception as e:
-            print(f"⚠️ RAG fetcher failed ({e}), falling back to local data.")
-            precautions = self.precaution_mapping.get(predicted_disease, ["No specific precautions found."])
+        with metrics.time("description"):
+            description = snapshot.description_mapping.get(predicted_disease, "No description available.")
 
         return {
             "validated_symptoms": validated_symptoms,
-            "risk_score": risk_score,
-            "severity_level": severity_level,
-            "care_recommendation": care_recommendation,
+            "symptom_matches": self._format_matches(symptom_matches),
+            "risk_score": decision.risk_score,
+            "severity_level": decision.severity_level,
+            "care_recommendation": decision.care_recommendation,
+            "red_flags": decision.red_flags,
             "predicted_disease": {
                 "name": predicted_disease.title(),
                 "description": description,
-                "precautions": precautions
+                "precautions": None
+            },
+            "differential_diagnosis": self._format_differential(differential)
+        }, predicted_disease
+
+    def assess_patients(self, patients, fetch_precautions=True):
+        """
+        Runs the triage assessment for many symptom lists at once.
+
+        All patients are validated, encoded into one sparse matrix and run through the
+        triage policy with a single matrix-vector product. Precautions are
+        fetched once per distinct predicted disease. Results are returned in input order.
+        """
+        from .feature_matrix import build_symptom_matrix, binarize
+
+        start = time.perf_counter()
+        snapshot = self._snapshot
+        patients = list(patients)
+        matches = [SymptomValidator.match(symptoms, snapshot.symptom_matcher) for symptoms in patients]
+        validated = [[m.symptom for m in row_matches] for row_matches in matches]
+        valid_rows = [i for i, symptoms in enumerate(validated) if symptoms]
+
+        results = [{"error": "No valid symptoms provided or recognized."} for _ in patients]
+        if not valid_rows:
+            return results
+
+        counts = build_symptom_matrix([validated[i] for i in valid_rows], snapshot.symptom_index)
+        risk_scores, severity_levels, care_recommendations, red_flags = snapshot.rules.evaluate_many(counts)
+        rankings = snapshot.predictor.rank_many(binarize(counts), k=self.top_k, method=self.prediction_method)
+        predicted_diseases = [ranked[0][0] if ranked else None for ranked in rankings]
+
+        precautions_by_disease = {}
+        for disease in set(predicted_diseases) - {None}:
+            if fetch_precautions:
+                precautions_by_disease[disease] = self._fetch_precautions(disease, snapshot)
+            else:
+                precautions_by_disease[disease] = snapshot.precaution_mapping.get(disease, ["No specific precautions found."])
+
+        for row, i in enumerate(valid_rows):
+            predicted_disease = predicted_diseases[row]
+            if predicted_disease is None:
+                results[i] = {"error": "No disease matches the provided symptoms."}
+                continue
+            results[i] = {
+                "validated_symptoms": validated[i],
+                "symptom_matches": self._format_matches(matches[i]),
+                "risk_score": float(risk_scores[row]),
+                "severity_level": severity_levels[row],
+                "care_recommendation": care_recommendations[row],
+                "red_flags": red_flags[row],
+                "predicted_disease": {
+                    "name": predicted_disease.title(),
+                    "description": snapshot.description_mapping.get(predicted_disease, "No description available."),
+                    "precautions": precautions_by_disease[predicted_disease]
+                },
+                "differential_diagnosis": self._format_differential(rankings[row])
             }
-        }
+        self.metrics.observe("batch_total", time.perf_counter() - start)
+        self.metrics.increment("batch_assessments", len(patients))
+        return results
+
+    def iter_assess_patients(self, patients, chunk_size=10000, fetch_precautions=True):
+        """
+        Streams assess_patients() over an arbitrarily large iterable in fixed-size chunks,
+        yielding results in input order while holding at most one chunk in memory.
+        """
+        patients = iter(patients)
+        while True:
+            chunk = list(islice(patients, chunk_size))
+            if not chunk:
+                return
+            yield from self.assess_patients(chunk, fetch_precautions=fetch_precautions)
+
+    @staticmethod
+    def _format_differential(ranked):
+        # A relative match score summing to 1 over the ranked diseases (normalized Jaccard
+        # for the index, class probability for a classifier), not a calibrated probability
+        return [{"name": disease.title(), "score": round(score, 4)} for disease, score in ranked]
+
+    @staticmethod
+    def _format_matches(symptom_matches):
+        return [{"input": m.input, "symptom": m.symptom, "confidence": m.confidence} for m in symptom_matches]
+
+    def _get_async_rag_fetcher(self):
+        """The async fetcher for the running event loop, created on its first use there."""
+        loop = asyncio.get_running_loop()
+        with self._async_rag_lock:
+            fetcher = self._async_rag_fetchers.get(loop)
+            if fetcher is None:
+                from .async_rag_precaution_fetcher import AsyncRAGPrecautionFetcher
+
+                search_backend, llm_backend = self._rag_backends
+                fetcher = self._async_rag_fetchers[loop] = AsyncRAGPrecautionFetcher(
+                    self.rag_fetcher.serp_api_key, self.rag_fetcher.groq_api_key,
+                    fallback=self.rag_fetcher.fallback, cache=self.rag_fetcher.cache,
+                    search_backend=search_backend, llm_backend=llm_backend
+                )
+        return fetcher
+
+    async def aclose(self):
+        """Closes the async fetcher's connections for the running event loop (call before the loop ends)."""
+        with self._async_rag_lock:
+            fetcher = self._async_rag_fetchers.pop(asyncio.get_running_loop(), None)
+        if fetcher is not None:
+            await fetcher.aclose()
+
+    def _indexed_precautions(self, disease, snapshot):
+        """Looks precautions up in the precomputed index (if any), falling back to the local data."""
+        precautions = self.precaution_index.get(disease) if self.precaution_index is not None else None
+        if precautions is None:
+            precautions = snapshot.precaution_mapping.get(disease, ["No specific precautions found."])
+        return precautions
+
+    def _fetch_precautions(self, disease, snapshot):
+        """Fetches precautions via the index or RAG, falling back to the local precaution data."""
+        if self.precaution_index is not None or self.rag_fetcher is None:
+            return self._indexed_precautions(disease, snapshot)
+        try:
+            logger.debug("Fetching RAG precautions for: %s", disease)
+            return self.rag_fetcher.fetch_precautions(disease)
+        except Exception as e:
+            logger.warning("⚠️ RAG fetcher failed (%s), falling back to local data.", e)
+            self.metrics.increment("rag_fallbacks")
+            return snapshot.precaution_mapping.get(disease, ["No specific precautions found."])
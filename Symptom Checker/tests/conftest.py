@@ -0,0 +1,29 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+DATA_PATH = os.path.join(PROJECT_ROOT, 'data') + os.sep
+
+
+@pytest.fixture(scope='session')
+def data_path():
+    return DATA_PATH
+
+
+@pytest.fixture(scope='session')
+def artifact_dir(tmp_path_factory):
+    """One artifact directory for the test session, so the repo's artifacts/ is left alone."""
+    return str(tmp_path_factory.mktemp('artifacts'))
+
+
+@pytest.fixture(scope='session')
+def system(data_path, artifact_dir):
+    from symptom_checker.model_artifact import ModelArtifactStore
+    from symptom_checker.triage_system import RAGOptions, TriageSystem
+
+    return TriageSystem(store=ModelArtifactStore(data_path, artifact_dir), rag=RAGOptions(offline=True))
@@ -0,0 +1,29 @@
+# tests/test_batch_assessment.py
+import random
+
+PATIENTS = [
+    ['itching', 'skin rash', 'nodal skin eruptions'],
+    ['chest pain', 'breathlessness', 'sweating'],
+    ['headche', 'vomitting', 'high fever'],
+    ['stomach pain', 'acidity', 'ulcers on tongue'],
+    ['not a symptom at all'],
+    [],
+]
+
+
+def test_batch_results_match_single_assessments(system):
+    rng = random.Random(0)
+    patients = PATIENTS + [rng.sample(system.all_symptoms, rng.randint(1, 6)) for _ in range(200)]
+    batch = system.assess_patients(patients)
+    assert batch == [system.assess_patient(symptoms) for symptoms in patients]
+
+
+def test_batch_keeps_input_order_and_reports_invalid_rows(system):
+    results = system.assess_patients([['not a symptom at all'], ['itching'], []], fetch_precautions=False)
+    assert 'error' in results[0] and 'error' in results[2]
+    assert results[1]['validated_symptoms'] == ['itching']
+
+
+def test_streaming_batches_match_one_batch(system):
+    patients = PATIENTS * 5
+    assert list(system.iter_assess_patients(patients, chunk_size=4)) == system.assess_patients(patients)
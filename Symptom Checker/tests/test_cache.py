@@ -0,0 +1,96 @@
+# tests/test_cache.py
+import multiprocessing
+import os
+
+import pytest
+
+from symptom_checker import cache as cache_module
+from symptom_checker.cache import MemoryCache, SQLiteCache
+
+
+class Clock:
+    """Stands in for the time module so expiry and LRU order do not depend on the wall clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == 'memory':
+            return MemoryCache(**kwargs)
+        return SQLiteCache(str(tmp_path / 'cache.sqlite3'), **kwargs)
+    return make
+
+
+def test_entries_expire_after_their_ttl(make_cache, clock):
+    cache = make_cache(default_ttl=60)
+    cache.set('default', ['a'])
+    cache.set('short', ['b'], ttl=5)
+    clock.now += 10
+    assert cache.get('short') is None
+    assert cache.get('default') == ['a']
+    clock.now += 60
+    assert cache.get('default') is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_entries_without_a_ttl_never_expire(make_cache, clock):
+    cache = make_cache()
+    cache.set('forever', ['c'])
+    clock.now += 10 ** 9
+    assert cache.get('forever') == ['c']
+
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.set('a', 1)
+    clock.now += 1
+    cache.set('b', 2)
+    clock.now += 1
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    clock.now += 1
+    cache.set('c', 3)
+    assert len(cache) == 2 and cache.evictions == 1
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+
+def _fill(path, prefix, queue):
+    cache = SQLiteCache(path)
+    for i in range(20):
+        cache.set(f'{prefix}_{i}', {'worker': prefix, 'i': i})
+    queue.put(cache.get(f'{prefix}_0'))
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_sqlite_cache_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    parent = SQLiteCache(path)
+    parent.set('from_parent', 'hello')
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    processes = [context.Process(target=_fill, args=(path, f'p{n}', queue)) for n in range(4)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        assert queue.get(timeout=60)['i'] == 0
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    # The parent's connection was opened before the fork; it still sees every worker's writes
+    assert len(parent) == 81
+    assert parent.get('p3_19') == {'worker': 'p3', 'i': 19}
+    assert SQLiteCache(path).get('from_parent') == 'hello'
@@ -0,0 +1,51 @@
+# tests/test_data_loader.py
+import numpy as np
+import pytest
+from scipy import sparse
+
+from symptom_checker.data_loader import MedicalDataLoader
+
+LOOKUP_KEYS = ('all_symptoms', 'symptom_index', 'severity_mapping', 'description_mapping', 'precaution_mapping')
+
+
+def load(data_path, **kwargs):
+    loader = MedicalDataLoader(data_path, **kwargs)
+    loader.load_and_process_data()
+    return loader.get_processed_data()
+
+
+def dense(X):
+    return X.toarray() if sparse.issparse(X) else np.asarray(X)
+
+
+@pytest.fixture(scope='module')
+def in_memory(data_path):
+    return load(data_path)
+
+
+def assert_same_data(actual, expected):
+    for key in LOOKUP_KEYS:
+        assert actual[key] == expected[key], key
+    np.testing.assert_array_equal(dense(actual['X_train']), dense(expected['X_train']))
+    assert list(actual['y_train']) == list(expected['y_train'])
+
+
+def test_in_memory_load(in_memory):
+    X, y = in_memory['X_train'], in_memory['y_train']
+    assert list(X.columns) == in_memory['all_symptoms'] == sorted(in_memory['all_symptoms'])
+    assert X.shape[0] == len(y) and set(np.unique(X.to_numpy())) <= {0, 1}
+    assert all(s == s.strip().lower() and ' ' not in s for s in in_memory['all_symptoms'])
+
+
+@pytest.mark.parametrize('chunk_size', [None, 700])
+def test_columnar_store_matches_in_memory_load(data_path, tmp_path, in_memory, chunk_size):
+    columnar_dir = str(tmp_path / 'columnar')
+    written = load(data_path, columnar_dir=columnar_dir, chunk_size=chunk_size)
+    assert_same_data(written, in_memory)
+    # The second load memory-maps the store instead of reading the CSVs
+    assert_same_data(load(data_path, columnar_dir=columnar_dir), in_memory)
+
+
+def test_streaming_needs_a_columnar_dir(data_path):
+    with pytest.raises(ValueError):
+        MedicalDataLoader(data_path, chunk_size=100)
@@ -0,0 +1,60 @@
+# tests/test_diagnosis_session.py
+import numpy as np
+import pytest
+
+START = ['itching', 'skin rash']
+
+
+def assert_same_state(session, expected):
+    np.testing.assert_allclose(session.scores, expected.scores, atol=1e-9)
+    np.testing.assert_array_equal(session.hits, expected.hits)
+    assert session.present == expected.present and session.absent == expected.absent
+
+
+@pytest.mark.parametrize('steps', [
+    [('add', 'chills'), ('remove', 'chills')],
+    [('deny', 'chills'), ('remove', 'chills')],
+    [('add', 'chills'), ('deny', 'chills'), ('remove', 'chills')],
+    [('deny', 'chills'), ('add', 'chills'), ('remove', 'chills')],
+    [('add', 'skin rash'), ('deny', 'vomiting'), ('remove', 'vomiting')],
+])
+def test_round_trips_leave_the_scores_unchanged(system, steps):
+    session = system.start_session(START)
+    for action, symptom in steps:
+        assert getattr(session, action)(symptom) is not None
+    assert_same_state(session, system.start_session(START))
+
+
+def test_incremental_scores_match_a_fresh_session(system):
+    session = system.start_session(START)
+    session.add('chills')
+    session.deny('vomiting')
+    session.deny('chills')      # switches a confirmed symptom to denied
+    session.add('vomiting')     # and a denied one to confirmed
+    session.remove('skin rash')
+
+    fresh = system.start_session(['itching', 'vomiting'])
+    fresh.deny('chills')
+    assert_same_state(session, fresh)
+    assert session.differential() == pytest.approx(fresh.differential())
+
+
+def test_suggest_skips_symptoms_already_asked(system):
+    session = system.start_session(START)
+    asked = set(session.symptoms)
+    for turn in range(6):
+        suggestions = session.suggest(n=5)
+        assert suggestions, f"no question on turn {turn}"
+        assert not asked & {symptom for symptom, _ in suggestions}
+        symptom = suggestions[0][0]
+        (session.add if turn % 2 else session.deny)(symptom)
+        asked.add(symptom)
+    assert asked == set(session.present) | set(session.absent)
+
+
+def test_differential_is_a_distribution(system):
+    session = system.start_session(START)
+    differential = session.differential(k=len(session.model.diseases))
+    assert sum(p for _, p in differential) == pytest.approx(1.0)
+    assert [p for _, p in differential] == sorted((p for _, p in differential), reverse=True)
+    assert system.start_session().differential() == [] and system.start_session().suggest() == []
@@ -0,0 +1,27 @@
+# tests/test_disease_predictor.py
+import random
+
+from symptom_checker.disease_predictor import DEFAULT_PREDICTION_METHOD
+from symptom_checker.feature_matrix import binarize, build_symptom_matrix
+
+
+def test_default_ranking_returns_a_differential(system):
+    assert system.prediction_method == DEFAULT_PREDICTION_METHOD == 'index'
+    ranked = system.predictor.rank(['itching', 'skin_rash'], k=3)
+    assert len(ranked) == 3
+    assert ranked[0][1] >= ranked[1][1] >= ranked[2][1]
+    differential = system.assess_patient(['itching', 'skin rash'])['differential_diagnosis']
+    assert differential[0] == {'name': ranked[0][0].title(), 'score': round(ranked[0][1], 4)}
+
+
+def test_batch_index_ranking_matches_single_ranking(system, monkeypatch):
+    rng = random.Random(0)
+    patients = [rng.sample(system.all_symptoms, rng.randint(0, 8)) for _ in range(500)]
+    matrix = binarize(build_symptom_matrix(patients, system.symptom_index))
+    ranker = system.predictor.ranker
+    # Several chunks, so the chunk boundaries are exercised too
+    monkeypatch.setattr(ranker, 'RANK_CHUNK_CELLS', 50 * ranker.n_rows)
+    batch = system.predictor.rank_many(matrix, k=3, method='index')
+    assert batch == [system.predictor.rank(symptoms, k=3, method='index') for symptoms in patients]
+    assert [] in batch
+
@@ -0,0 +1,122 @@
+# tests/test_http_service.py
+import contextlib
+import http.client
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from symptom_checker.http_service import BoundedHTTPServer, TriageRequestHandler
+
+
+@contextlib.contextmanager
+def running_server(system, **kwargs):
+    listen_socket = socket.create_server(('127.0.0.1', 0))
+    server = BoundedHTTPServer(listen_socket, system, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield listen_socket.getsockname()[1]
+    finally:
+        server.shutdown()
+        server.drain()
+        listen_socket.close()
+
+
+@pytest.fixture(scope='module')
+def server(system):
+    with running_server(system, threads=2) as port:
+        yield port
+
+
+def post(port, path, body, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+    headers = {'Content-Length': str(len(data)), **(headers or {})}
+    connection.putrequest('POST', path)
+    for name, value in headers.items():
+        connection.putheader(name, value)
+    connection.endheaders(data)
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+def test_assess(server):
+    status, body = post(server, '/assess', {'symptoms': ['itching', 'skin rash']})
+    assert status == 200
+    assert body['validated_symptoms'] == ['itching', 'skin_rash']
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/assess', {'symptoms': [1, 2]}),
+    ('/assess', {'symptoms': [['a']]}),
+    ('/assess', {'symptoms': 'cough'}),
+    ('/assess', []),
+    ('/assess', 'cough'),
+    ('/assess/batch', {'patients': [['cough'], [3]]}),
+    ('/assess/batch', {'patients': ['cough']}),
+    ('/assess/batch', [['cough']]),
+])
+def test_rejects_malformed_payloads(server, path, body):
+    status, response = post(server, path, body)
+    assert status == 400
+    assert 'error' in response
+
+
+@pytest.mark.parametrize('length', ['-1', 'abc'])
+def test_rejects_bad_content_length(server, length):
+    status, _ = post(server, '/assess', b'{}', headers={'Content-Length': length})
+    assert status == 400
+
+
+def test_rejects_invalid_json(server):
+    status, _ = post(server, '/assess', b'{not json')
+    assert status == 400
+
+
+def test_unexpected_error_returns_json_500(server, system, monkeypatch):
+    def broken(symptoms):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(system, 'assess_patient', broken)
+    status, body = post(server, '/assess', {'symptoms': ['cough']})
+    assert status == 500
+    assert body == {'error': 'Internal server error.'}
+
+
+class QuickTimeoutHandler(TriageRequestHandler):
+    timeout = 0.5
+
+
+def test_idle_connections_do_not_wedge_the_workers(system):
+    with running_server(system, threads=2, handler_class=QuickTimeoutHandler) as port:
+        idle = [socket.create_connection(('127.0.0.1', port)) for _ in range(2)]
+        try:
+            status, _ = post(port, '/assess', {'symptoms': ['itching']})
+            assert status == 200
+        finally:
+            for connection in idle:
+                connection.close()
+
+
+def test_overload_is_rejected_without_waiting_on_each_client(system):
+    with running_server(system, threads=1, queue_size=1) as port:
+        # One idle connection holds the handler thread and one fills the queue
+        held = [socket.create_connection(('127.0.0.1', port)) for _ in range(2)]
+        time.sleep(0.2)
+        start = time.perf_counter()
+        silent = [socket.create_connection(('127.0.0.1', port), timeout=5) for _ in range(30)]
+        try:
+            for connection in silent:
+                assert connection.recv(64).startswith(b'HTTP/1.0 429')
+            # The old drain-first rejection waited 0.1 s on every silent client
+            assert time.perf_counter() - start < 2.0
+            status, body = post(port, '/assess', {'symptoms': ['itching']})
+            assert status == 429 and 'error' in body
+        finally:
+            for connection in held + silent:
+                connection.close()
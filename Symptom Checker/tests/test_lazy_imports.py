@@ -0,0 +1,44 @@
+# tests/test_lazy_imports.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.bench_import_time import BUDGETS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAG_CLIENTS = ('groq', 'serpapi', 'httpx', 'dotenv')
+LIST_PACKAGES = "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})))"
+
+# Serves assessments offline from an existing artifact
+OFFLINE_SERVE = """
+import sys
+from symptom_checker.model_artifact import ModelArtifactStore
+from symptom_checker.triage_system import RAGOptions, TriageSystem
+system = TriageSystem(store=ModelArtifactStore(sys.argv[1], sys.argv[2]), rag=RAGOptions(offline=True))
+system.assess_patient(['itching', 'skin rash'])
+system.assess_patients([['cough'], ['headache', 'nausea']])
+"""
+
+
+def loaded_packages(code, *args):
+    """Top-level packages imported after running `code` in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, '-c', f"{code}\nimport json, sys\n{LIST_PACKAGES}", *args],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return set(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+
+@pytest.mark.parametrize('module', sorted(BUDGETS))
+def test_modules_do_not_import_their_forbidden_packages(module):
+    # Same exclusions as benchmarks/bench_import_time.py, without its timing budgets
+    assert not set(BUDGETS[module][1]) & loaded_packages(f"import {module}")
+
+
+def test_offline_system_never_imports_the_rag_clients(system, data_path, artifact_dir):
+    # The session `system` fixture has already built the artifact, so this start only loads it
+    loaded = loaded_packages(OFFLINE_SERVE, data_path, artifact_dir)
+    assert not set(RAG_CLIENTS) & loaded
+    # Index ranking from a saved artifact needs neither the data loader nor the estimator
+    assert not {'pandas', 'sklearn'} & loaded
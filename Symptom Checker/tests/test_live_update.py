@@ -0,0 +1,127 @@
+# tests/test_live_update.py
+import json
+import os
+
+import pytest
+
+from symptom_checker.live_update import LiveUpdater
+from symptom_checker.model_artifact import ModelArtifactStore
+from symptom_checker.triage_system import RAGOptions, TriageSystem
+
+NEW_ROWS = [('Test Fever', ['zz_new_symptom', 'itching'])] * 3 + [('Test Fever', ['zz_new_symptom'])] * 2
+
+
+def start(data_path, artifact_dir):
+    """Starts (or restarts) an offline system on its own artifact directory."""
+    return TriageSystem(store=ModelArtifactStore(data_path, str(artifact_dir)), rag=RAGOptions(offline=True))
+
+
+@pytest.fixture
+def live_system(data_path, tmp_path):
+    return start(data_path, tmp_path)
+
+
+def test_update_keeps_existing_ids_and_appends_new_ones(live_system):
+    before = dict(live_system.symptom_index)
+    version = live_system.apply_update(NEW_ROWS, refit=False)
+    assert version == live_system.version == 1
+    assert {s: live_system.symptom_index[s] for s in before} == before
+    assert live_system.symptom_index['zz_new_symptom'] == len(before)
+
+
+def test_snapshot_taken_before_an_update_is_unchanged(live_system):
+    snapshot = live_system._snapshot
+    live_system.apply_update(NEW_ROWS, refit=False)
+    assert 'zz_new_symptom' not in snapshot.symptom_index
+    assert live_system._snapshot is not snapshot
+
+
+def test_new_symptoms_are_ranked_by_the_index_until_the_refit(live_system):
+    live_system.apply_update(NEW_ROWS, refit=False)
+    assert live_system.predictor.model_columns < len(live_system.all_symptoms)
+    assert live_system.predictor.rank(['zz_new_symptom'], k=1, method='tree')[0][0] == 'test fever'
+    result = live_system.assess_patients([['zz new symptom'], ['itching', 'skin rash']], fetch_precautions=False)
+    assert result[0]['predicted_disease']['name'] == 'Test Fever'
+
+
+def test_refit_keeps_the_random_state(live_system):
+    live_system.predictor.random_state = 7
+    live_system.apply_update(NEW_ROWS, refit=True)
+    predictor = live_system.predictor
+    assert predictor.model_columns == len(live_system.all_symptoms)
+    assert predictor.model.random_state == 7
+    assert predictor.rank(['zz_new_symptom'], k=1)[0][0] == 'test fever'
+
+
+def test_updates_survive_a_restart(live_system, data_path, tmp_path):
+    live_system.apply_update(NEW_ROWS, descriptions={'Test Fever': 'A made-up disease.'}, refit=False)
+    restarted = start(data_path, tmp_path)
+    assert restarted.symptom_index['zz_new_symptom'] == live_system.symptom_index['zz_new_symptom']
+    assert restarted.description_mapping['test fever'] == 'A made-up disease.'
+    # The replay refits once, so the tree model knows the new column
+    assert restarted.predictor.model_columns == len(restarted.all_symptoms)
+    assert restarted.predictor.rank(['zz_new_symptom'], k=1)[0][0] == 'test fever'
+
+
+def test_refit_uses_the_cached_base_features(live_system, monkeypatch):
+    from symptom_checker.data_loader import MedicalDataLoader
+
+    def reprocess(self):
+        raise AssertionError("refit reprocessed the CSVs")
+
+    monkeypatch.setattr(MedicalDataLoader, 'load_and_process_data', reprocess)
+    live_system.apply_update(NEW_ROWS, refit=True)
+    assert live_system.predictor.model_columns == len(live_system.all_symptoms)
+
+
+@pytest.mark.parametrize('update', [
+    {'severity': {'itching': 'high'}},
+    {'severity': {'itching': float('nan')}},
+    {'rows': [('Test Fever', 'zz_new_symptom')]},
+    {'rows': [('Test Fever',)]},
+    {'descriptions': {'Test Fever': None}},
+    {'precautions': {'Test Fever': 'rest'}},
+])
+def test_malformed_update_is_rejected_before_it_is_logged(live_system, data_path, tmp_path, update):
+    version = live_system.version
+    with pytest.raises(ValueError):
+        live_system.apply_update(**update, refit=False)
+    assert live_system.version == version
+    assert not os.path.exists(live_system.updater.log_path)
+    start(data_path, tmp_path)
+
+
+def test_unreadable_log_entries_are_set_aside_on_restart(live_system, data_path, tmp_path):
+    live_system.apply_update(NEW_ROWS, refit=False)
+    with open(live_system.updater.log_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'rows': [], 'severity': {'itching': 'high'}}) + '\n')
+        f.write('{"rows": [["torn\n')
+    restarted = start(data_path, tmp_path)
+    assert 'zz_new_symptom' in restarted.symptom_index
+    assert restarted.severity_mapping['itching'] == live_system.severity_mapping['itching']
+
+
+def test_replayed_updates_are_compacted_into_the_artifact(live_system, data_path, tmp_path, monkeypatch):
+    live_system.apply_update(NEW_ROWS, descriptions={'Test Fever': 'A made-up disease.'}, refit=False)
+    start(data_path, tmp_path)
+
+    def refit(self):
+        raise AssertionError("the second start refitted the model")
+
+    monkeypatch.setattr(LiveUpdater, '_refit', refit)
+    restarted = start(data_path, tmp_path)
+    assert restarted.updater.applied_updates == 1
+    assert restarted.description_mapping['test fever'] == 'A made-up disease.'
+    assert restarted.predictor.model_columns == len(restarted.all_symptoms)
+    assert restarted.predictor.rank(['zz_new_symptom'], k=1, method='tree')[0][0] == 'test fever'
+
+
+def test_refit_after_compaction_keeps_the_compacted_rows(live_system, data_path, tmp_path):
+    live_system.apply_update(NEW_ROWS, refit=False)
+    start(data_path, tmp_path)
+    restarted = start(data_path, tmp_path)
+    restarted.apply_update([('Other Fever', ['zz_other_symptom'])] * 3, refit=True)
+    predictor = restarted.predictor
+    assert predictor.model_columns == len(restarted.all_symptoms)
+    assert predictor.rank(['zz_new_symptom'], k=1, method='tree')[0][0] == 'test fever'
+    assert predictor.rank(['zz_other_symptom'], k=1, method='tree')[0][0] == 'other fever'
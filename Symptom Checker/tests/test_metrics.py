@@ -0,0 +1,51 @@
+# tests/test_metrics.py
+import pytest
+
+from symptom_checker.metrics import LatencyHistogram, PipelineMetrics
+
+
+def test_percentiles_are_within_one_bucket():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.observe(ms / 1e3)
+    for q in (0.5, 0.95, 0.99):
+        # The bucket upper bound is never below the exact quantile and at most ~10% above it
+        assert q <= histogram.percentile(q) <= q * 1.1
+    assert histogram.percentile(1.0) == histogram.max == 1.0
+    assert histogram.count == 1000 and histogram.total == pytest.approx(500.5)
+
+
+def test_empty_and_single_value_histograms():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.99) == 0.0
+    histogram.observe(0.0123)
+    # Capped at the largest observation rather than the bucket bound
+    assert histogram.percentile(0.5) == histogram.percentile(0.99) == 0.0123
+
+
+def test_prometheus_exposition():
+    metrics = PipelineMetrics()
+    for seconds in (0.001, 0.002, 0.003):
+        metrics.observe('predict', seconds)
+    metrics.increment('requests', 3)
+    text = metrics.to_prometheus(extra_gauges={'in_flight': 2})
+    assert text.endswith('\n')
+    lines = text.splitlines()
+    samples = dict(line.rsplit(' ', 1) for line in lines if not line.startswith('#'))
+
+    assert '# TYPE triage_stage_seconds summary' in lines
+    assert set(samples) == {
+        'triage_stage_seconds{stage="predict",quantile="0.5"}',
+        'triage_stage_seconds{stage="predict",quantile="0.95"}',
+        'triage_stage_seconds{stage="predict",quantile="0.99"}',
+        'triage_stage_seconds_sum{stage="predict"}',
+        'triage_stage_seconds_count{stage="predict"}',
+        'triage_requests_total',
+        'triage_in_flight',
+    }
+    assert float(samples['triage_stage_seconds_sum{stage="predict"}']) == pytest.approx(0.006)
+    assert samples['triage_stage_seconds_count{stage="predict"}'] == '3'
+    assert float(samples['triage_stage_seconds{stage="predict",quantile="0.99"}']) == pytest.approx(0.003)
+    assert samples['triage_requests_total'] == '3'
+    assert '# TYPE triage_requests_total counter' in lines
+    assert '# TYPE triage_in_flight gauge' in lines and samples['triage_in_flight'] == '2'
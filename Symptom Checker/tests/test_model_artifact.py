@@ -0,0 +1,47 @@
+# tests/test_model_artifact.py
+import os
+import shutil
+
+import pytest
+
+from symptom_checker.model_artifact import ModelArtifactStore
+
+
+@pytest.fixture
+def store(data_path, tmp_path):
+    data_copy = str(tmp_path / 'data') + os.sep
+    shutil.copytree(data_path, data_copy)
+    return ModelArtifactStore(data_copy, str(tmp_path / 'artifacts'))
+
+
+def no_build(data_hash=None):
+    raise AssertionError("the artifact was rebuilt")
+
+
+def test_current_artifact_is_loaded_without_rebuilding(store, monkeypatch):
+    built = store.load_or_build()
+    monkeypatch.setattr(store, 'build', no_build)
+    loaded = store.load_or_build()
+    assert loaded['data_hash'] == built['data_hash']
+    assert loaded['processed_data']['all_symptoms'] == built['processed_data']['all_symptoms']
+
+
+def test_artifact_is_rebuilt_when_a_csv_changes(store):
+    built = store.load_or_build()
+    with open(os.path.join(store.data_path, 'symptom_Description.csv'), 'a', encoding='utf-8') as f:
+        f.write('Test Fever,A made-up disease.\n')
+    assert store.load(built['data_hash']) is not None
+    assert store.load() is None
+
+    rebuilt = store.load_or_build()
+    assert rebuilt['data_hash'] != built['data_hash']
+    assert rebuilt['processed_data']['description_mapping']['test fever'] == 'A made-up disease.'
+    assert os.path.exists(store.artifact_path(rebuilt['data_hash']))
+
+
+def test_unreadable_artifact_is_rebuilt(store):
+    built = store.load_or_build()
+    with open(store.artifact_path(built['data_hash']), 'wb') as f:
+        f.write(b'not a joblib file')
+    assert store.load() is None
+    assert store.load_or_build()['data_hash'] == built['data_hash']
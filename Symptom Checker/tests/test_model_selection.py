@@ -0,0 +1,19 @@
+# tests/test_model_selection.py
+import numpy as np
+
+from symptom_checker.model_selection import partial_queries, unique_profiles
+
+
+def test_unique_profiles_drops_repeated_rows():
+    X = np.array([[1, 0, 1], [1, 0, 1], [0, 1, 0], [1, 0, 1]])
+    y = np.array(['a', 'a', 'b', 'c'], dtype=object)
+    X_unique, y_unique = unique_profiles(X, y)
+    assert X_unique.tolist() == [[1, 0, 1], [0, 1, 0], [1, 0, 1]]
+    assert list(y_unique) == ['a', 'b', 'c']
+
+
+def test_partial_queries_keep_a_nonempty_subset():
+    X = np.array([[1, 1, 1, 1], [0, 1, 0, 0], [1, 1, 0, 0]])
+    partial = partial_queries(X, share=0.5, random_state=0)
+    assert ((partial == 1) <= (X == 1)).all()
+    assert partial.sum(axis=1).tolist() == [2, 1, 1]
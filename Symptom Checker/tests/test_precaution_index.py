@@ -0,0 +1,52 @@
+# tests/test_precaution_index.py
+from symptom_checker.precaution_index import PrecautionIndex, refresh_precaution_index
+from symptom_checker.rag_precaution_fetcher import SUMMARY_UNAVAILABLE
+
+
+class ScriptedFetcher:
+    """Returns a fixed summary per disease; diseases listed in `failing` always fail."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def fetch_precautions(self, disease):
+        self.calls.append(disease)
+        if disease in self.failing:
+            return SUMMARY_UNAVAILABLE
+        return f"- Rest ({disease})"
+
+
+def test_stale_diseases_honours_max_age(tmp_path):
+    index = PrecautionIndex(str(tmp_path / 'index.json'))
+    index.set('flu', '- Rest', fetched_at=1000.0)
+    index.set('cold', '- Rest', fetched_at=1900.0)
+    diseases = ['flu', 'cold', 'malaria']
+    assert index.stale_diseases(diseases, now=2000.0) == ['malaria']
+    assert index.stale_diseases(diseases, max_age=500, now=2000.0) == ['flu', 'malaria']
+    assert index.stale_diseases(diseases, max_age=50, now=2000.0) == diseases
+
+
+def test_refresh_only_fetches_stale_entries_and_saves(tmp_path):
+    index = PrecautionIndex(str(tmp_path / 'index.json'))
+    index.set('flu', '- Old advice')
+    fetcher = ScriptedFetcher()
+    result = refresh_precaution_index(fetcher, ['flu', 'cold'], index, max_age=3600, backoff=0)
+    assert fetcher.calls == ['cold']
+    assert result == {'refreshed': ['cold'], 'failed': []}
+
+    reloaded = PrecautionIndex(index.path).load()
+    assert reloaded.version == 1
+    assert reloaded.get('flu') == '- Old advice' and reloaded.get('cold') == '- Rest (cold)'
+
+
+def test_failed_refresh_keeps_the_previous_entry(tmp_path):
+    index = PrecautionIndex(str(tmp_path / 'index.json'))
+    index.set('flu', '- Old advice', fetched_at=0.0)
+    fetcher = ScriptedFetcher(failing={'flu'})
+    result = refresh_precaution_index(fetcher, ['flu', 'cold'], index, max_age=60, retries=2, backoff=0)
+    assert result == {'refreshed': ['cold'], 'failed': ['flu']}
+    assert fetcher.calls.count('flu') == 3
+    assert index.get('flu') == '- Old advice'
+    assert index.entries['flu']['fetched_at'] == 0.0
+    assert PrecautionIndex(index.path).load().get('flu') == '- Old advice'
@@ -0,0 +1,155 @@
+# tests/test_rag_fetchers.py
+import asyncio
+import threading
+
+import pytest
+
+from symptom_checker.async_rag_precaution_fetcher import AsyncRAGPrecautionFetcher
+from symptom_checker.cache import MemoryCache
+from symptom_checker.rag_backends import InjectedFailure, LocalSearch, LocalSummarizer, SearchBackend
+from symptom_checker.precaution_index import _fetch_with_retries
+from symptom_checker.rag_precaution_fetcher import RAGPrecautionFetcher, SearchAPIError, organic_results
+
+PRECAUTIONS = {'flu': ['rest', 'drink fluids'], 'cold': ['keep warm']}
+
+
+def fetch_both(search, llm, disease, **async_options):
+    fallback = LocalSummarizer(PRECAUTIONS)
+    sync = RAGPrecautionFetcher(search_backend=search, llm_backend=llm, fallback=fallback)
+
+    async def fetch_async():
+        fetcher = AsyncRAGPrecautionFetcher(search_backend=search, llm_backend=llm, fallback=fallback,
+                                            **async_options)
+        try:
+            return await fetcher.fetch_precautions(disease)
+        finally:
+            await fetcher.aclose()
+
+    return sync.fetch_precautions(disease), asyncio.run(fetch_async())
+
+
+def test_both_fetchers_summarize_search_results():
+    sync, async_ = fetch_both(LocalSearch(PRECAUTIONS), LocalSummarizer(), 'flu')
+    assert sync == async_ == "- Rest\n- Drink fluids"
+
+
+def test_empty_search_results_fall_back_to_local_summary():
+    # The search backend knows nothing about 'cold', the local data does
+    sync, async_ = fetch_both(LocalSearch({'flu': PRECAUTIONS['flu']}), LocalSummarizer(), 'cold')
+    assert sync == async_ == "- Keep warm"
+
+
+class FailingSearch(SearchBackend):
+    name = 'failing'
+
+    def search(self, query):
+        raise InjectedFailure("search is down")
+
+
+def test_upstream_failures_fall_back_to_the_same_local_summary():
+    sync, async_ = fetch_both(FailingSearch(), LocalSummarizer(), 'flu')
+    assert isinstance(async_, str)
+    assert sync == async_ == "- Rest\n- Drink fluids"
+
+
+def test_async_failures_raise_without_fallback_on_error():
+    with pytest.raises(InjectedFailure):
+        fetch_both(FailingSearch(), LocalSummarizer(), 'flu', fallback_on_error=False)
+
+
+class ThreadRecordingCache(MemoryCache):
+    blocking = True
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+
+def test_blocking_cache_lookups_run_off_the_event_loop():
+    cache = ThreadRecordingCache()
+
+    async def fetch():
+        fetcher = AsyncRAGPrecautionFetcher(search_backend=LocalSearch(PRECAUTIONS), llm_backend=LocalSummarizer(),
+                                            cache=cache)
+        await fetcher.fetch_precautions('flu')
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(fetch())
+    assert cache.threads and loop_thread not in cache.threads
+
+
+class FlakySearch(LocalSearch):
+    """Answers [] (as after an upstream error) the first `empty` times, then the real results."""
+
+    name = 'flaky'
+
+    def __init__(self, precaution_mapping, empty=1):
+        super().__init__(precaution_mapping)
+        self.empty = empty
+        self.calls = 0
+
+    def search(self, query):
+        self.calls += 1
+        return [] if self.calls <= self.empty else super().search(query)
+
+
+def test_sync_fetcher_does_not_cache_empty_search_results():
+    search = FlakySearch(PRECAUTIONS)
+    fetcher = RAGPrecautionFetcher(search_backend=search, llm_backend=LocalSummarizer(), cache=MemoryCache())
+    assert fetcher.query_serp_api('precautions for flu') == []
+    assert fetcher.query_serp_api('precautions for flu')
+    assert fetcher.query_serp_api('precautions for flu')
+    assert search.calls == 2
+
+
+def test_async_fetcher_does_not_cache_empty_search_results():
+    search = FlakySearch(PRECAUTIONS)
+
+    async def run():
+        fetcher = AsyncRAGPrecautionFetcher(search_backend=search, llm_backend=LocalSummarizer(), cache=MemoryCache())
+        return [await fetcher.query_serp_api('precautions for flu') for _ in range(3)]
+
+    first, second, third = asyncio.run(run())
+    assert first == [] and second and second == third
+    assert search.calls == 2
+
+
+def test_refresh_retries_reach_the_search_backend_again():
+    search = FlakySearch(PRECAUTIONS, empty=2)
+    fetcher = RAGPrecautionFetcher(search_backend=search, llm_backend=LocalSummarizer(), cache=MemoryCache())
+    assert _fetch_with_retries(fetcher, 'flu', retries=2, backoff=0) == "- Rest\n- Drink fluids"
+    assert search.calls == 3
+
+
+def test_serpapi_error_payloads_are_failures():
+    with pytest.raises(SearchAPIError):
+        organic_results({'error': 'Invalid API key.'})
+    assert organic_results({'organic_results': [{'snippet': 'x'}]}) == [{'snippet': 'x'}]
+    assert organic_results({}) == []
+
+
+def test_each_event_loop_gets_its_own_async_fetcher(system, data_path, artifact_dir):
+    from symptom_checker.model_artifact import ModelArtifactStore
+    from symptom_checker.triage_system import RAGOptions, TriageSystem
+
+    online = TriageSystem(store=ModelArtifactStore(data_path, artifact_dir),
+                          rag=RAGOptions(search_backend=LocalSearch(system.precaution_mapping),
+                                         llm_backend=LocalSummarizer()))
+
+    async def assess_twice():
+        first = await online.assess_patient_async(['itching', 'skin rash'])
+        second = await online.assess_patient_async(['chest pain', 'breathlessness'])
+        fetcher = online._get_async_rag_fetcher()
+        await online.aclose()
+        return fetcher, [r['predicted_disease']['precautions'] for r in (first, second)]
+
+    # Each asyncio.run() is a new loop; a fetcher (clients, semaphore) from a closed one must not be reused
+    first_fetcher, first = asyncio.run(assess_twice())
+    second_fetcher, second = asyncio.run(assess_twice())
+    assert first_fetcher is not second_fetcher
+    assert first == second and all(precautions.startswith('- ') for precautions in first)
+    assert len(online._async_rag_fetchers) == 0
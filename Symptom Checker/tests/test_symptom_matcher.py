@@ -0,0 +1,52 @@
+# tests/test_symptom_matcher.py
+import pytest
+
+from symptom_checker.symptom_matcher import SymptomMatcher
+
+
+@pytest.fixture(scope='module')
+def matcher(system):
+    return SymptomMatcher(system.all_symptoms)
+
+
+@pytest.mark.parametrize('text, symptom', [
+    ('skin rash', 'skin_rash'),
+    ('Skin-Rash', 'skin_rash'),
+    ('stomch pain', 'stomach_pain'),
+    ('back pian', 'back_pain'),
+    ('chestpain', 'chest_pain'),
+    ('head ache', 'headache'),
+    ('loss o appetite', 'loss_of_appetite'),
+    ('throwing up', 'vomiting'),
+])
+def test_matches_variants_typos_and_synonyms(matcher, text, symptom):
+    assert matcher.match(text).symptom == symptom
+
+
+@pytest.mark.parametrize('text', ['eye pain', 'hand ache', 'stomach rash', 'kidney rash', 'ear pain', 'fever'])
+def test_rejects_different_body_parts_and_ambiguous_terms(matcher, text):
+    assert matcher.match(text) is None
+
+
+def test_generic_fever_offers_both_grades(matcher):
+    assert {symptom for symptom, _ in matcher.candidates('fever', 2)} == {'high_fever', 'mild_fever'}
+
+
+def test_candidates_list_each_symptom_once(matcher):
+    symptoms = [symptom for symptom, _ in matcher.candidates('stomach ache')]
+    assert len(symptoms) == len(set(symptoms))
+
+
+class ClearedByAnotherThread(dict):
+    """A fuzzy cache that another thread clears right after every write."""
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.clear()
+
+
+def test_fuzzy_match_survives_a_concurrent_cache_clear(system):
+    matcher = SymptomMatcher(system.all_symptoms)
+    expected = [matcher.match(text) for text in ('stomch pain', 'eye pain')]
+    matcher._fuzzy_cache = ClearedByAnotherThread()
+    assert [matcher.match(text) for text in ('stomch pain', 'eye pain')] == expected
@@ -0,0 +1,51 @@
+# tests/test_symptom_registry.py
+import multiprocessing
+import os
+
+import pytest
+
+from symptom_checker.symptom_registry import SymptomRegistry
+
+
+def test_ids_are_append_only(tmp_path):
+    path = str(tmp_path / 'registry.json')
+    registry = SymptomRegistry(path).load()
+    assert registry.extend(['b', 'a']) == ['b', 'a']
+    assert registry.extend(['a', 'c', 'b']) == ['b', 'a', 'c']
+    assert SymptomRegistry(path).load().index == {'b': 0, 'a': 1, 'c': 2}
+
+
+def test_merges_ids_registered_by_another_instance(tmp_path):
+    path = str(tmp_path / 'registry.json')
+    first = SymptomRegistry(path).load()
+    second = SymptomRegistry(path).load()
+    first.extend(['a', 'b'])
+    # `second` loaded before `first` wrote; it must not hand out a's and b's IDs again
+    assert second.extend(['c']) == ['a', 'b', 'c']
+    assert SymptomRegistry(path).load().symptoms == ['a', 'b', 'c']
+
+
+def _register(path, prefix, queue):
+    registry = SymptomRegistry(path).load()
+    for i in range(20):
+        registry.extend([f'{prefix}_{i}'])
+    queue.put({s: registry.index[s] for s in registry.symptoms if s.startswith(prefix)})
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_concurrent_processes_never_share_an_id(tmp_path):
+    path = str(tmp_path / 'registry.json')
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    processes = [context.Process(target=_register, args=(path, f'p{n}', queue)) for n in range(4)]
+    for process in processes:
+        process.start()
+    assigned = {}
+    for _ in processes:
+        assigned.update(queue.get(timeout=60))
+    for process in processes:
+        process.join()
+
+    final = SymptomRegistry(path).load()
+    assert len(final.symptoms) == len(set(final.symptoms)) == 80
+    assert all(final.index[symptom] == i for symptom, i in assigned.items())
@@ -0,0 +1,164 @@
+# tests/test_triage_rules.py
+import json
+import os
+import random
+
+import pytest
+
+from symptom_checker.care_recommendation import CareRecommender
+from symptom_checker.feature_matrix import build_symptom_matrix
+from symptom_checker.risk_assessment import RiskAssessor
+from symptom_checker.severity_assessment import SeverityAssessor
+from symptom_checker.triage_rules import CompiledPolicy, TriageRulesEngine
+
+EXAMPLE_POLICY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'policies', 'example_clinic.json')
+
+LEVELS = [
+    {'level': 'LOW', 'care': 'SELF CARE'},
+    {'level': 'MEDIUM', 'min_score': 10, 'care': 'CONSULT DOCTOR'},
+    {'level': 'HIGH', 'min_score': 16, 'care': 'IMMEDIATE MEDICAL ATTENTION'},
+]
+
+
+@pytest.fixture(scope='module')
+def vocabulary(system):
+    return system.all_symptoms, system.severity_mapping
+
+
+@pytest.fixture(scope='module')
+def patients(vocabulary):
+    rng = random.Random(0)
+    return [rng.sample(vocabulary[0], rng.randint(1, 8)) for _ in range(300)]
+
+
+def ids(symptoms, all_symptoms):
+    return [all_symptoms.index(s) for s in symptoms]
+
+
+def write_policy(path, policy):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(policy, f)
+
+
+def test_default_policy_matches_the_legacy_assessors(vocabulary, patients):
+    all_symptoms, severity_mapping = vocabulary
+    policy = CompiledPolicy({}, all_symptoms, severity_mapping)
+    for symptoms in patients:
+        decision = policy.evaluate(ids(symptoms, all_symptoms))
+        score = RiskAssessor.calculate(symptoms, severity_mapping)
+        assert decision.risk_score == score
+        assert decision.severity_level == SeverityAssessor.classify(score)
+        assert decision.care_recommendation == CareRecommender.recommend(decision.severity_level)
+        assert decision.red_flags == []
+
+
+def test_red_flags_raise_the_severity(vocabulary):
+    all_symptoms, severity_mapping = vocabulary
+    policy = CompiledPolicy({'levels': LEVELS, 'red_flags': {'chest_pain': 'HIGH'}}, all_symptoms, severity_mapping)
+    decision = policy.evaluate(ids(['chest_pain'], all_symptoms))
+    assert decision.risk_score < 16
+    assert decision.severity_level == 'HIGH' and decision.red_flags == ['chest_pain']
+
+
+def test_batch_evaluation_matches_single(vocabulary, patients):
+    all_symptoms, severity_mapping = vocabulary
+    source = {'levels': LEVELS, 'weight_overrides': {'itching': 5},
+              'red_flags': {'chest_pain': 'HIGH', 'coma': 'HIGH', 'bloody_stool': 'MEDIUM'}}
+    policy = CompiledPolicy(source, all_symptoms, severity_mapping)
+    patients = patients + [['chest_pain', 'bloody_stool'], ['itching', 'coma']]
+    scores, levels, care, red_flags = policy.evaluate_many(
+        build_symptom_matrix(patients, {s: i for i, s in enumerate(all_symptoms)}))
+    for row, symptoms in enumerate(patients):
+        decision = policy.evaluate(ids(symptoms, all_symptoms))
+        assert (scores[row], levels[row], care[row], red_flags[row]) == tuple(decision)
+
+
+@pytest.mark.parametrize('source', [
+    {'levels': []},
+    {'levels': [{'level': 'LOW'}]},
+    {'levels': [LEVELS[0], {'level': 'HIGH', 'care': 'ER'}]},
+    {'levels': [LEVELS[0], LEVELS[2], LEVELS[1]]},
+    {'red_flags': {'chest_pain': 'CRITICAL'}},
+])
+def test_invalid_policies_do_not_compile(vocabulary, source):
+    with pytest.raises(ValueError):
+        CompiledPolicy(source, *vocabulary)
+
+
+def test_unknown_red_flag_symptoms_are_ignored(vocabulary):
+    policy = CompiledPolicy({'red_flags': {'not_a_symptom': 'HIGH'}}, *vocabulary)
+    assert not policy.red_flag_ids
+
+
+def test_policy_file_is_hot_reloaded(vocabulary, tmp_path):
+    all_symptoms, severity_mapping = vocabulary
+    path = str(tmp_path / 'policy.json')
+    write_policy(path, {'name': 'v1', 'levels': LEVELS})
+    engine = TriageRulesEngine(all_symptoms, severity_mapping, policy_path=path, check_interval=0)
+    before = engine.current()
+    assert before.name == 'v1'
+    chest_pain = ids(['chest_pain'], all_symptoms)
+    assert engine.evaluate(chest_pain).red_flags == []
+
+    write_policy(path, {'name': 'v2', 'levels': LEVELS, 'red_flags': {'chest_pain': 'HIGH'}})
+    mtime = os.path.getmtime(path) + 10
+    os.utime(path, (mtime, mtime))
+    decision = engine.evaluate(chest_pain)
+    assert engine.policy.name == 'v2' and decision.severity_level == 'HIGH'
+    # A request that picked up the old tables keeps them
+    assert before.evaluate(chest_pain).red_flags == []
+
+
+def test_broken_policy_edit_keeps_the_active_policy(vocabulary, tmp_path):
+    path = str(tmp_path / 'policy.json')
+    write_policy(path, {'name': 'good', 'levels': LEVELS})
+    engine = TriageRulesEngine(*vocabulary, policy_path=path, check_interval=0)
+
+    for broken in ('{"name": "bad", "levels": [', json.dumps({'name': 'bad', 'levels': []})):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(broken)
+        mtime = os.path.getmtime(path) + 10
+        os.utime(path, (mtime, mtime))
+        assert engine.current().name == 'good'
+        assert engine.reload() is False
+
+
+def test_broken_policy_fails_at_startup(vocabulary, tmp_path):
+    path = str(tmp_path / 'policy.json')
+    write_policy(path, {'levels': []})
+    with pytest.raises(ValueError):
+        TriageRulesEngine(*vocabulary, policy_path=path)
+
+
+def test_example_policy_compiles(vocabulary):
+    engine = TriageRulesEngine(*vocabulary, policy_path=EXAMPLE_POLICY)
+    assert engine.policy.name == 'example-clinic' and engine.policy.red_flag_ids
+
+
+def test_red_flags_at_the_lowest_level_are_still_reported(vocabulary):
+    all_symptoms, severity_mapping = vocabulary
+    policy = CompiledPolicy({'levels': LEVELS, 'red_flags': {'itching': 'LOW', 'coma': 'HIGH'}},
+                            all_symptoms, severity_mapping)
+    patients = [['itching'], ['itching', 'coma']]
+    assert policy.evaluate(ids(patients[0], all_symptoms)).red_flags == ['itching']
+    _, levels, _, red_flags = policy.evaluate_many(
+        build_symptom_matrix(patients, {s: i for i, s in enumerate(all_symptoms)}))
+    assert red_flags == [['itching'], ['coma', 'itching']]
+    assert list(levels) == ['LOW', 'HIGH']
+
+
+def test_policy_symptom_names_are_normalized(vocabulary):
+    all_symptoms, severity_mapping = vocabulary
+    policy = CompiledPolicy({'levels': LEVELS, 'weight_overrides': {'Chest Pain': 20},
+                             'red_flags': {' Bloody Stool ': 'MEDIUM'}}, all_symptoms, severity_mapping)
+    decision = policy.evaluate(ids(['chest_pain'], all_symptoms))
+    assert decision.risk_score == 20 and decision.severity_level == 'HIGH'
+    assert policy.evaluate(ids(['bloody_stool'], all_symptoms)).red_flags == ['bloody_stool']
+
+
+def test_unknown_weight_overrides_are_reported(vocabulary, caplog):
+    with caplog.at_level('WARNING', logger='symptom_checker.triage_rules'):
+        policy = CompiledPolicy({'weight_overrides': {'not_a_symptom': 9}}, *vocabulary)
+    assert 'not_a_symptom' in caplog.text
+    assert policy.weights == CompiledPolicy({}, *vocabulary).weights